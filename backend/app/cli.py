@@ -0,0 +1,428 @@
+"""
+Offline bulk calculation for HR rosters.
+
+Usage (from backend/):
+    python -m app.cli export-coefficients coefficients.bin
+    python -m app.cli import-coefficients circular.csv --calculation-year 2026
+    python -m app.cli calculate roster.csv --coefficients coefficients.bin --output results.csv
+
+The roster has one row per employee-period with the columns
+employee_id, start_date, end_date, monthly_salary (CSV with a header row,
+or the first sheet of an XLSX file). Rows of one employee must be
+consecutive (--check-grouping verifies it, at the cost of remembering
+every employee id). Each employee is validated with the same rules as
+POST /api/v1/calculate and calculated with CalculationEngine in a process
+pool; results are streamed to CSV (or Parquet) in roster order, so memory
+stays bounded by the number of chunks in flight.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+ROSTER_COLUMNS = ("employee_id", "start_date", "end_date", "monthly_salary")
+RESULT_COLUMNS = ("employee_id", "periods", "total_months", "average_salary", "total_amount", "error")
+
+# (employee_id, [period dicts as read from the roster])
+Employee = Tuple[str, List[Dict]]
+ResultRow = Tuple[str, int, Optional[int], Optional[float], Optional[float], Optional[str]]
+
+
+# Roster reading ------------------------------------------------------------
+
+def _read_csv_rows(path: str) -> Iterator[Dict]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in ROSTER_COLUMNS if c not in (reader.fieldnames or ())]
+        if missing:
+            raise SystemExit(f"{path}: missing columns {', '.join(missing)}")
+        yield from reader
+
+
+def _cell(value) -> str:
+    """XLSX cell as the string the CSV reader would produce"""
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return f"{value.month:02d}/{value.year}"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _read_xlsx_rows(path: str) -> Iterator[Dict]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise SystemExit("Reading XLSX rosters requires openpyxl (pip install openpyxl)")
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [_cell(value).strip() for value in next(rows, ())]
+        missing = [c for c in ROSTER_COLUMNS if c not in header]
+        if missing:
+            raise SystemExit(f"{path}: missing columns {', '.join(missing)}")
+        for values in rows:
+            yield {name: _cell(value) for name, value in zip(header, values)}
+    finally:
+        workbook.close()
+
+
+def read_roster(path: str, check_grouping: bool = False) -> Iterator[Employee]:
+    """
+    Stream employees (id, period rows) from a CSV or XLSX roster.
+
+    Memory is bounded by one employee's rows. check_grouping rejects
+    rosters whose employee rows are not consecutive; it keeps every
+    employee id seen, so it needs O(employees) memory.
+    """
+    rows = _read_xlsx_rows(path) if path.lower().endswith((".xlsx", ".xlsm")) else _read_csv_rows(path)
+
+    seen = set() if check_grouping else None
+    current_id = None
+    periods: List[Dict] = []
+
+    for row in rows:
+        employee_id = (row.get("employee_id") or "").strip()
+        if employee_id != current_id:
+            if current_id is not None:
+                yield current_id, periods
+            if seen is not None:
+                if employee_id in seen:
+                    # A second group for the same employee would be calculated separately
+                    raise SystemExit(f"{path}: rows of employee {employee_id!r} are not consecutive")
+                seen.add(employee_id)
+            current_id, periods = employee_id, []
+
+        periods.append({
+            "start_date": (row.get("start_date") or "").strip(),
+            "end_date": (row.get("end_date") or "").strip(),
+            "monthly_salary": (row.get("monthly_salary") or "").strip(),
+        })
+
+    if current_id is not None:
+        yield current_id, periods
+
+
+# Calculation (runs in pool workers) ----------------------------------------
+
+_engine = None
+_exact = False
+
+
+def _init_worker(coefficients_path: str, calculation_year: Optional[int] = None, exact: bool = False):
+    """Load the coefficient snapshot once per worker process"""
+    global _engine, _exact
+    from app.services.calculation_engine import CalculationEngine
+    from app.services.snapshot_file import read_snapshot_file
+
+    snapshot = read_snapshot_file(coefficients_path)
+    if calculation_year is not None:
+        snapshot = snapshot.for_calculation_year(calculation_year)
+
+    _engine = CalculationEngine()
+    _engine.load_coefficients(snapshot)
+    _exact = exact
+
+
+def _calculate_chunk(employees: List[Employee]) -> List[ResultRow]:
+    from app.schemas.calculation_request import CalculationRequest
+    from app.utils.validation import format_validation_error
+
+    results = []
+    for employee_id, periods in employees:
+        try:
+            request = CalculationRequest.model_validate({"periods": periods})
+            result = _engine.calculate(request.periods, verbosity="summary", exact=_exact)
+            results.append((
+                employee_id, len(periods), result.total_months, result.average_salary, result.total_amount, None
+            ))
+        except ValidationError as e:
+            results.append((employee_id, len(periods), None, None, None, format_validation_error(e)))
+        except ValueError as e:
+            results.append((employee_id, len(periods), None, None, None, str(e)))
+        except Exception as e:
+            # One bad employee must not fail the chunk (and the whole run)
+            results.append((employee_id, len(periods), None, None, None, f"Internal error: {e!r}"))
+    return results
+
+
+# Result writing ------------------------------------------------------------
+
+class CsvResultWriter:
+    def __init__(self, path: str):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(RESULT_COLUMNS)
+
+    def write(self, rows: List[ResultRow]):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetResultWriter:
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Writing Parquet requires pyarrow (pip install pyarrow)")
+
+        self._pa = pa
+        self._schema = pa.schema([
+            ("employee_id", pa.string()),
+            ("periods", pa.int32()),
+            ("total_months", pa.int32()),
+            ("average_salary", pa.float64()),
+            ("total_amount", pa.float64()),
+            ("error", pa.string()),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows: List[ResultRow]):
+        columns = list(zip(*rows)) if rows else [[] for _ in RESULT_COLUMNS]
+        self._writer.write_table(self._pa.Table.from_arrays(
+            [self._pa.array(column, type=field.type) for column, field in zip(columns, self._schema)],
+            schema=self._schema
+        ))
+
+    def close(self):
+        self._writer.close()
+
+
+def _result_writer(path: str, output_format: Optional[str]):
+    output_format = output_format or ("parquet" if path.lower().endswith(".parquet") else "csv")
+    return ParquetResultWriter(path) if output_format == "parquet" else CsvResultWriter(path)
+
+
+# Driver --------------------------------------------------------------------
+
+def _chunks(employees: Iterator[Employee], size: int) -> Iterator[List[Employee]]:
+    while True:
+        chunk = list(islice(employees, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Progress:
+    """Throttled progress and final throughput report on stderr"""
+
+    def __init__(self, interval: float, stream=sys.stderr):
+        self.interval = interval
+        self.stream = stream
+        self.started = time.perf_counter()
+        self._last_report = self.started
+        self.employees = 0
+        self.periods = 0
+        self.errors = 0
+
+    def update(self, rows: List[ResultRow]):
+        self.employees += len(rows)
+        self.periods += sum(row[1] for row in rows)
+        self.errors += sum(1 for row in rows if row[5] is not None)
+
+        now = time.perf_counter()
+        if self.interval > 0 and now - self._last_report >= self.interval:
+            self._last_report = now
+            print(f"{self.employees:,} employees, {self.rate():,.0f}/s", file=self.stream)
+
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.employees / elapsed if elapsed > 0 else 0.0
+
+    def report(self) -> Dict:
+        return {
+            "employees": self.employees,
+            "periods": self.periods,
+            "errors": self.errors,
+            "seconds": round(time.perf_counter() - self.started, 3),
+            "employees_per_second": round(self.rate(), 1),
+        }
+
+
+def calculate_roster(
+    roster_path: str,
+    coefficients_path: str,
+    output_path: str,
+    workers: Optional[int] = None,
+    chunk_size: int = 500,
+    output_format: Optional[str] = None,
+    progress_interval: float = 5.0,
+    calculation_year: Optional[int] = None,
+    exact: bool = False,
+    check_grouping: bool = False
+) -> Dict:
+    """
+    Calculate every employee in a roster and write one result row each.
+
+    workers=0 calculates in this process; otherwise a pool of `workers`
+    processes (default: all CPUs) gets chunks of chunk_size employees, with
+    at most 2 chunks per worker in flight. calculation_year selects the
+    coefficient table (default: the latest in the snapshot file); exact
+    uses the engine's integer-đồng mode. check_grouping is passed to
+    read_roster.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    progress = Progress(progress_interval)
+    writer = _result_writer(output_path, output_format)
+
+    try:
+        chunks = _chunks(read_roster(roster_path, check_grouping), chunk_size)
+
+        if workers == 0:
+            _init_worker(coefficients_path, calculation_year, exact)
+            for chunk in chunks:
+                rows = _calculate_chunk(chunk)
+                writer.write(rows)
+                progress.update(rows)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(coefficients_path, calculation_year, exact)
+            ) as pool:
+                in_flight = deque()
+                for chunk in chunks:
+                    in_flight.append(pool.submit(_calculate_chunk, chunk))
+                    if len(in_flight) >= workers * 2:
+                        rows = in_flight.popleft().result()
+                        writer.write(rows)
+                        progress.update(rows)
+
+                while in_flight:
+                    rows = in_flight.popleft().result()
+                    writer.write(rows)
+                    progress.update(rows)
+    finally:
+        writer.close()
+
+    return progress.report()
+
+
+def export_coefficients(output_path: str) -> str:
+    """
+    Write the active coefficient table from DATABASE_URL to a snapshot file
+    (binary, or JSON for *.json paths)
+    """
+    from app.database import SessionLocal
+    from app.services.coefficient_service import CoefficientService
+    from app.services.coefficient_snapshot import CoefficientSnapshot
+    from app.services.snapshot_file import write_snapshot_file
+
+    db = SessionLocal()
+    try:
+        snapshot = CoefficientSnapshot.from_models(CoefficientService(db).get_all_active())
+    finally:
+        db.close()
+
+    if not snapshot:
+        raise SystemExit("No active coefficients found in the database")
+
+    write_snapshot_file(snapshot, output_path)
+    return snapshot.version
+
+
+def import_coefficients(input_path: str, calculation_year: int, deactivate_missing: bool = True):
+    """
+    Upsert a coefficient circular (CSV with year, coefficient and optionally
+    month columns; without a month column rows are yearly) into DATABASE_URL
+    """
+    from app.database import SessionLocal
+    from app.services.coefficient_service import CoefficientService
+    from app.services.invalidation import publish_invalidation_sync
+
+    with open(input_path, newline="", encoding="utf-8-sig") as f:
+        rows = list(csv.DictReader(f))
+
+    db = SessionLocal()
+    try:
+        result = CoefficientService(db).import_circular(rows, calculation_year, deactivate_missing)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    finally:
+        db.close()
+
+    # Running API workers reload now instead of at their next periodic check
+    publish_invalidation_sync(str(result.version))
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="BHXH offline tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export-coefficients", help="write the active coefficient table to a file")
+    export.add_argument("output", help="snapshot file to write (*.json for JSON, otherwise binary)")
+
+    upsert = commands.add_parser("import-coefficients", help="upsert a coefficient circular from a CSV file")
+    upsert.add_argument("input", help="CSV file with year, [month,] coefficient columns")
+    upsert.add_argument("--calculation-year", type=int, required=True, help="calculation year of the circular")
+    upsert.add_argument("--keep-missing", action="store_true", help="keep rows of the table absent from the file")
+
+    calculate = commands.add_parser("calculate", help="calculate a CSV/XLSX roster")
+    calculate.add_argument("roster", help="CSV or XLSX file with employee_id, start_date, end_date, monthly_salary")
+    calculate.add_argument("--coefficients", required=True, help="snapshot file from export-coefficients")
+    calculate.add_argument("--output", required=True, help="results file (.csv or .parquet)")
+    calculate.add_argument("--format", choices=("csv", "parquet"), help="output format (default: from extension)")
+    calculate.add_argument("--calculation-year", type=int, help="coefficient table year (default: latest)")
+    calculate.add_argument("--exact", action="store_true", help="integer-đồng arithmetic (official rounding)")
+    calculate.add_argument(
+        "--check-grouping", action="store_true",
+        help="fail if an employee's rows are not consecutive (keeps every employee id in memory)"
+    )
+    calculate.add_argument("--workers", type=int, help="worker processes (default: all CPUs, 0: no pool)")
+    calculate.add_argument("--chunk-size", type=int, default=500, help="employees per worker task")
+    calculate.add_argument("--progress", type=float, default=5.0, help="seconds between progress lines (0: off)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "export-coefficients":
+        version = export_coefficients(args.output)
+        print(f"Wrote {args.output} (version {version})", file=sys.stderr)
+        return 0
+
+    if args.command == "import-coefficients":
+        result = import_coefficients(args.input, args.calculation_year, not args.keep_missing)
+        print(
+            f"Imported {args.input} into {result.calculation_year}: {result.inserted} inserted, "
+            f"{result.updated} updated, {result.deactivated} deactivated (version {result.version})",
+            file=sys.stderr
+        )
+        return 0
+
+    report = calculate_roster(
+        args.roster,
+        args.coefficients,
+        args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        output_format=args.format,
+        progress_interval=args.progress,
+        calculation_year=args.calculation_year,
+        exact=args.exact,
+        check_grouping=args.check_grouping
+    )
+    print(
+        f"{report['employees']:,} employees ({report['periods']:,} periods, {report['errors']:,} errors) "
+        f"in {report['seconds']:.1f}s - {report['employees_per_second']:,.0f} employees/s",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
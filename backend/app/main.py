@@ -1,8 +1,15 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
+from app import metrics
 from app.routers import calculation, coefficient
-from app.database import engine, Base
+from app.database import engine, async_engine, Base, ASYNC_DATABASE_URL
+from app.services.coefficient_snapshot import load_snapshot, refresh_snapshot, refresh_snapshot_periodically
+from app.services.invalidation import (
+    InvalidationListener, PostgresInvalidationListener, asyncpg_dsn, get_invalidation_redis, publish_invalidation
+)
+from app.services.executor import calculation_executor
+import asyncio
 import logging
 
 # Configure logging
@@ -65,13 +72,58 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus metrics (404 unless METRICS_ENABLED)"""
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE_LATEST)
+
+
 @app.on_event("startup")
 async def startup_event():
     """Startup event handler"""
     logger.info(f"{settings.APP_NAME} v{settings.APP_VERSION} starting up...")
 
+    # Load the coefficient snapshot shared by all requests
+    try:
+        await load_snapshot()
+    except Exception as e:
+        logger.warning(f"Could not load coefficient snapshot at startup: {str(e)}")
+
+    # Reload within a second of a coefficient change: PostgreSQL NOTIFY
+    # covers every change to the tables (direct edits included), Redis
+    # covers the rest; the periodic check is the last resort and announces
+    # what it finds to the other workers
+    on_change = None
+    listeners = []
+    redis = get_invalidation_redis()
+    if redis is not None:
+        listeners.append(InvalidationListener(redis, refresh_snapshot))
+
+        async def on_change():
+            await publish_invalidation(redis)
+
+    dsn = asyncpg_dsn(ASYNC_DATABASE_URL)
+    if settings.COEFFICIENT_INVALIDATION_ENABLED and dsn and not settings.COEFFICIENT_SNAPSHOT_FILE:
+        listeners.append(PostgresInvalidationListener(dsn, refresh_snapshot))
+
+    app.state.invalidation_tasks = [asyncio.create_task(listener.run()) for listener in listeners]
+
+    if settings.COEFFICIENT_REFRESH_INTERVAL > 0:
+        app.state.snapshot_refresh_task = asyncio.create_task(refresh_snapshot_periodically(on_change=on_change))
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Shutdown event handler"""
     logger.info(f"{settings.APP_NAME} shutting down...")
+
+    tasks = list(getattr(app.state, "invalidation_tasks", []))
+    tasks.append(getattr(app.state, "snapshot_refresh_task", None))
+    for task in tasks:
+        if task is not None:
+            task.cancel()
+
+    calculation_executor.shutdown()
+    await async_engine.dispose()
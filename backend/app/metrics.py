@@ -0,0 +1,251 @@
+"""
+Hot-path instrumentation for the calculation pipeline.
+
+Metrics are off by default (METRICS_ENABLED). When disabled, stage() and
+timer() hand out shared no-op objects and the counters are never touched,
+so the instrumented code pays one flag check per call site.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from prometheus_client import (
+    CollectorRegistry, Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from app.config import settings
+
+enabled: bool = settings.METRICS_ENABLED
+
+registry = CollectorRegistry()
+
+STAGE_SECONDS = Histogram(
+    "bhxh_calculation_stage_seconds",
+    "Time spent per stage of the calculate pipeline",
+    ["stage"],
+    registry=registry,
+    buckets=(0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+)
+PERIODS_PROCESSED = Counter(
+    "bhxh_periods_processed_total",
+    "Input periods processed by the calculation engine",
+    registry=registry
+)
+FRAGMENTS_PRODUCED = Counter(
+    "bhxh_split_fragments_total",
+    "Period fragments produced by splitting (era split and per-year detail split)",
+    ["split"],
+    registry=registry
+)
+COEFFICIENT_CACHE = Counter(
+    "bhxh_coefficient_cache_total",
+    "Coefficient snapshot lookups on the request path",
+    ["result"],
+    registry=registry
+)
+EXECUTOR_CALLS = Counter(
+    "bhxh_calculation_executor_total",
+    "Engine calls by where they ran (inline, thread, process) or rejected when the queue was full",
+    ["mode"],
+    registry=registry
+)
+REQUEST_COALESCING = Counter(
+    "bhxh_request_coalescing_total",
+    "Calculations started (leader) or joined while in flight (follower)",
+    ["role"],
+    registry=registry
+)
+COEFFICIENT_INVALIDATIONS = Counter(
+    "bhxh_coefficient_invalidations_total",
+    "Coefficient snapshot checks triggered by a published change (message) or by polling while the channel is down",
+    ["source"],
+    registry=registry
+)
+
+# Stage durations recorded during the current request (used to derive the
+# serialization remainder in TimedRoute)
+_request_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_stages", default=None)
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class StageTimer:
+    """Times consecutive stages: each lap() closes the stage that just ran"""
+    __slots__ = ('last',)
+
+    def __init__(self):
+        self.last = time.perf_counter()
+
+    def lap(self, name: str):
+        now = time.perf_counter()
+        observe(name, now - self.last)
+        self.last = now
+
+
+class _NullTimer:
+    def lap(self, name: str):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def stage(name: str):
+    """Context manager timing one pipeline stage (no-op when metrics are disabled)"""
+    return _Stage(name) if enabled else _NULL_STAGE
+
+
+def timer():
+    """Lap timer for code made of back-to-back stages (no-op when metrics are disabled)"""
+    return StageTimer() if enabled else _NULL_TIMER
+
+
+def observe(name: str, seconds: float):
+    """Record a stage duration measured elsewhere"""
+    STAGE_SECONDS.labels(name).observe(seconds)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages[name] = stages.get(name, 0.0) + seconds
+
+
+def count_periods(periods: int, era_fragments: int, year_fragments: int = 0):
+    """Count periods processed and fragments produced by one calculation"""
+    if not enabled:
+        return
+    PERIODS_PROCESSED.inc(periods)
+    FRAGMENTS_PRODUCED.labels("era").inc(era_fragments)
+    if year_fragments:
+        FRAGMENTS_PRODUCED.labels("year").inc(year_fragments)
+
+
+def count_coefficient_cache(hit: bool):
+    if enabled:
+        COEFFICIENT_CACHE.labels("hit" if hit else "miss").inc()
+
+
+def count_executor(mode: str):
+    if enabled:
+        EXECUTOR_CALLS.labels(mode).inc()
+
+
+def count_coalescing(follower: bool):
+    if enabled:
+        REQUEST_COALESCING.labels("follower" if follower else "leader").inc()
+
+
+def count_invalidation(source: str):
+    if enabled:
+        COEFFICIENT_INVALIDATIONS.labels(source).inc()
+
+
+@contextmanager
+def request_stages() -> Iterator[Optional[Dict[str, float]]]:
+    """Collect the stage durations recorded while handling one request"""
+    if not enabled:
+        yield None
+        return
+    token = _request_stages.set({})
+    try:
+        yield _request_stages.get()
+    finally:
+        _request_stages.reset(token)
+
+
+class TimedRoute(APIRoute):
+    """
+    Route class recording total request time per route.
+
+    Serialization has no hook of its own in FastAPI, so it is reported as
+    the remainder of the request after validation, coefficient lookup and
+    the endpoint itself.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            if not enabled:
+                return await handler(request)
+
+            with request_stages() as stages:
+                start = time.perf_counter()
+                response = await handler(request)
+                total = time.perf_counter() - start
+
+            accounted = sum(stages.get(name, 0.0) for name in ("validation", "coefficients", "handler"))
+            observe("request", total)
+            observe("serialization", max(0.0, total - accounted))
+            return response
+
+        return timed_handler
+
+
+class PoolCollector:
+    """Reports connection pool usage of the sync and async database engines at scrape time"""
+
+    def collect(self):
+        from app.database import engine, async_engine
+
+        checked_out = GaugeMetricFamily(
+            "bhxh_db_pool_checked_out", "Connections currently checked out", labels=["engine"]
+        )
+        size = GaugeMetricFamily(
+            "bhxh_db_pool_size", "Configured pool size", labels=["engine"]
+        )
+        overflow = GaugeMetricFamily(
+            "bhxh_db_pool_overflow", "Connections currently open beyond pool_size", labels=["engine"]
+        )
+
+        for label, pool in (("sync", engine.pool), ("async", async_engine.pool)):
+            for family, attribute in ((checked_out, "checkedout"), (size, "size"), (overflow, "overflow")):
+                method = getattr(pool, attribute, None)
+                if method is not None:
+                    family.add_metric([label], method())
+
+        yield checked_out
+        yield size
+        yield overflow
+
+
+registry.register(PoolCollector())
+
+
+def render() -> bytes:
+    """Prometheus text exposition of all metrics"""
+    return generate_latest(registry)
+
+
+__all__ = [
+    "CONTENT_TYPE_LATEST", "enabled", "stage", "timer", "observe", "count_periods",
+    "count_coefficient_cache", "count_coalescing", "count_executor", "count_invalidation", "request_stages",
+    "TimedRoute", "render"
+]
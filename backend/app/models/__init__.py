@@ -1,3 +1,3 @@
-from app.models.coefficient import Coefficient
+from app.models.coefficient import Coefficient, CoefficientVersion
 
-__all__ = ["Coefficient"]
+__all__ = ["Coefficient", "CoefficientVersion"]
@@ -1,14 +1,24 @@
-from sqlalchemy import Column, Integer, Float, Boolean, DateTime, String
+from sqlalchemy import Column, Integer, Float, Boolean, DateTime, String, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from app.database import Base
 
+# Coefficient tables are reissued by circular each year; rows without an
+# explicit calculation year belong to the current table
+DEFAULT_CALCULATION_YEAR = 2025
+
 
 class Coefficient(Base):
     """Coefficient model for inflation adjustments"""
 
     __tablename__ = "coefficient"
+    __table_args__ = (
+        UniqueConstraint("calculation_year", "year", "month"),
+        # Backs year-range lookups (same index as init.sql)
+        Index("idx_coefficient_year_month", "year", "month"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    calculation_year = Column(Integer, nullable=False, default=DEFAULT_CALCULATION_YEAR, index=True)
     year = Column(Integer, nullable=False, index=True)
     month = Column(Integer, nullable=False, default=1)
     coefficient = Column(Float, nullable=False)
@@ -19,4 +29,14 @@ class Coefficient(Base):
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     def __repr__(self):
-        return f"<Coefficient(year={self.year}, coefficient={self.coefficient})>"
+        return f"<Coefficient(calculation_year={self.calculation_year}, year={self.year}, coefficient={self.coefficient})>"
+
+
+class CoefficientVersion(Base):
+    """Single-row counter bumped by every coefficient import (part of the snapshot version token)"""
+
+    __tablename__ = "coefficient_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,193 @@
+"""
+Fast JSON responses for the hot routes.
+
+Endpoints return json_response(...) instead of a model so FastAPI skips
+response_model validation and jsonable_encoder; the route's response_model
+still documents the body in OpenAPI. Pydantic models are serialized by
+their own (Rust) serializer without re-validation, other content with
+orjson. Bodies above RESPONSE_COMPRESSION_MIN_SIZE are compressed with
+the client's preferred (highest q) encoding among brotli and gzip; brotli
+is in requirements.txt, without it only gzip is offered.
+
+PreparedBody / PreparedBodyCache serve bodies that only change with the
+coefficient snapshot: serialized (and compressed) once per version, with
+an ETag so conditional requests get 304 without building anything.
+"""
+
+import gzip
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # e.g. a dev install without requirements.txt: gzip only
+    brotli = None
+
+GZIP_LEVEL = 1
+BROTLI_QUALITY = 4
+
+
+def encode_json(content: Any) -> bytes:
+    """JSON bytes for a Pydantic model (not re-validated) or orjson-serializable content"""
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    return orjson.dumps(content)
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Accept-Encoding header -> {coding: q}"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def negotiate_encoding(request: Optional[Request]) -> Optional[str]:
+    """Content-Encoding to use for this request: "br", "gzip" or None"""
+    if request is None:
+        return None
+    header = request.headers.get("accept-encoding")
+    if not header:
+        return None
+
+    accepted = _accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    # Highest q wins; on a tie the earlier (smaller output) encoding
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _compress_if_accepted(body: bytes, request: Optional[Request], headers: Dict[str, str]) -> bytes:
+    if len(body) < settings.RESPONSE_COMPRESSION_MIN_SIZE:
+        return body
+    headers["Vary"] = "Accept-Encoding"
+    encoding = negotiate_encoding(request)
+    if encoding is None:
+        return body
+    headers["Content-Encoding"] = encoding
+    return compress(body, encoding)
+
+
+def json_response(
+    content: Any,
+    request: Optional[Request] = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Serialize content once and compress it if the client accepts it and it is large enough"""
+    response_headers = dict(headers or {})
+    body = _compress_if_accepted(encode_json(content), request, response_headers)
+    return Response(content=body, status_code=status_code, headers=response_headers, media_type="application/json")
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match matches etag (weak comparison, as for GET)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any(
+        (tag[2:] if tag.startswith("W/") else tag) == opaque
+        for tag in (part.strip() for part in header.split(","))
+    )
+
+
+class PreparedBody:
+    """A serialized JSON body with its ETag; compressed variants are built once on demand"""
+
+    __slots__ = ("body", "etag", "_encoded")
+
+    def __init__(self, content: Any, etag: str):
+        self.body = encode_json(content)
+        self.etag = etag
+        self._encoded: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = self._encoded[encoding] = compress(self.body, encoding)
+        return body
+
+
+def prepared_response(
+    prepared: PreparedBody,
+    request: Request,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """200 with the prepared body (compressed if accepted)"""
+    response_headers = dict(headers or {})
+    response_headers["ETag"] = prepared.etag
+    body = prepared.body
+    if len(body) >= settings.RESPONSE_COMPRESSION_MIN_SIZE:
+        response_headers["Vary"] = "Accept-Encoding"
+        encoding = negotiate_encoding(request)
+        if encoding is not None:
+            body = prepared.encoded(encoding)
+            response_headers["Content-Encoding"] = encoding
+    return Response(content=body, headers=response_headers, media_type="application/json")
+
+
+def not_modified(etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    response_headers = dict(headers or {})
+    response_headers["ETag"] = etag
+    return Response(status_code=304, headers=response_headers)
+
+
+class PreparedBodyCache:
+    """
+    Prepared bodies for one content version (e.g. the coefficient snapshot
+    version), by key. A new version drops the previous version's bodies.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.version: Optional[str] = None
+        self._bodies: "OrderedDict[Hashable, PreparedBody]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+    def get(self, version: str, key: Hashable, etag: str, build: Callable[[], Any]) -> PreparedBody:
+        """The prepared body for key, serializing build() on first use"""
+        if version != self.version:
+            self._bodies = OrderedDict()
+            self.version = version
+
+        prepared = self._bodies.get(key)
+        if prepared is None:
+            prepared = self._bodies[key] = PreparedBody(build(), etag)
+            if len(self._bodies) > self.maxsize:
+                self._bodies.popitem(last=False)
+        else:
+            self._bodies.move_to_end(key)
+        return prepared
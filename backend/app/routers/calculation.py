@@ -1,20 +1,90 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from app.schemas.calculation_request import CalculationRequest
-from app.schemas.calculation_response import CalculationResponse
+from fastapi import APIRouter, HTTPException, Depends, Request
+from typing import Any, List, Optional, Tuple
+from pydantic import ValidationError
+from app.config import settings
+from app import metrics
+from app.responses import json_response
+from app.schemas.calculation_request import CalculationRequest, BatchCalculationRequest
+from app.schemas.calculation_response import (
+    CalculationResponse, BatchCalculationResponse, BatchItemResult
+)
 from app.services.calculation_engine import CalculationEngine
-from app.services.coefficient_service import CoefficientService
-from app.database import get_db
+from app.services.executor import ExecutorBusy, calculation_executor
+from app.services.coefficient_snapshot import CoefficientSnapshot, get_coefficient_snapshot
+from app.services.result_cache import ResultCache, get_result_cache, calculation_cache_key
+from app.services.single_flight import single_flight
+from app.utils.validation import format_validation_error
 import logging
 
-router = APIRouter()
+router = APIRouter(route_class=metrics.TimedRoute)
 logger = logging.getLogger(__name__)
 
 
+def _calculate(coefficients: CoefficientSnapshot, periods, verbosity, exact) -> CalculationResponse:
+    """Engine call run by the calculation executor (module-level so a process pool can run it)"""
+    return CalculationEngine().calculate(periods, coefficients, verbosity=verbosity, exact=exact)
+
+
+def _calculate_items(
+    coefficients: CoefficientSnapshot,
+    items: List[Any]
+) -> Tuple[List[BatchItemResult], int]:
+    """Validate and calculate batch items one by one; returns (results, failed count)"""
+    engine = CalculationEngine()
+
+    results = []
+    failed = 0
+
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            failed += 1
+            results.append(BatchItemResult(index=index, error=f"Item must be an object, got {type(item).__name__}"))
+            continue
+
+        try:
+            item_request = CalculationRequest.model_validate(item)
+            item_coefficients = coefficients.for_calculation_year(int(item_request.calculation_year))
+            result = engine.calculate(
+                item_request.periods, item_coefficients,
+                verbosity=item_request.verbosity, exact=item_request.exact
+            )
+            results.append(BatchItemResult(index=index, result=result))
+
+        except ValidationError as e:
+            failed += 1
+            results.append(BatchItemResult(index=index, error=format_validation_error(e)))
+
+        except ValueError as e:
+            failed += 1
+            results.append(BatchItemResult(index=index, error=str(e)))
+
+        except Exception as e:
+            failed += 1
+            logger.error(f"Batch item {index} failed: {str(e)}", exc_info=True)
+            results.append(BatchItemResult(index=index, error="Internal server error"))
+
+    return results, failed
+
+
+def _batch_weight(items: List[Any]) -> int:
+    """Number of periods in a batch (what the executor compares to its inline threshold)"""
+    weight = 0
+    for item in items:
+        periods = item.get("periods") if isinstance(item, dict) else None
+        weight += len(periods) if isinstance(periods, list) else 1
+    return weight
+
+
+def _busy(error: ExecutorBusy) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": str(error.retry_after)})
+
+
 @router.post("/calculate", response_model=CalculationResponse)
 async def calculate_bhxh(
     request: CalculationRequest,
-    db: Session = Depends(get_db)
+    http_request: Request,
+    coefficients: CoefficientSnapshot = Depends(get_coefficient_snapshot),
+    cache: Optional[ResultCache] = Depends(get_result_cache)
 ):
     """
     Calculate BHXH one-time payment amount.
@@ -26,23 +96,51 @@ async def calculate_bhxh(
     try:
         logger.info(f"Calculation requested with {len(request.periods)} periods")
 
-        # Get coefficients
-        coeff_service = CoefficientService(db)
-        coefficients = coeff_service.get_all_active()
-
+        # Coefficients come from the in-process snapshot (no DB query)
         if not coefficients:
             raise HTTPException(
                 status_code=400,
                 detail="No active coefficients found. Please contact administrator."
             )
 
-        # Calculate
-        engine = CalculationEngine()
-        result = engine.calculate(request.periods, coefficients)
+        # Table of the requested calculation year (precompiled, no query)
+        coefficients = coefficients.for_calculation_year(int(request.calculation_year))
+
+        # Calculate (identical requests are served from the result cache);
+        # large requests run in the executor pool, off the event loop
+        async def compute() -> CalculationResponse:
+            return await calculation_executor.run(
+                len(request.periods), _calculate, coefficients,
+                request.periods, request.verbosity, request.exact
+            )
+
+        with metrics.stage("handler"):
+            if cache is None and not settings.REQUEST_COALESCING_ENABLED:
+                result = await compute()
+            else:
+                key = calculation_cache_key(
+                    request.periods, coefficients.version, request.verbosity, request.exact
+                )
+
+                async def lookup() -> CalculationResponse:
+                    if cache is None:
+                        return await compute()
+                    return await cache.get_or_compute(key, compute)
+
+                # Concurrent identical requests await one computation
+                if settings.REQUEST_COALESCING_ENABLED:
+                    result = await single_flight.do(key, lookup)
+                else:
+                    result = await lookup()
 
         logger.info(f"Calculation successful: {result.total_amount}")
 
-        return result
+        # The engine's own output needs no response_model re-validation
+        return json_response(result, http_request)
+
+    except ExecutorBusy as e:
+        logger.warning(f"Calculation rejected: {str(e)}")
+        raise _busy(e)
 
     except ValueError as e:
         logger.error(f"Validation error: {str(e)}")
@@ -51,3 +149,50 @@ async def calculate_bhxh(
     except Exception as e:
         logger.error(f"Calculation failed: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/calculate/batch", response_model=BatchCalculationResponse)
+async def calculate_bhxh_batch(
+    request: BatchCalculationRequest,
+    http_request: Request,
+    coefficients: CoefficientSnapshot = Depends(get_coefficient_snapshot)
+):
+    """
+    Calculate BHXH one-time payment amounts for many independent requests.
+
+    The coefficient tables are loaded once for the whole batch. Each item is
+    validated and calculated on its own (with the table of its own
+    calculation_year), so a bad item only produces an error entry for that
+    item instead of failing the batch. Large batches run in the executor
+    pool as one task.
+    """
+    if len(request.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large: {len(request.items)} items (max {settings.BATCH_MAX_ITEMS})"
+        )
+
+    logger.info(f"Batch calculation requested with {len(request.items)} items")
+
+    if not coefficients:
+        raise HTTPException(
+            status_code=400,
+            detail="No active coefficients found. Please contact administrator."
+        )
+
+    try:
+        results, failed = await calculation_executor.run(
+            _batch_weight(request.items), _calculate_items, coefficients, request.items
+        )
+    except ExecutorBusy as e:
+        logger.warning(f"Batch calculation rejected: {str(e)}")
+        raise _busy(e)
+
+    logger.info(f"Batch calculation finished: {len(results) - failed} succeeded, {failed} failed")
+
+    return json_response(BatchCalculationResponse(
+        results=results,
+        succeeded=len(results) - failed,
+        failed=failed
+    ), http_request)
+
@@ -1,53 +1,110 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from typing import List, Optional
+from app.config import settings
+from app.responses import PreparedBodyCache, etag_matches, json_response, not_modified, prepared_response
 from app.schemas.coefficient import CoefficientSchema
-from app.services.coefficient_service import CoefficientService
-from app.database import get_db
+from app.services.coefficient_service import AsyncCoefficientService, row_in_force
+from app.services.coefficient_snapshot import CoefficientSnapshot, get_coefficient_snapshot, get_loaded_snapshot
+from app.database import AsyncSessionLocal
 
 router = APIRouter()
 
+# Serialized bodies of the current snapshot version, by route and arguments
+_bodies = PreparedBodyCache()
 
-@router.get("/coefficients", response_model=List[CoefficientSchema])
-async def get_coefficients(db: Session = Depends(get_db)):
-    """Get all active inflation coefficients"""
-    coeff_service = CoefficientService(db)
-    coefficients = coeff_service.get_all_active()
-    return coefficients
 
+def _coefficient_dict(coefficient) -> dict:
+    """CoefficientSchema fields of a row (model or snapshot row), ready for json_response"""
+    return {name: getattr(coefficient, name) for name in CoefficientSchema.model_fields}
 
-@router.get("/coefficients/{year}", response_model=CoefficientSchema)
-async def get_coefficient_by_year(
-    year: int,
-    db: Session = Depends(get_db)
+
+def _cache_headers() -> dict:
+    return {"Cache-Control": f"public, max-age={settings.COEFFICIENT_CACHE_MAX_AGE}"}
+
+
+@router.get("/coefficients", response_model=List[CoefficientSchema])
+async def get_coefficients(
+    request: Request,
+    snapshot: CoefficientSnapshot = Depends(get_coefficient_snapshot)
 ):
-    """Get coefficient for a specific year"""
-    coeff_service = CoefficientService(db)
-    coefficient = coeff_service.get_by_year(year)
+    """
+    Get all active inflation coefficients.
 
-    if not coefficient:
-        raise HTTPException(
-            status_code=404,
-            detail=f"No coefficient found for year {year}"
-        )
+    Served from the coefficient snapshot with an ETag of its version:
+    If-None-Match gets 304, and the body is serialized once per version.
+    """
+    etag = f'W/"{snapshot.version}"'
+    if etag_matches(request, etag):
+        return not_modified(etag, _cache_headers())
 
-    return coefficient
+    prepared = _bodies.get(
+        snapshot.version, "all", etag, lambda: [_coefficient_dict(row) for row in snapshot.rows]
+    )
+    return prepared_response(prepared, request, _cache_headers())
 
 
+# Declared before /coefficients/{year}, which would otherwise take "range" for a year
 @router.get("/coefficients/range", response_model=List[CoefficientSchema])
 async def get_coefficients_by_range(
+    request: Request,
     start_year: int = Query(..., description="Start year"),
     end_year: int = Query(..., description="End year"),
-    db: Session = Depends(get_db)
+    snapshot: Optional[CoefficientSnapshot] = Depends(get_loaded_snapshot)
 ):
-    """Get coefficients for a year range"""
+    """
+    Get coefficients for a year range.
+
+    Served from the coefficient snapshot (a bisected slice per table, with
+    an ETag and a prepared body per range); a database session is only
+    opened while no snapshot is loaded.
+    """
     if start_year > end_year:
         raise HTTPException(
             status_code=400,
             detail="Start year must be less than or equal to end year"
         )
 
-    coeff_service = CoefficientService(db)
-    coefficients = coeff_service.get_by_year_range(start_year, end_year)
+    if snapshot is None:
+        async with AsyncSessionLocal() as db:
+            coefficients = await AsyncCoefficientService(db).get_by_year_range(start_year, end_year)
+        return json_response([_coefficient_dict(c) for c in coefficients], request)
+
+    etag = f'W/"{snapshot.version}-{start_year}-{end_year}"'
+    if etag_matches(request, etag):
+        return not_modified(etag, _cache_headers())
+
+    prepared = _bodies.get(
+        snapshot.version, ("range", start_year, end_year), etag,
+        lambda: [_coefficient_dict(row) for row in snapshot.rows_in_year_range(start_year, end_year)]
+    )
+    return prepared_response(prepared, request, _cache_headers())
+
+
+@router.get("/coefficients/{year}", response_model=CoefficientSchema)
+async def get_coefficient_by_year(
+    request: Request,
+    year: int,
+    month: Optional[int] = Query(None, ge=1, le=12, description="Month (default: the coefficient in force in January)"),
+    snapshot: CoefficientSnapshot = Depends(get_coefficient_snapshot)
+):
+    """Get the coefficient in force for a specific year, or a month of it (cached like /coefficients)"""
+    etag = f'W/"{snapshot.version}-{year}-{month or 0}"'
+    if etag_matches(request, etag):
+        return not_modified(etag, _cache_headers())
+
+    # A year without coefficients is cached too, as a null body
+    prepared = _bodies.get(snapshot.version, (year, month), etag, lambda: _year_body(snapshot, year, month))
+    if prepared.body == b"null":
+        raise HTTPException(
+            status_code=404,
+            detail=f"No coefficient found for year {year}"
+        )
+
+    return prepared_response(prepared, request, _cache_headers())
+
 
-    return coefficients
+def _year_body(snapshot: CoefficientSnapshot, year: int, month: Optional[int]) -> Optional[dict]:
+    """Row in force for year/month, as CoefficientService.get_by_year would pick it"""
+    rows = sorted(snapshot.rows_in_year_range(year, year), key=lambda row: (-row.calculation_year, row.month))
+    coefficient = row_in_force(rows, month)
+    return _coefficient_dict(coefficient) if coefficient is not None else None
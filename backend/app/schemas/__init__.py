@@ -1,14 +1,20 @@
 from app.schemas.period import PeriodSchema
-from app.schemas.calculation_request import CalculationRequest
-from app.schemas.calculation_response import CalculationResponse, PeriodBreakdown, FormulaExplanation, Step
+from app.schemas.calculation_request import CalculationRequest, BatchCalculationRequest
+from app.schemas.calculation_response import (
+    CalculationResponse, PeriodBreakdown, FormulaExplanation, Step,
+    BatchItemResult, BatchCalculationResponse
+)
 from app.schemas.coefficient import CoefficientSchema
 
 __all__ = [
     "PeriodSchema",
     "CalculationRequest",
+    "BatchCalculationRequest",
     "CalculationResponse",
     "PeriodBreakdown",
     "FormulaExplanation",
     "Step",
+    "BatchItemResult",
+    "BatchCalculationResponse",
     "CoefficientSchema"
 ]
@@ -1,39 +1,70 @@
-from pydantic import BaseModel, Field, model_validator
-from typing import List
-from datetime import datetime
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Any, Literal
+from operator import itemgetter
 from app.schemas.period import PeriodSchema
+from app import metrics
+
+# How much detail a calculation returns:
+# - summary: totals only (total_amount, average_salary, total_months)
+# - breakdown: totals + period_breakdowns
+# - full: totals + period_breakdowns + step-by-step explanation
+Verbosity = Literal["summary", "breakdown", "full"]
 
 
 class CalculationRequest(BaseModel):
     """Request schema for BHXH calculation"""
 
     periods: List[PeriodSchema] = Field(..., min_length=1, description="List of contribution periods")
-    calculation_year: str = Field(default="2025", description="Year to use for coefficients")
+    calculation_year: str = Field(
+        default="2025",
+        description="Year to use for coefficients: the latest coefficient table issued in or before this year"
+    )
+    verbosity: Verbosity = Field(
+        default="full",
+        description="Response detail: summary (totals only), breakdown (plus period breakdowns) or full (plus explanation)"
+    )
+    exact: bool = Field(
+        default=False,
+        description="Integer-đồng arithmetic with the rounding of the official BHXH worksheet"
+    )
+
+    @field_validator('calculation_year')
+    @classmethod
+    def validate_calculation_year(cls, v: str) -> str:
+        """Calculation year must be a 4-digit year"""
+        v = v.strip()
+        if not (len(v) == 4 and v.isascii() and v.isdigit()):
+            raise ValueError('Calculation year must be a 4-digit year (e.g., 2025)')
+        return v
+
+    @model_validator(mode='wrap')
+    @classmethod
+    def time_validation(cls, data, handler):
+        """Record request validation time when metrics are enabled"""
+        if not metrics.enabled:
+            return handler(data)
+        with metrics.stage("validation"):
+            return handler(data)
 
     @model_validator(mode='after')
     def validate_periods(self):
         """Validate periods don't overlap and dates are valid"""
-        periods = self.periods
+        # Dates were parsed once by PeriodSchema; compare the cached keys
+        keys = [period.date_keys for period in self.periods]
 
-        # Sort periods by start date
-        sorted_periods = sorted(periods, key=lambda p: datetime.strptime(p.start_date, '%Y-%m-%d'))
-
-        # Check for overlaps and validate date ranges
-        for i, period in enumerate(sorted_periods):
-            start = datetime.strptime(period.start_date, '%Y-%m-%d')
-            end = datetime.strptime(period.end_date, '%Y-%m-%d')
+        # Sort periods by start date (stable, like sorting the periods themselves)
+        keys.sort(key=itemgetter(0))
 
+        # Check for overlaps and validate date ranges in one sweep
+        last = len(keys) - 1
+        for i, (start, end) in enumerate(keys):
             # Check end is after start
             if end <= start:
                 raise ValueError(f'Period {i+1}: End date must be after start date')
 
             # Check for overlap with next period
-            if i < len(sorted_periods) - 1:
-                next_period = sorted_periods[i + 1]
-                next_start = datetime.strptime(next_period.start_date, '%Y-%m-%d')
-
-                if end >= next_start:
-                    raise ValueError(f'Periods {i+1} and {i+2} overlap')
+            if i < last and end >= keys[i + 1][0]:
+                raise ValueError(f'Periods {i+1} and {i+2} overlap')
 
         return self
 
@@ -55,3 +86,41 @@ class CalculationRequest(BaseModel):
                 "calculation_year": "2025"
             }
         }
+
+
+class BatchCalculationRequest(BaseModel):
+    """Request schema for batch BHXH calculation (e.g. a whole employee roster)"""
+
+    items: List[Any] = Field(
+        ...,
+        min_length=1,
+        description="Independent calculation requests, each with the same shape as CalculationRequest. "
+                    "Items are validated one by one so an invalid item (even one that is not an object) "
+                    "does not fail the batch."
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {
+                        "periods": [
+                            {
+                                "start_date": "01/2021",
+                                "end_date": "12/2023",
+                                "monthly_salary": 6000000
+                            }
+                        ]
+                    },
+                    {
+                        "periods": [
+                            {
+                                "start_date": "01/2010",
+                                "end_date": "12/2015",
+                                "monthly_salary": 5000000
+                            }
+                        ]
+                    }
+                ]
+            }
+        }
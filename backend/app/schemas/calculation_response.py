@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -28,6 +28,14 @@ class PeriodBreakdown(BaseModel):
     multiplier: float
     amount: float
     is_pre_2014: bool
+    first_period_index: Optional[int] = Field(
+        default=None,
+        description="Index (0-based) of the first request period this row covers"
+    )
+    last_period_index: Optional[int] = Field(
+        default=None,
+        description="Index of the last request period this row covers (adjacent same-salary periods are merged)"
+    )
 
 
 class CalculationResponse(BaseModel):
@@ -35,8 +43,14 @@ class CalculationResponse(BaseModel):
     total_amount: float = Field(..., description="Total BHXH amount to receive")
     average_salary: float = Field(..., description="Average adjusted monthly salary (Mbqtl)")
     total_months: int = Field(..., description="Total months of contribution")
-    period_breakdowns: List[PeriodBreakdown] = Field(..., description="Detailed breakdown per period")
-    explanation: FormulaExplanation = Field(..., description="Step-by-step calculation explanation")
+    period_breakdowns: Optional[List[PeriodBreakdown]] = Field(
+        default=None,
+        description="Detailed breakdown per period (omitted for verbosity=summary)"
+    )
+    explanation: Optional[FormulaExplanation] = Field(
+        default=None,
+        description="Step-by-step calculation explanation (only for verbosity=full)"
+    )
     calculated_at: str = Field(default_factory=lambda: datetime.now().isoformat())
 
     class Config:
@@ -72,3 +86,17 @@ class CalculationResponse(BaseModel):
                 "calculated_at": "2025-12-25T10:30:00"
             }
         }
+
+
+class BatchItemResult(BaseModel):
+    """Result of a single item in a batch calculation"""
+    index: int = Field(..., description="Position of the item in the request")
+    result: Optional[CalculationResponse] = Field(default=None, description="Calculation result if successful")
+    error: Optional[str] = Field(default=None, description="Error message if the item failed")
+
+
+class BatchCalculationResponse(BaseModel):
+    """Response schema for batch BHXH calculation"""
+    results: List[BatchItemResult] = Field(..., description="Per-item results in request order")
+    succeeded: int = Field(..., description="Number of items calculated successfully")
+    failed: int = Field(..., description="Number of items that failed")
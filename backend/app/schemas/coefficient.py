@@ -5,6 +5,7 @@ from datetime import datetime
 class CoefficientSchema(BaseModel):
     """Schema for coefficient data"""
     id: int
+    calculation_year: int
     year: int
     month: int
     coefficient: float
@@ -17,6 +18,7 @@ class CoefficientSchema(BaseModel):
         json_schema_extra = {
             "example": {
                 "id": 1,
+                "calculation_year": 2025,
                 "year": 2024,
                 "month": 1,
                 "coefficient": 1.00,
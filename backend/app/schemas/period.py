@@ -1,7 +1,6 @@
-from pydantic import BaseModel, Field, field_validator, model_validator
-from datetime import datetime
-from calendar import monthrange
-from typing import Optional
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
+from typing import Optional, Tuple
+from app.utils.month_index import normalize_input_date, format_month_end
 
 
 class PeriodSchema(BaseModel):
@@ -11,6 +10,13 @@ class PeriodSchema(BaseModel):
     end_date: str = Field(..., description="End month in MM/YYYY format (e.g., 12/2021)")
     monthly_salary: float = Field(..., gt=0, description="Monthly salary amount")
 
+    # (start_date, end_date, (start_month, end_month, start_key, end_key)):
+    # month indexes, and ints that order like the dates. Computed on first
+    # use and reused by request validation and the engine while the two
+    # date strings are unchanged, so model_copy() and model_construct()
+    # never see stale values.
+    _parsed: Optional[Tuple[str, str, Tuple[int, int, int, int]]] = PrivateAttr(None)
+
     @field_validator('start_date', 'end_date')
     @classmethod
     def validate_and_convert_date_format(cls, v: str) -> str:
@@ -19,38 +25,48 @@ class PeriodSchema(BaseModel):
         Accepts: MM/YYYY (e.g., 01/2021)
         Converts to: YYYY-MM-DD for internal use
         """
-        # Try MM/YYYY format first
-        try:
-            date_obj = datetime.strptime(v, '%m/%Y')
-            # Convert to YYYY-MM-DD format
-            # For start date: use day 1
-            # For end date: use last day of month (will be handled in model_validator)
-            return date_obj.strftime('%Y-%m-01')
-        except ValueError:
-            pass
-
-        # Also accept YYYY-MM-DD format for backward compatibility
-        try:
-            datetime.strptime(v, '%Y-%m-%d')
-            return v
-        except ValueError:
-            raise ValueError('Date must be in MM/YYYY format (e.g., 01/2021) or YYYY-MM-DD format')
+        return normalize_input_date(v)
 
-    @model_validator(mode='after')
-    def adjust_end_date_to_last_day(self):
+    @field_validator('end_date')
+    @classmethod
+    def adjust_end_date_to_last_day(cls, v: str) -> str:
         """Adjust end_date to be the last day of the month"""
-        # Parse the end_date
-        end_date_obj = datetime.strptime(self.end_date, '%Y-%m-%d')
+        # Normalized YYYY-MM-DD here, so fixed offsets are safe
+        return format_month_end(int(v[0:4]) * 12 + int(v[5:7]) - 1)
+
+    def _parse(self) -> Tuple[int, int, int, int]:
+        start, end = self.start_date, self.end_date
+        private = self.__pydantic_private__
+        cached = private.get('_parsed') if private is not None else None
+        if cached is not None and cached[0] is start and cached[1] is end:
+            return cached[2]
+
+        start_month = int(start[0:4]) * 12 + int(start[5:7]) - 1
+        end_month = int(end[0:4]) * 12 + int(end[5:7]) - 1
+        parsed = (
+            start_month,
+            end_month,
+            start_month * 32 + int(start[8:10]),
+            end_month * 32 + int(end[8:10])
+        )
+        if private is not None:
+            private['_parsed'] = (start, end, parsed)
+        return parsed
 
-        # Get the last day of the month
-        year = end_date_obj.year
-        month = end_date_obj.month
-        last_day = monthrange(year, month)[1]
+    @property
+    def start_month(self) -> int:
+        """Month index of start_date (see app.utils.month_index)"""
+        return self._parse()[0]
 
-        # Update end_date to last day of month
-        self.end_date = f"{year:04d}-{month:02d}-{last_day:02d}"
+    @property
+    def end_month(self) -> int:
+        """Month index of end_date"""
+        return self._parse()[1]
 
-        return self
+    @property
+    def date_keys(self) -> Tuple[int, int]:
+        """(start, end) as ints that compare like the dates themselves"""
+        return self._parse()[2:]
 
     @field_validator('monthly_salary')
     @classmethod
@@ -1,30 +1,87 @@
+from bisect import bisect_right
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Union
 from app.schemas.period import PeriodSchema
+from app.schemas.calculation_request import Verbosity
 from app.schemas.calculation_response import (
     CalculationResponse, PeriodBreakdown, FormulaExplanation, Step
 )
 from app.models.coefficient import Coefficient
+from app import metrics
+from app.services.coefficient_snapshot import CoefficientSnapshot, COEFFICIENT_SCALE
+from app.services.period_span import PeriodSpan
+from app.utils.month_index import (
+    month_index, index_year, months_between,
+    format_month_display
+)
+
+Coefficients = Union[List[Coefficient], CoefficientSnapshot]
 
 
 class CalculationEngine:
     """Core calculation engine for BHXH one-time payment"""
 
     CUTOFF_DATE = datetime(2014, 1, 1)
+    CUTOFF_MONTH = month_index(2014, 1)
     MULTIPLIER_PRE_2014 = 1.5
     MULTIPLIER_FROM_2014 = 2.0
+    RATE_UNDER_1_YEAR = 0.22
+
+    # Exact mode: the same rates as integer percentages
+    PERCENT_PRE_2014 = 150
+    PERCENT_FROM_2014 = 200
+    PERCENT_UNDER_1_YEAR = 22
 
     def __init__(self):
         self.coefficients_cache: Dict[int, float] = {}
+        self.coefficients: CoefficientSnapshot = CoefficientSnapshot(())
+
+    def load_coefficients(self, coefficients: Coefficients):
+        """
+        Load the coefficient table once so that subsequent calculate() calls
+        without coefficients reuse it (used by batch calculation)
+        """
+        self._build_coefficient_cache(coefficients)
 
     def calculate(
         self,
-        periods: List[PeriodSchema],
-        coefficients: List[Coefficient]
+        periods: List[Union[PeriodSchema, PeriodSpan]],
+        coefficients: Optional[Coefficients] = None,
+        breakdown_by_year: bool = True,
+        verbosity: Verbosity = "full",
+        compact: bool = True,
+        exact: bool = False
     ) -> CalculationResponse:
         """
         Calculate BHXH one-time payment amount
 
+        If coefficients is None, the table previously passed to
+        load_coefficients() is used. periods may be validated PeriodSchemas
+        or PeriodSpans built by the caller.
+
+        Totals are computed per period and era with O(1) coefficient sums
+        from the snapshot's prefix-sum index. breakdown_by_year only controls
+        the detail view: one breakdown row per calendar year (default) or one
+        per period and era.
+
+        verbosity selects what is built besides the totals: "summary" builds
+        neither breakdowns nor explanation, "breakdown" builds only the
+        breakdowns, "full" builds both.
+
+        With compact (default), consecutive input periods that continue each
+        other at the same whole-đồng salary are merged first, so month-per-row
+        input costs as much as its number of salary changes. Totals are
+        identical either way; breakdown rows report the input rows they cover.
+
+        With exact, everything is computed in integers (đồng, and
+        coefficients in COEFFICIENT_SCALE units) and rounded only where the
+        official BHXH worksheet rounds:
+        1. salaries are rounded half up to whole đồng;
+        2. Σ(adjusted_salary × months) is kept exact;
+        3. Mbqtl is truncated to whole đồng;
+        4. each era amount (and the under-1-year amount) is rounded half up
+           to whole đồng, and the total is their sum.
+
         Formula:
         - If total_months < 12:
             Amount = min(22% × Σ(adjusted_salary), 2 × Mbqtl)
@@ -33,79 +90,106 @@ class CalculationEngine:
 
         Where Mbqtl = Σ(adjusted_salary × months) / Σ(months)
         """
+        timer = metrics.timer()
+
         # Build coefficient lookup
-        self._build_coefficient_cache(coefficients)
+        if coefficients is not None:
+            self._build_coefficient_cache(coefficients)
 
-        # Split periods that cross the 2014 cutoff
-        split_periods = self._split_periods_by_cutoff(periods)
+        # Internal spans from the month indexes parsed during validation
+        spans = self._to_spans(periods)
+        if compact:
+            spans = self._compact_spans(spans)
 
-        # Calculate adjusted salaries and months for each period
-        period_data = []
-        total_adjusted_salary_months = 0.0
+        # Split periods that cross the 2014 cutoff
+        era_periods = self._split_periods_by_cutoff(spans)
+        timer.lap("split")
+
+        # Accumulate months and adjusted salaries per period and era.
+        # Whole-đồng salaries accumulate as exact integers, so the total does
+        # not depend on how periods are grouped (see _compact_spans)
+        exact_adjusted_units = 0
+        total_adjusted_units = 0.0
         total_months = 0
         total_months_pre_2014 = 0
         total_months_from_2014 = 0
 
-        for period in split_periods:
-            start_date = datetime.strptime(period.start_date, '%Y-%m-%d')
-            end_date = datetime.strptime(period.end_date, '%Y-%m-%d')
+        for span in era_periods:
+            start_month, end_month = span.start_month, span.end_month
 
             # Calculate months
-            months = self._calculate_months(start_date, end_date)
+            months = months_between(start_month, end_month)
             total_months += months
 
             # Track months by era
-            is_pre_2014 = end_date < self.CUTOFF_DATE
-            if is_pre_2014:
+            if end_month < self.CUTOFF_MONTH:
                 total_months_pre_2014 += months
             else:
                 total_months_from_2014 += months
 
-            # Get average coefficient for the period (weighted if spans multiple years)
-            avg_coefficient = self._get_period_coefficient(start_date, end_date)
+            # Σ(coefficient) over the period's months in O(1), in scaled
+            # integer units, so we divide by the scale only once
+            salary = span.monthly_salary
+            units = self.coefficients.coefficient_units(start_month, end_month)
+            if salary % 1 == 0:
+                exact_adjusted_units += int(salary) * units
+            elif exact:
+                # Rounding point 1: salaries to whole đồng, half up
+                exact_adjusted_units += int(salary + 0.5) * units
+            else:
+                total_adjusted_units += salary * units
 
-            # Calculate adjusted salary
-            adjusted_salary = period.monthly_salary * avg_coefficient
+        total_adjusted_salary_months = (exact_adjusted_units + total_adjusted_units) / COEFFICIENT_SCALE
+        timer.lap("accumulate")
 
-            # Accumulate
-            total_adjusted_salary_months += adjusted_salary * months
+        # Only build the detail objects the caller will get back
+        explain = verbosity == "full"
+        with_breakdown = explain or verbosity == "breakdown"
 
-            period_data.append({
-                'period': period,
-                'start_date': start_date,
-                'end_date': end_date,
-                'months': months,
-                'coefficient': avg_coefficient,
-                'adjusted_salary': adjusted_salary,
-                'is_pre_2014': is_pre_2014
-            })
+        # Detail view rows (optionally one per calendar year)
+        period_data = []
+        if with_breakdown:
+            detail_periods = self._split_periods_by_year(era_periods) if breakdown_by_year else era_periods
+            period_data = [self._fragment_data(span) for span in detail_periods]
+        timer.lap("breakdown")
+
+        metrics.count_periods(
+            len(periods),
+            len(era_periods),
+            len(period_data) if with_breakdown and breakdown_by_year else 0
+        )
 
         # Calculate Mbqtl (average adjusted salary)
-        mbqtl = total_adjusted_salary_months / total_months
+        if exact:
+            # Rounding point 3: Mbqtl truncated to whole đồng
+            mbqtl = float(exact_adjusted_units // (total_months * COEFFICIENT_SCALE))
+        else:
+            mbqtl = total_adjusted_salary_months / total_months
 
         # Prepare explanation steps
         explanation_steps = []
         step_number = 1
 
         # Step 1: Show coefficient adjustments for each period
-        for i, data in enumerate(period_data):
-            period = data['period']
-            start_str = data['start_date'].strftime('%m/%Y')
-            end_str = data['end_date'].strftime('%m/%Y')
+        for i, data in enumerate(period_data if explain else ()):
+            start_str = format_month_display(data['start_month'])
+            end_str = format_month_display(data['end_month'])
             explanation_steps.append(Step(
                 step=step_number,
                 description="Điều chỉnh lương theo hệ số trượt giá",
-                calculation=f"Giai đoạn từ {start_str} đến {end_str}: {self._format_currency(period.monthly_salary)} × {data['coefficient']:.2f} × {data['months']} tháng = {self._format_currency(data['adjusted_salary'] * data['months'])}"
+                calculation=f"Giai đoạn từ {start_str} đến {end_str}: {self._format_currency(data['monthly_salary'])} × {data['coefficient']:.2f} × {data['months']} tháng = {self._format_currency(data['adjusted_salary'] * data['months'])}"
             ))
             step_number += 1
+        timer.lap("explanation")
 
         # Step 2: Calculate Mbqtl
-        explanation_steps.append(Step(
-            step=step_number,
-            description="Tính mức bình quân tiền lương tháng đóng BHXH (Mbqtl)",
-            calculation=f"Mbqtl = {self._format_currency(total_adjusted_salary_months)} ÷ {total_months} tháng = {self._format_currency(mbqtl)}"
-        ))
-        step_number += 1
+        if explain:
+            explanation_steps.append(Step(
+                step=step_number,
+                description="Tính mức bình quân tiền lương tháng đóng BHXH (Mbqtl)",
+                calculation=f"Mbqtl = {self._format_currency(total_adjusted_salary_months)} ÷ {total_months} tháng = {self._format_currency(mbqtl)}"
+            ))
+            step_number += 1
 
         # Calculate total amount based on total months
         total_amount = 0.0
@@ -114,30 +198,38 @@ class CalculationEngine:
         if total_months < 12:
             # Special case: less than 1 year
             # Mức hưởng = 22% × tổng tiền lương đã điều chỉnh, tối đa 2 × Mbqtl
-            amount_22_percent = 0.22 * total_adjusted_salary_months
+            if exact:
+                amount_22_percent = float(self._round_half_up(
+                    exact_adjusted_units * self.PERCENT_UNDER_1_YEAR, 100 * COEFFICIENT_SCALE
+                ))
+            else:
+                amount_22_percent = self.RATE_UNDER_1_YEAR * total_adjusted_salary_months
             max_amount = 2 * mbqtl
             total_amount = min(amount_22_percent, max_amount)
 
-            explanation_steps.append(Step(
-                step=step_number,
-                description="Thời gian đóng BHXH dưới 1 năm - Áp dụng công thức đặc biệt",
-                calculation=f"Mức hưởng = min(22% × {self._format_currency(total_adjusted_salary_months)}, 2 × {self._format_currency(mbqtl)}) = {self._format_currency(total_amount)}"
-            ))
-            step_number += 1
+            if explain:
+                explanation_steps.append(Step(
+                    step=step_number,
+                    description="Thời gian đóng BHXH dưới 1 năm - Áp dụng công thức đặc biệt",
+                    calculation=f"Mức hưởng = min(22% × {self._format_currency(total_adjusted_salary_months)}, 2 × {self._format_currency(mbqtl)}) = {self._format_currency(total_amount)}"
+                ))
+                step_number += 1
 
             # Create single breakdown for display
             for data in period_data:
                 period_breakdowns.append(PeriodBreakdown(
-                    start_date=data['period'].start_date,
-                    end_date=data['period'].end_date,
+                    start_date=data['start_date'],
+                    end_date=data['end_date'],
                     months=data['months'],
                     years=round(data['months'] / 12, 2),
-                    original_salary=data['period'].monthly_salary,
+                    original_salary=data['monthly_salary'],
                     coefficient=data['coefficient'],
                     adjusted_salary=round(data['adjusted_salary'], 2),
-                    multiplier=0.22,  # Special multiplier for < 1 year
+                    multiplier=self.RATE_UNDER_1_YEAR,  # Special multiplier for < 1 year
                     amount=0,  # Will show total in summary
-                    is_pre_2014=data['is_pre_2014']
+                    is_pre_2014=data['is_pre_2014'],
+                    first_period_index=data['first_period_index'],
+                    last_period_index=data['last_period_index']
                 ))
 
         else:
@@ -151,26 +243,34 @@ class CalculationEngine:
             amount_from_2014 = 0.0
 
             if years_pre_2014 > 0:
-                amount_pre_2014 = self.MULTIPLIER_PRE_2014 * mbqtl * years_pre_2014
+                if exact:
+                    amount_pre_2014 = self._exact_era_amount(mbqtl, self.PERCENT_PRE_2014, years_pre_2014)
+                else:
+                    amount_pre_2014 = self.MULTIPLIER_PRE_2014 * mbqtl * years_pre_2014
                 total_amount += amount_pre_2014
 
-                explanation_steps.append(Step(
-                    step=step_number,
-                    description="Tính số tiền giai đoạn trước 2014",
-                    calculation=f"{self.MULTIPLIER_PRE_2014} × {self._format_currency(mbqtl)} × {years_pre_2014} năm = {self._format_currency(amount_pre_2014)}"
-                ))
-                step_number += 1
+                if explain:
+                    explanation_steps.append(Step(
+                        step=step_number,
+                        description="Tính số tiền giai đoạn trước 2014",
+                        calculation=f"{self.MULTIPLIER_PRE_2014} × {self._format_currency(mbqtl)} × {years_pre_2014} năm = {self._format_currency(amount_pre_2014)}"
+                    ))
+                    step_number += 1
 
             if years_from_2014 > 0:
-                amount_from_2014 = self.MULTIPLIER_FROM_2014 * mbqtl * years_from_2014
+                if exact:
+                    amount_from_2014 = self._exact_era_amount(mbqtl, self.PERCENT_FROM_2014, years_from_2014)
+                else:
+                    amount_from_2014 = self.MULTIPLIER_FROM_2014 * mbqtl * years_from_2014
                 total_amount += amount_from_2014
 
-                explanation_steps.append(Step(
-                    step=step_number,
-                    description="Tính số tiền giai đoạn từ 2014",
-                    calculation=f"{self.MULTIPLIER_FROM_2014} × {self._format_currency(mbqtl)} × {years_from_2014} năm = {self._format_currency(amount_from_2014)}"
-                ))
-                step_number += 1
+                if explain:
+                    explanation_steps.append(Step(
+                        step=step_number,
+                        description="Tính số tiền giai đoạn từ 2014",
+                        calculation=f"{self.MULTIPLIER_FROM_2014} × {self._format_currency(mbqtl)} × {years_from_2014} năm = {self._format_currency(amount_from_2014)}"
+                    ))
+                    step_number += 1
 
             # Create breakdowns for each period
             for data in period_data:
@@ -179,109 +279,169 @@ class CalculationEngine:
 
                 # Proportional amount for this period (for display purposes)
                 if data['is_pre_2014'] and years_pre_2014 > 0:
-                    period_amount = (data['months'] / total_months_pre_2014) * amount_pre_2014
+                    era_months, era_amount = total_months_pre_2014, amount_pre_2014
                 elif not data['is_pre_2014'] and years_from_2014 > 0:
-                    period_amount = (data['months'] / total_months_from_2014) * amount_from_2014
+                    era_months, era_amount = total_months_from_2014, amount_from_2014
                 else:
+                    era_months, era_amount = 0, 0
+
+                if not era_months:
                     period_amount = 0
+                elif exact:
+                    period_amount = self._round_half_up(data['months'] * int(era_amount), era_months)
+                else:
+                    period_amount = (data['months'] / era_months) * era_amount
 
                 period_breakdowns.append(PeriodBreakdown(
-                    start_date=data['period'].start_date,
-                    end_date=data['period'].end_date,
+                    start_date=data['start_date'],
+                    end_date=data['end_date'],
                     months=data['months'],
                     years=round(years, 2),
-                    original_salary=data['period'].monthly_salary,
+                    original_salary=data['monthly_salary'],
                     coefficient=data['coefficient'],
                     adjusted_salary=round(data['adjusted_salary'], 2),
                     multiplier=multiplier,
                     amount=round(period_amount, 2),
-                    is_pre_2014=data['is_pre_2014']
+                    is_pre_2014=data['is_pre_2014'],
+                    first_period_index=data['first_period_index'],
+                    last_period_index=data['last_period_index']
                 ))
 
-        # Final step: Total
-        explanation_steps.append(Step(
-            step=step_number,
-            description="Tổng số tiền BHXH một lần được nhận",
-            calculation=f"Tổng = {self._format_currency(total_amount)}"
-        ))
-
-        # Create explanation
-        explanation = FormulaExplanation(
-            formula="Mức hưởng = (1.5 × Mbqtl × Năm trước 2014) + (2.0 × Mbqtl × Năm từ 2014)",
-            steps=explanation_steps
-        )
+        explanation = None
+        if explain:
+            # Final step: Total
+            explanation_steps.append(Step(
+                step=step_number,
+                description="Tổng số tiền BHXH một lần được nhận",
+                calculation=f"Tổng = {self._format_currency(total_amount)}"
+            ))
 
-        return CalculationResponse(
+            # Create explanation
+            explanation = FormulaExplanation(
+                formula="Mức hưởng = (1.5 × Mbqtl × Năm trước 2014) + (2.0 × Mbqtl × Năm từ 2014)",
+                steps=explanation_steps
+            )
+
+        response = CalculationResponse(
             total_amount=round(total_amount, 2),
             average_salary=round(mbqtl, 2),
             total_months=total_months,
-            period_breakdowns=period_breakdowns,
+            period_breakdowns=period_breakdowns if with_breakdown else None,
             explanation=explanation
         )
+        timer.lap("response_model")
+
+        return response
 
-    def _split_periods_by_cutoff(self, periods: List[PeriodSchema]) -> List[PeriodSchema]:
-        """Split periods that cross the 2014 cutoff date AND by calendar year for proper coefficient calculation"""
-        # First split by year to ensure each year gets its own coefficient
-        year_split_periods = self._split_periods_by_year(periods)
+    def _to_spans(self, periods: List[Union[PeriodSchema, PeriodSpan]]) -> List[PeriodSpan]:
+        """Convert validated periods into engine-internal spans (no re-validation)"""
+        return [
+            period if isinstance(period, PeriodSpan) else PeriodSpan.from_schema(period, index)
+            for index, period in enumerate(periods)
+        ]
 
-        # Then split by 2014 cutoff for era classification
+    def _compact_spans(self, spans: List[PeriodSpan]) -> List[PeriodSpan]:
+        """
+        Run-length merge consecutive spans (in input order) where each starts
+        the month after the previous one ends, at the same salary.
+
+        Only whole-đồng salaries are merged: their adjusted totals are exact
+        integers, so merging cannot change the result. Other spans are kept
+        as they are.
+        """
         result = []
-        for period in year_split_periods:
-            start_date = datetime.strptime(period.start_date, '%Y-%m-%d')
-            end_date = datetime.strptime(period.end_date, '%Y-%m-%d')
+        run_start = run_end = None
+
+        for span in spans:
+            if run_end is not None and span.continues(run_end) and span.monthly_salary % 1 == 0:
+                run_end = span
+                continue
+
+            if run_start is not None:
+                result.append(run_start if run_start is run_end else run_start.merge(run_end))
+            run_start = run_end = span
+
+        if run_start is not None:
+            result.append(run_start if run_start is run_end else run_start.merge(run_end))
+
+        return result
 
+    def _split_periods_by_cutoff(self, spans: List[PeriodSpan]) -> List[PeriodSpan]:
+        """Split periods that cross the 2014 cutoff date (era classification)"""
+        cutoff = self.CUTOFF_MONTH
+        result = []
+        for span in spans:
             # If period doesn't cross cutoff, keep as is
-            if end_date < self.CUTOFF_DATE or start_date >= self.CUTOFF_DATE:
-                result.append(period)
+            if span.end_month < cutoff or span.start_month >= cutoff:
+                result.append(span)
             else:
-                # Split into two periods
-                # Period 1: start_date to 2013-12-31
-                cutoff_end = datetime(2013, 12, 31)
-                result.append(PeriodSchema(
-                    start_date=period.start_date,
-                    end_date=cutoff_end.strftime('%Y-%m-%d'),
-                    monthly_salary=period.monthly_salary
-                ))
-
-                # Period 2: 2014-01-01 to end_date
-                result.append(PeriodSchema(
-                    start_date=self.CUTOFF_DATE.strftime('%Y-%m-%d'),
-                    end_date=period.end_date,
-                    monthly_salary=period.monthly_salary
-                ))
+                # Split into two periods: start..12/2013 and 01/2014..end
+                result.append(span.slice(span.start_month, cutoff - 1))
+                result.append(span.slice(cutoff, span.end_month))
 
         return result
 
-    def _split_periods_by_year(self, periods: List[PeriodSchema]) -> List[PeriodSchema]:
-        """Split periods that span multiple calendar years into yearly periods"""
+    def _split_periods_by_year(self, spans: List[PeriodSpan]) -> List[PeriodSpan]:
+        """
+        Split spans that cover multiple calendar years into yearly fragments
+        (detail view), and yearly fragments at mid-year coefficient changes,
+        so every breakdown row has a single coefficient.
+        """
         result = []
+        change_months = self.coefficients.change_months
 
-        for period in periods:
-            start_date = datetime.strptime(period.start_date, '%Y-%m-%d')
-            end_date = datetime.strptime(period.end_date, '%Y-%m-%d')
+        for span in spans:
+            start, end = span.start_month, span.end_month
+            start_year = index_year(start)
+            end_year = index_year(end)
 
             # If period is within same year, keep as is
-            if start_date.year == end_date.year:
-                result.append(period)
+            if start_year == end_year:
+                fragments = [span]
             else:
                 # Split into multiple yearly periods
-                current_date = start_date
-                while current_date <= end_date:
-                    year = current_date.year
-                    year_end = datetime(year, 12, 31)
-                    period_end = min(year_end, end_date)
-
-                    result.append(PeriodSchema(
-                        start_date=current_date.strftime('%Y-%m-%d'),
-                        end_date=period_end.strftime('%Y-%m-%d'),
-                        monthly_salary=period.monthly_salary
-                    ))
-
-                    # Move to next year
-                    current_date = datetime(year + 1, 1, 1)
+                fragments = [
+                    span.slice(max(start, year * 12), min(end, year * 12 + 11))
+                    for year in range(start_year, end_year + 1)
+                ]
+
+            if not change_months:
+                result.extend(fragments)
+                continue
+
+            for fragment in fragments:
+                fragment_start = fragment.start_month
+                position = bisect_right(change_months, fragment_start)
+                while position < len(change_months) and change_months[position] <= fragment.end_month:
+                    result.append(fragment.slice(fragment_start, change_months[position] - 1))
+                    fragment_start = change_months[position]
+                    position += 1
+                if fragment_start != fragment.start_month:
+                    fragment = fragment.slice(fragment_start, fragment.end_month)
+                result.append(fragment)
 
         return result
 
+    def _fragment_data(self, span: PeriodSpan) -> dict:
+        """Display data for one breakdown row"""
+        start_month, end_month = span.start_month, span.end_month
+        avg_coefficient = self._get_period_coefficient(start_month, end_month)
+
+        return {
+            'monthly_salary': span.monthly_salary,
+            'start_month': start_month,
+            'end_month': end_month,
+            # Fragments keep the original date strings where they coincide
+            'start_date': span.display_start_date(),
+            'end_date': span.display_end_date(),
+            'months': months_between(start_month, end_month),
+            'coefficient': avg_coefficient,
+            'adjusted_salary': span.monthly_salary * avg_coefficient,
+            'is_pre_2014': end_month < self.CUTOFF_MONTH,
+            'first_period_index': span.first_index,
+            'last_period_index': span.last_index
+        }
+
     def _round_fractional_years(self, months: int) -> float:
         """
         Round fractional years according to BHXH rules:
@@ -299,49 +459,33 @@ class CalculationEngine:
         else:  # 7-11 months
             return full_years + 1.0
 
-    def _build_coefficient_cache(self, coefficients: List[Coefficient]):
+    def _build_coefficient_cache(self, coefficients: Coefficients):
         """Build coefficient lookup cache"""
-        self.coefficients_cache = {
-            coeff.year: coeff.coefficient
-            for coeff in coefficients
-            if coeff.is_active
-        }
+        if not isinstance(coefficients, CoefficientSnapshot):
+            # Plain model lists get the same prebuilt index as the shared snapshot
+            coefficients = CoefficientSnapshot.from_models(coefficients)
+
+        self.coefficients = coefficients
+        self.coefficients_cache = coefficients.by_year
 
-    def _get_period_coefficient(self, start_date: datetime, end_date: datetime) -> float:
+    def _get_period_coefficient(self, start_month: int, end_month: int) -> float:
         """
-        Get average coefficient for a period.
-        If period spans multiple years, calculate weighted average.
+        Get average coefficient for a period given as month indexes.
+        If period spans multiple years, this is the month-weighted average,
+        answered in O(1) from the snapshot's prefix-sum index.
         """
-        if start_date.year == end_date.year:
-            # Same year, simple lookup
-            return self.coefficients_cache.get(start_date.year, 1.0)
-
-        # Multiple years - calculate weighted average
-        total_months = self._calculate_months(start_date, end_date)
-        weighted_sum = 0.0
-
-        current_date = start_date
-        while current_date <= end_date:
-            # Calculate months in this year
-            year = current_date.year
-            year_end = datetime(year, 12, 31)
-            period_end = min(year_end, end_date)
-
-            months_in_year = self._calculate_months(current_date, period_end)
-            coefficient = self.coefficients_cache.get(year, 1.0)
-
-            weighted_sum += coefficient * months_in_year
-
-            # Move to next year
-            current_date = datetime(year + 1, 1, 1)
-
-        return weighted_sum / total_months
-
-    def _calculate_months(self, start_date: datetime, end_date: datetime) -> int:
-        """Calculate number of months between two dates (inclusive)"""
-        months = (end_date.year - start_date.year) * 12
-        months += end_date.month - start_date.month + 1  # +1 to include both start and end months
-        return months
+        units = self.coefficients.coefficient_units(start_month, end_month)
+        return units / (months_between(start_month, end_month) * COEFFICIENT_SCALE)
+
+    @staticmethod
+    def _round_half_up(numerator: int, denominator: int) -> int:
+        """numerator / denominator rounded half up (non-negative integers)"""
+        return (2 * numerator + denominator) // (2 * denominator)
+
+    @classmethod
+    def _exact_era_amount(cls, mbqtl: float, percent: int, years: float) -> float:
+        """percent% × Mbqtl × years rounded half up to whole đồng (years are whole or half years)"""
+        return float(cls._round_half_up(int(mbqtl) * percent * int(years * 2), 200))
 
     def _format_currency(self, amount: float) -> str:
         """Format currency for Vietnamese display"""
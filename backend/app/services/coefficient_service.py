@@ -1,8 +1,94 @@
+import csv
+import io
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.models.coefficient import Coefficient
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+from app.models.coefficient import Coefficient, CoefficientVersion, DEFAULT_CALCULATION_YEAR
 from datetime import datetime
 
+# Sanity bounds for imported coefficients (the official tables are between 1.0 and ~5.7)
+MIN_COEFFICIENT = 0.5
+MAX_COEFFICIENT = 20.0
+
+
+def _effective_range(year: int, month: int):
+    """A row applies from its month until the next row of the year (at most to year end)"""
+    return datetime(year, month, 1), datetime(year, 12, 31, 23, 59, 59)
+
+
+def row_in_force(rows: Sequence, month: Optional[int]):
+    """
+    Pick the row in force for month from one year's rows (Coefficient
+    models or snapshot rows, ordered by calculation_year desc, month asc):
+    the latest table's last row starting on or before month. The first row
+    of a year also covers the months before it; month=None returns that
+    first row.
+    """
+    if not rows:
+        return None
+    latest = [row for row in rows if row.calculation_year == rows[0].calculation_year]
+    if month is None:
+        return latest[0]
+    in_force = latest[0]
+    for row in latest:
+        if row.month <= month:
+            in_force = row
+    return in_force
+
+
+def _import_version():
+    """Scalar subquery of the import version (see CoefficientService.import_circular)"""
+    return select(CoefficientVersion.version).where(CoefficientVersion.id == 1).scalar_subquery()
+
+
+class ImportResult(NamedTuple):
+    """Outcome of CoefficientService.import_circular"""
+    calculation_year: int
+    inserted: int
+    updated: int
+    deactivated: int
+    version: int
+
+
+def validate_circular(rows: Iterable[Dict], calculation_year: int) -> List[tuple]:
+    """
+    Check the rows of one circular and return them as
+    (year, month, coefficient, effective_from, effective_to) tuples.
+    A row without a month is a yearly coefficient (month 1); a month that
+    is present must be 1-12. Raises ValueError listing every problem found.
+    """
+    staged = []
+    errors = []
+    seen = set()
+
+    for number, row in enumerate(rows, start=1):
+        try:
+            year = int(row['year'])
+            month = int(row['month']) if 'month' in row else 1
+            coefficient = float(row['coefficient'])
+        except (KeyError, TypeError, ValueError):
+            errors.append(f"row {number}: year, month and coefficient must be numbers")
+            continue
+
+        if not 1900 <= year <= calculation_year:
+            errors.append(f"row {number}: year {year} is outside 1900-{calculation_year}")
+        elif not 1 <= month <= 12:
+            errors.append(f"row {number}: month {month} is not between 1 and 12")
+        elif not MIN_COEFFICIENT <= coefficient <= MAX_COEFFICIENT:
+            errors.append(f"row {number}: coefficient {coefficient} is outside {MIN_COEFFICIENT}-{MAX_COEFFICIENT}")
+        elif (year, month) in seen:
+            errors.append(f"row {number}: duplicate {month:02d}/{year}")
+        else:
+            seen.add((year, month))
+            staged.append((year, month, round(coefficient, 4)) + _effective_range(year, month))
+
+    if not staged and not errors:
+        errors.append("no rows")
+    if errors:
+        raise ValueError("Invalid coefficient circular: " + "; ".join(errors[:20]))
+    return staged
+
 
 class CoefficientService:
     """Service for managing coefficient data"""
@@ -14,14 +100,34 @@ class CoefficientService:
         """Get all active coefficients"""
         return self.db.query(Coefficient).filter(
             Coefficient.is_active == True
-        ).order_by(Coefficient.year.desc()).all()
+        ).order_by(
+            Coefficient.calculation_year.desc(), Coefficient.year.desc(), Coefficient.month.desc()
+        ).all()
 
-    def get_by_year(self, year: int) -> Optional[Coefficient]:
-        """Get coefficient for a specific year"""
-        return self.db.query(Coefficient).filter(
+    def get_version_token(self) -> tuple:
+        """
+        Cheap change detector for the active coefficient table.
+        Returns (row count, max updated_at, sum of coefficients, import
+        version) - any insert, delete, activation change, value update or
+        import changes the token.
+        """
+        count, max_updated_at, coefficient_sum, version = self.db.query(
+            func.count(Coefficient.id),
+            func.max(Coefficient.updated_at),
+            func.sum(Coefficient.coefficient),
+            _import_version()
+        ).filter(
+            Coefficient.is_active == True
+        ).one()
+        return (count, max_updated_at, coefficient_sum, version)
+
+    def get_by_year(self, year: int, month: Optional[int] = None) -> Optional[Coefficient]:
+        """Get the coefficient in force for a year, or a month of it (from the latest table)"""
+        rows = self.db.query(Coefficient).filter(
             Coefficient.year == year,
             Coefficient.is_active == True
-        ).first()
+        ).order_by(Coefficient.calculation_year.desc(), Coefficient.month).all()
+        return row_in_force(rows, month)
 
     def get_by_year_range(self, start_year: int, end_year: int) -> List[Coefficient]:
         """Get coefficients for a year range"""
@@ -29,14 +135,22 @@ class CoefficientService:
             Coefficient.year >= start_year,
             Coefficient.year <= end_year,
             Coefficient.is_active == True
-        ).order_by(Coefficient.year.desc()).all()
+        ).order_by(
+            Coefficient.calculation_year.desc(), Coefficient.year.desc(), Coefficient.month.desc()
+        ).all()
 
-    def create(self, year: int, coefficient: float, month: int = 1) -> Coefficient:
-        """Create a new coefficient"""
-        effective_from = datetime(year, 1, 1)
-        effective_to = datetime(year, 12, 31, 23, 59, 59)
+    def create(
+        self,
+        year: int,
+        coefficient: float,
+        month: int = 1,
+        calculation_year: int = DEFAULT_CALCULATION_YEAR
+    ) -> Coefficient:
+        """Create a new coefficient, in force from `month` of `year`"""
+        effective_from, effective_to = _effective_range(year, month)
 
         db_coefficient = Coefficient(
+            calculation_year=calculation_year,
             year=year,
             month=month,
             coefficient=coefficient,
@@ -57,14 +171,15 @@ class CoefficientService:
 
         for data in coefficients_data:
             year = data['year']
+            month = data.get('month', 1)
             coefficient = data['coefficient']
 
-            effective_from = datetime(year, 1, 1)
-            effective_to = datetime(year, 12, 31, 23, 59, 59)
+            effective_from, effective_to = _effective_range(year, month)
 
             db_coeff = Coefficient(
+                calculation_year=data.get('calculation_year', DEFAULT_CALCULATION_YEAR),
                 year=year,
-                month=data.get('month', 1),
+                month=month,
                 coefficient=coefficient,
                 effective_from=effective_from,
                 effective_to=effective_to,
@@ -76,3 +191,178 @@ class CoefficientService:
         self.db.commit()
 
         return db_coefficients
+
+    def import_circular(
+        self,
+        rows: Iterable[Dict],
+        calculation_year: int,
+        deactivate_missing: bool = True
+    ) -> ImportResult:
+        """
+        Upsert the coefficient table of one circular (calculation_year).
+
+        Rows (dicts with year, month, coefficient) are validated, staged
+        in a temporary table (COPY on PostgreSQL, executemany elsewhere;
+        dropped on commit, never touching a regular table of that name),
+        then merged in one transaction: existing (year, month) rows of the
+        table are updated, new ones inserted, rows missing from the
+        circular deactivated (unless deactivate_missing is False), and the
+        import version bumped. Readers see the old table until the commit,
+        then the new one, so the version token changes exactly once.
+
+        The upsert relies on UNIQUE(calculation_year, year, month). Fresh
+        databases get it from init.sql's CREATE TABLE; databases created
+        before calculation_year existed get it by re-running init.sql.
+        """
+        staged = validate_circular(rows, calculation_year)
+        params = {"calculation_year": calculation_year}
+        postgres = self.db.get_bind().dialect.name == "postgresql"
+
+        try:
+            if not postgres:
+                # SQLite keeps a temp table created outside a transaction past a
+                # rollback, so clear one left by a failed import (temp schema only)
+                self.db.execute(text("DROP TABLE IF EXISTS temp.coefficient_import"))
+            self.db.execute(text(
+                "CREATE TEMPORARY TABLE coefficient_import ("
+                "year INTEGER NOT NULL, month INTEGER NOT NULL, coefficient NUMERIC(10, 4) NOT NULL, "
+                "effective_from TIMESTAMP NOT NULL, effective_to TIMESTAMP NOT NULL, "
+                "PRIMARY KEY (year, month))" + (" ON COMMIT DROP" if postgres else "")
+            ))
+            self._stage(staged)
+
+            staged_count = self.db.execute(text("SELECT COUNT(*) FROM coefficient_import")).scalar()
+            if staged_count != len(staged):
+                raise ValueError(f"Staged {staged_count} of {len(staged)} coefficient rows")
+
+            updated = self.db.execute(text(
+                "SELECT COUNT(*) FROM coefficient_import s JOIN coefficient c "
+                "ON c.calculation_year = :calculation_year AND c.year = s.year AND c.month = s.month"
+            ), params).scalar()
+
+            self.db.execute(text(
+                "INSERT INTO coefficient "
+                "(calculation_year, year, month, coefficient, effective_from, effective_to, is_active, updated_at) "
+                "SELECT :calculation_year, year, month, coefficient, effective_from, effective_to, TRUE, "
+                "CURRENT_TIMESTAMP FROM coefficient_import WHERE TRUE "
+                "ON CONFLICT (calculation_year, year, month) DO UPDATE SET "
+                "coefficient = excluded.coefficient, effective_from = excluded.effective_from, "
+                "effective_to = excluded.effective_to, is_active = TRUE, updated_at = CURRENT_TIMESTAMP"
+            ), params)
+
+            deactivated = 0
+            if deactivate_missing:
+                deactivated = self.db.execute(text(
+                    "UPDATE coefficient SET is_active = FALSE, updated_at = CURRENT_TIMESTAMP "
+                    "WHERE calculation_year = :calculation_year AND is_active = TRUE AND NOT EXISTS ("
+                    "SELECT 1 FROM coefficient_import s "
+                    "WHERE s.year = coefficient.year AND s.month = coefficient.month)"
+                ), params).rowcount
+
+            version = self._bump_version()
+            if not postgres:
+                self.db.execute(text("DROP TABLE temp.coefficient_import"))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return ImportResult(
+            calculation_year=calculation_year,
+            inserted=len(staged) - updated,
+            updated=updated,
+            deactivated=deactivated,
+            version=version
+        )
+
+    def _stage(self, staged: List[tuple]):
+        """Load validated rows into coefficient_import"""
+        if self.db.get_bind().dialect.name == "postgresql":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(staged)
+            buffer.seek(0)
+            cursor = self.db.connection().connection.cursor()
+            try:
+                cursor.copy_expert(
+                    "COPY coefficient_import (year, month, coefficient, effective_from, effective_to) "
+                    "FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+            finally:
+                cursor.close()
+        else:
+            self.db.execute(
+                text(
+                    "INSERT INTO coefficient_import (year, month, coefficient, effective_from, effective_to) "
+                    "VALUES (:year, :month, :coefficient, :effective_from, :effective_to)"
+                ),
+                [
+                    {"year": year, "month": month, "coefficient": coefficient,
+                     "effective_from": effective_from, "effective_to": effective_to}
+                    for year, month, coefficient, effective_from, effective_to in staged
+                ]
+            )
+
+    def _bump_version(self) -> int:
+        """Increment the import version (creating its row on first use) and return it"""
+        row = self.db.get(CoefficientVersion, 1, with_for_update=True)
+        if row is None:
+            row = CoefficientVersion(id=1, version=0)
+            self.db.add(row)
+        row.version += 1
+        self.db.flush()
+        return row.version
+
+
+class AsyncCoefficientService:
+    """Async counterpart of CoefficientService for the request path"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_all_active(self) -> List[Coefficient]:
+        """Get all active coefficients"""
+        result = await self.db.execute(
+            select(Coefficient).where(
+                Coefficient.is_active == True
+            ).order_by(
+                Coefficient.calculation_year.desc(), Coefficient.year.desc(), Coefficient.month.desc()
+            )
+        )
+        return list(result.scalars().all())
+
+    async def get_version_token(self) -> tuple:
+        """Async CoefficientService.get_version_token"""
+        result = await self.db.execute(
+            select(
+                func.count(Coefficient.id),
+                func.max(Coefficient.updated_at),
+                func.sum(Coefficient.coefficient),
+                _import_version()
+            ).where(Coefficient.is_active == True)
+        )
+        count, max_updated_at, coefficient_sum, version = result.one()
+        return (count, max_updated_at, coefficient_sum, version)
+
+    async def get_by_year(self, year: int, month: Optional[int] = None) -> Optional[Coefficient]:
+        """Get the coefficient in force for a year, or a month of it (from the latest table)"""
+        result = await self.db.execute(
+            select(Coefficient).where(
+                Coefficient.year == year,
+                Coefficient.is_active == True
+            ).order_by(Coefficient.calculation_year.desc(), Coefficient.month)
+        )
+        return row_in_force(list(result.scalars().all()), month)
+
+    async def get_by_year_range(self, start_year: int, end_year: int) -> List[Coefficient]:
+        """Get coefficients for a year range"""
+        result = await self.db.execute(
+            select(Coefficient).where(
+                Coefficient.year >= start_year,
+                Coefficient.year <= end_year,
+                Coefficient.is_active == True
+            ).order_by(
+                Coefficient.calculation_year.desc(), Coefficient.year.desc(), Coefficient.month.desc()
+            )
+        )
+        return list(result.scalars().all())
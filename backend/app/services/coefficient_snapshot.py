@@ -0,0 +1,462 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime
+from types import MappingProxyType
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app import metrics
+from app.database import AsyncSessionLocal
+from app.models.coefficient import Coefficient, DEFAULT_CALCULATION_YEAR
+from app.services.coefficient_service import CoefficientService, AsyncCoefficientService
+
+logger = logging.getLogger(__name__)
+
+# Coefficients are stored as DECIMAL(10, 4); the prefix-sum index keeps them
+# as exact integers in units of 1/COEFFICIENT_SCALE.
+COEFFICIENT_SCALE = 10000
+
+
+class CoefficientRow(NamedTuple):
+    """Plain, immutable copy of an active coefficient row"""
+    id: int
+    year: int
+    month: int
+    coefficient: float
+    effective_from: datetime
+    effective_to: datetime
+    is_active: bool
+    calculation_year: int = DEFAULT_CALCULATION_YEAR
+
+
+class CoefficientSnapshot:
+    """
+    Immutable, process-wide view of the active coefficient table.
+
+    Built once from the database and shared by all requests, so the
+    calculation path does not need to query or rebuild anything.
+    `version` is a content hash of the rows, identical on every node
+    that loaded the same table.
+
+    The rows may hold several tables (one per calculation_year, i.e. per
+    circular). The lookups below are for the latest one;
+    for_calculation_year() returns the snapshot of another table.
+
+    Coefficients have month resolution: a row applies from its month until
+    the next row of the same year, and the first row of a year also covers
+    the months before it (so a single row per year, as in the seed data,
+    covers the whole year). `by_year` is the coefficient in force at the
+    start of each year; `change_months` lists the month indexes where a
+    coefficient changes within a year.
+
+    `prefix` is a month-indexed prefix-sum of coefficients (in
+    COEFFICIENT_SCALE units) starting at `first_month`, so the coefficient
+    sum over any month range is answered in O(1) by coefficient_units(),
+    whatever the number of rows per year.
+    It is a tuple, or a read-only int64 view when loaded from a binary
+    snapshot file.
+    Months outside the table use coefficient 1.0, like a missing year.
+    """
+
+    __slots__ = (
+        'rows', 'tables', 'calculation_years', 'calculation_year',
+        'by_year', 'change_months', 'version', 'first_month', 'prefix', '_table_year_keys'
+    )
+
+    def __init__(self, rows: Tuple[CoefficientRow, ...]):
+        rows = tuple(sorted(rows, key=lambda r: (r.calculation_year, r.year, r.month), reverse=True))
+        self._set_rows(rows)
+        object.__setattr__(self, 'version', self.content_hash(rows))
+        first_month, prefix = self._build_prefix(self.tables.get(self.calculation_year, ()))
+        object.__setattr__(self, 'first_month', first_month)
+        object.__setattr__(self, 'prefix', prefix)
+
+    def _set_rows(self, rows: Tuple[CoefficientRow, ...]):
+        tables = {}
+        for row in rows:
+            tables.setdefault(row.calculation_year, []).append(row)
+
+        calculation_years = tuple(sorted(tables))
+        calculation_year = calculation_years[-1] if calculation_years else DEFAULT_CALCULATION_YEAR
+
+        object.__setattr__(self, 'rows', rows)
+        object.__setattr__(self, 'tables', MappingProxyType({year: tuple(t) for year, t in tables.items()}))
+        # Per table, its rows' years negated: ascending, like the rows are descending, for bisect
+        object.__setattr__(self, '_table_year_keys', {
+            year: [-row.year for row in table_rows] for year, table_rows in tables.items()
+        })
+        object.__setattr__(self, 'calculation_years', calculation_years)
+        object.__setattr__(self, 'calculation_year', calculation_year)
+        latest = tables.get(calculation_year, ())
+        first_months = self._first_months(latest)
+        object.__setattr__(self, 'by_year', MappingProxyType(self._index_by_year(latest)))
+        object.__setattr__(self, 'change_months', tuple(sorted(
+            row.year * 12 + row.month - 1 for row in latest if row.month > first_months[row.year]
+        )))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CoefficientSnapshot is immutable")
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __reduce__(self):
+        # Pickled for process-pool calculations: ship the parts, not the derived lookups
+        return CoefficientSnapshot.from_parts, (self.rows, self.version, self.first_month, tuple(self.prefix))
+
+    def __repr__(self):
+        return f"<CoefficientSnapshot(rows={len(self.rows)}, tables={list(self.calculation_years)}, version={self.version})>"
+
+    def for_calculation_year(self, calculation_year: int) -> "CoefficientSnapshot":
+        """
+        Snapshot of the table in force for calculation_year: the latest
+        table issued in that year or earlier. Older tables are compiled on
+        first use and kept in compiled_tables, so switching is a dict lookup.
+        """
+        years = self.calculation_years
+        if not years or calculation_year >= years[-1]:
+            return self
+
+        position = bisect_right(years, calculation_year)
+        if position == 0:
+            available = ", ".join(str(year) for year in years)
+            raise ValueError(f"No coefficient table for calculation year {calculation_year} (available: {available})")
+
+        return compiled_tables.get(self, years[position - 1])
+
+    def rows_in_year_range(self, start_year: int, end_year: int) -> Tuple[CoefficientRow, ...]:
+        """
+        Rows of every table with start_year <= year <= end_year, in snapshot
+        order (like CoefficientService.get_by_year_range): two bisects and a
+        slice per table.
+        """
+        result = []
+        for calculation_year in reversed(self.calculation_years):
+            keys = self._table_year_keys[calculation_year]
+            low = bisect_left(keys, -end_year)
+            high = bisect_right(keys, -start_year)
+            result.extend(self.tables[calculation_year][low:high])
+        return tuple(result)
+
+    def coefficient_units(self, start_month: int, end_month: int) -> int:
+        """
+        Sum of the coefficients of every month from start_month to end_month
+        (inclusive month indexes), in COEFFICIENT_SCALE units.
+        """
+        first = self.first_month
+        last = first + len(self.prefix) - 2
+        total = 0
+
+        if start_month < first:
+            total += (min(end_month, first - 1) - start_month + 1) * COEFFICIENT_SCALE
+            start_month = first
+
+        if end_month > last:
+            total += (end_month - max(start_month, last + 1) + 1) * COEFFICIENT_SCALE
+            end_month = last
+
+        if start_month <= end_month:
+            total += self.prefix[end_month - first + 1] - self.prefix[start_month - first]
+
+        return total
+
+    @classmethod
+    def from_parts(
+        cls,
+        rows: Tuple[CoefficientRow, ...],
+        version: str,
+        first_month: int,
+        prefix: Sequence[int]
+    ) -> "CoefficientSnapshot":
+        """
+        Assemble a snapshot from precomputed parts (e.g. a snapshot file)
+        without re-sorting, re-hashing or rebuilding the prefix sums.
+        rows must already be in snapshot order.
+        """
+        snapshot = cls.__new__(cls)
+        snapshot._set_rows(rows)
+        object.__setattr__(snapshot, 'version', version)
+        object.__setattr__(snapshot, 'first_month', first_month)
+        object.__setattr__(snapshot, 'prefix', prefix)
+        return snapshot
+
+    @classmethod
+    def from_models(cls, coefficients: List[Coefficient]) -> "CoefficientSnapshot":
+        """Build a snapshot from Coefficient model instances (inactive rows are skipped)"""
+        return cls(tuple(
+            CoefficientRow(
+                id=coeff.id,
+                year=coeff.year,
+                month=coeff.month if coeff.month is not None else 1,
+                coefficient=float(coeff.coefficient),
+                effective_from=coeff.effective_from,
+                effective_to=coeff.effective_to,
+                is_active=True,
+                calculation_year=(
+                    coeff.calculation_year if coeff.calculation_year is not None else DEFAULT_CALCULATION_YEAR
+                )
+            )
+            for coeff in coefficients
+            if coeff.is_active
+        ))
+
+    def coefficient_at(self, month: int) -> float:
+        """Coefficient in force for one month index, in O(1)"""
+        return self.coefficient_units(month, month) / COEFFICIENT_SCALE
+
+    @staticmethod
+    def _first_months(rows: Sequence[CoefficientRow]) -> Dict[int, int]:
+        """Year -> month of its first row"""
+        first = {}
+        for row in rows:
+            if row.month < first.get(row.year, 13):
+                first[row.year] = row.month
+        return first
+
+    @classmethod
+    def _index_by_year(cls, rows: Sequence[CoefficientRow]) -> dict:
+        """Year -> coefficient in force in January (the year's first row)"""
+        first = cls._first_months(rows)
+        return {row.year: row.coefficient for row in rows if row.month == first[row.year]}
+
+    @staticmethod
+    def _month_units(rows: Sequence[CoefficientRow]) -> Dict[int, List[int]]:
+        """Year -> coefficient units of each of its 12 months"""
+        by_year: Dict[int, List[CoefficientRow]] = {}
+        for row in rows:
+            by_year.setdefault(row.year, []).append(row)
+
+        units = {}
+        for year, year_rows in by_year.items():
+            year_rows.sort(key=lambda r: r.month)
+            months = [round(year_rows[0].coefficient * COEFFICIENT_SCALE)] * 12
+            for row in year_rows[1:]:
+                months[row.month - 1:] = [round(row.coefficient * COEFFICIENT_SCALE)] * (13 - row.month)
+            units[year] = months
+        return units
+
+    @classmethod
+    def _build_prefix(cls, rows: Sequence[CoefficientRow]) -> Tuple[int, Tuple[int, ...]]:
+        """Month-indexed prefix sums of coefficient units covering all loaded years"""
+        if not rows:
+            return 0, (0,)
+
+        units = cls._month_units(rows)
+        first_year, last_year = min(units), max(units)
+        default_months = [COEFFICIENT_SCALE] * 12
+
+        prefix = [0]
+        running = 0
+        for year in range(first_year, last_year + 1):
+            for month_units in units.get(year, default_months):
+                running += month_units
+                prefix.append(running)
+
+        return first_year * 12, tuple(prefix)
+
+    @staticmethod
+    def content_hash(rows: Tuple[CoefficientRow, ...]) -> str:
+        """Deterministic hash of the snapshot content"""
+        digest = hashlib.sha256()
+        for row in rows:
+            digest.update(
+                f"{row.calculation_year}|{row.year}|{row.month}|{row.coefficient!r}|"
+                f"{row.effective_from}|{row.effective_to}\n".encode()
+            )
+        return digest.hexdigest()[:16]
+
+
+class CompiledTableCache:
+    """
+    Bounded LRU of per-calculation-year snapshots compiled from a
+    multi-table snapshot, keyed by (snapshot version, calculation year).
+    The latest table needs no entry: it is the snapshot itself.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._tables: "OrderedDict[Tuple[str, int], CoefficientSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, snapshot: CoefficientSnapshot, calculation_year: int) -> CoefficientSnapshot:
+        key = (snapshot.version, calculation_year)
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+                return table
+
+        table = CoefficientSnapshot(snapshot.tables[calculation_year])
+        with self._lock:
+            self._tables[key] = table
+            while len(self._tables) > self.maxsize:
+                self._tables.popitem(last=False)
+        return table
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+
+
+compiled_tables = CompiledTableCache(settings.COEFFICIENT_TABLE_CACHE_SIZE)
+
+
+class CoefficientSnapshotStore:
+    """
+    Holds the current CoefficientSnapshot for the process.
+
+    The snapshot is loaded at startup and only reloaded when the cheap
+    version token from CoefficientService.get_version_token() changes.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[CoefficientSnapshot] = None
+        self._token: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[CoefficientSnapshot]:
+        """Return the loaded snapshot without touching the database"""
+        return self._snapshot
+
+    def load(self, db: Session) -> CoefficientSnapshot:
+        """Load the full active coefficient table and swap it in"""
+        with self._lock:
+            service = CoefficientService(db)
+            token = service.get_version_token()
+            snapshot = CoefficientSnapshot.from_models(service.get_all_active())
+            self._swap(snapshot, token)
+            return snapshot
+
+    def refresh_if_changed(self, db: Session) -> bool:
+        """Reload the snapshot if the table changed since it was loaded"""
+        token = CoefficientService(db).get_version_token()
+        if self._snapshot is not None and token == self._token:
+            return False
+
+        self.load(db)
+        return True
+
+    async def aload(self, db: AsyncSession) -> CoefficientSnapshot:
+        """Async load() for the request path"""
+        service = AsyncCoefficientService(db)
+        token = await service.get_version_token()
+        snapshot = CoefficientSnapshot.from_models(await service.get_all_active())
+        with self._lock:
+            self._swap(snapshot, token)
+        return snapshot
+
+    async def arefresh_if_changed(self, db: AsyncSession) -> bool:
+        """Async refresh_if_changed()"""
+        token = await AsyncCoefficientService(db).get_version_token()
+        if self._snapshot is not None and token == self._token:
+            return False
+
+        await self.aload(db)
+        return True
+
+    def load_file(self, path: str) -> CoefficientSnapshot:
+        """Load a snapshot file (see app.services.snapshot_file) and swap it in"""
+        from app.services.snapshot_file import read_snapshot_file
+
+        with self._lock:
+            token = self._file_token(path)
+            snapshot = read_snapshot_file(path)
+            self._swap(snapshot, token)
+            return snapshot
+
+    def refresh_file_if_changed(self, path: str) -> bool:
+        """Reload the snapshot if the file was replaced since it was loaded"""
+        if self._snapshot is not None and self._file_token(path) == self._token:
+            return False
+
+        self.load_file(path)
+        return True
+
+    @staticmethod
+    def _file_token(path: str) -> tuple:
+        stat = os.stat(path)
+        return ('file', stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def invalidate(self):
+        """Drop the snapshot; it will be reloaded on next use"""
+        with self._lock:
+            self._snapshot = None
+            self._token = None
+
+    def _swap(self, snapshot: CoefficientSnapshot, token: tuple):
+        previous = self._snapshot
+        self._snapshot = snapshot
+        self._token = token
+        if previous is None or previous.version != snapshot.version:
+            logger.info(f"Coefficient snapshot loaded: {len(snapshot)} rows, version {snapshot.version}")
+
+
+snapshot_store = CoefficientSnapshotStore()
+
+
+async def load_snapshot() -> CoefficientSnapshot:
+    """Load the snapshot from COEFFICIENT_SNAPSHOT_FILE, or using a fresh async database session"""
+    if settings.COEFFICIENT_SNAPSHOT_FILE:
+        return snapshot_store.load_file(settings.COEFFICIENT_SNAPSHOT_FILE)
+
+    async with AsyncSessionLocal() as db:
+        return await snapshot_store.aload(db)
+
+
+async def refresh_snapshot() -> bool:
+    """Reload the snapshot if changed (file or database)"""
+    if settings.COEFFICIENT_SNAPSHOT_FILE:
+        return snapshot_store.refresh_file_if_changed(settings.COEFFICIENT_SNAPSHOT_FILE)
+
+    async with AsyncSessionLocal() as db:
+        return await snapshot_store.arefresh_if_changed(db)
+
+
+async def get_coefficient_snapshot() -> CoefficientSnapshot:
+    """Dependency returning the current snapshot (loads it on first use only)"""
+    snapshot = snapshot_store.current()
+    metrics.count_coefficient_cache(snapshot is not None)
+    if snapshot is None:
+        with metrics.stage("coefficients"):
+            snapshot = await load_snapshot()
+    return snapshot
+
+
+async def get_loaded_snapshot() -> Optional[CoefficientSnapshot]:
+    """
+    Dependency returning the snapshot only if it is already loaded (None
+    otherwise), for routes that can answer from the database instead
+    """
+    snapshot = snapshot_store.current()
+    metrics.count_coefficient_cache(snapshot is not None)
+    return snapshot
+
+
+async def refresh_snapshot_periodically(
+    interval: Optional[float] = None,
+    on_change: Optional[Callable[[], Awaitable[object]]] = None
+):
+    """
+    Background task: check the version token every `interval` seconds.
+    `on_change` runs when a check reloaded the snapshot (main.py uses it to
+    announce changes made behind the API's back to the other workers).
+    """
+    interval = interval if interval is not None else settings.COEFFICIENT_REFRESH_INTERVAL
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if await refresh_snapshot() and on_change is not None:
+                await on_change()
+        except Exception as e:
+            logger.warning(f"Coefficient snapshot refresh failed: {str(e)}")
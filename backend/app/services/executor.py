@@ -0,0 +1,151 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, TypeVar
+
+from app import metrics
+from app.config import settings
+from app.services.coefficient_snapshot import CoefficientSnapshot
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+STRATEGIES = ("inline", "thread", "process")
+
+
+class ExecutorBusy(Exception):
+    """Raised when the offload queue is full; the request should be retried later"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Calculation queue is full, please retry later")
+        self.retry_after = retry_after
+
+
+class _SnapshotMissing(Exception):
+    """A process worker does not have the snapshot version yet"""
+
+
+# Snapshots held by a process worker, by version (a handful at most)
+_worker_snapshots: Dict[str, CoefficientSnapshot] = {}
+
+
+def _run_in_worker(fn: Callable, version: str, snapshot: Optional[CoefficientSnapshot], args: tuple):
+    """
+    Process-pool entry point. The parent first sends only the snapshot
+    version; a worker that has not seen it yet asks for the full snapshot
+    once, so the table is not pickled on every call.
+    """
+    if snapshot is None:
+        snapshot = _worker_snapshots.get(version)
+        if snapshot is None:
+            raise _SnapshotMissing(version)
+    else:
+        if len(_worker_snapshots) >= 4:
+            _worker_snapshots.clear()
+        _worker_snapshots[version] = snapshot
+    return fn(snapshot, *args)
+
+
+class CalculationExecutor:
+    """
+    Runs engine calls according to CALCULATION_EXECUTOR.
+
+    Small calculations (weight up to inline_max_periods, usually the number
+    of periods) run inline: offloading them would cost more than the
+    calculation. Larger ones go to a thread or process pool so the event
+    loop keeps serving health checks and small requests. At most
+    queue_size offloaded calculations may be queued or running; beyond
+    that run() raises ExecutorBusy instead of queueing without bound.
+
+    fn is called as fn(coefficients, *args); for the process strategy it
+    must be a module-level function and its arguments picklable.
+    """
+
+    def __init__(
+        self,
+        strategy: str = None,
+        inline_max_periods: int = None,
+        workers: int = None,
+        queue_size: int = None,
+        retry_after: int = None
+    ):
+        self.strategy = strategy if strategy is not None else settings.CALCULATION_EXECUTOR
+        if self.strategy not in STRATEGIES:
+            raise ValueError(
+                f"Unknown calculation executor {self.strategy!r} (expected one of {', '.join(STRATEGIES)})"
+            )
+        self.inline_max_periods = (
+            inline_max_periods if inline_max_periods is not None else settings.CALCULATION_INLINE_MAX_PERIODS
+        )
+        self.workers = workers if workers is not None else settings.CALCULATION_WORKERS
+        self.queue_size = queue_size if queue_size is not None else settings.CALCULATION_QUEUE_SIZE
+        self.retry_after = retry_after if retry_after is not None else settings.CALCULATION_RETRY_AFTER
+
+        self._pool: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Offloaded calculations queued or running"""
+        return self._pending
+
+    async def run(self, weight: int, fn: Callable[..., T], coefficients: CoefficientSnapshot, *args) -> T:
+        """Run fn(coefficients, *args) inline or in the pool, depending on weight"""
+        if self.strategy == "inline" or weight <= self.inline_max_periods:
+            metrics.count_executor("inline")
+            return fn(coefficients, *args)
+
+        with self._lock:
+            if self._pending >= self.queue_size:
+                metrics.count_executor("rejected")
+                raise ExecutorBusy(self.retry_after)
+            self._pending += 1
+
+        metrics.count_executor(self.strategy)
+        try:
+            loop = asyncio.get_running_loop()
+            if self.strategy == "thread":
+                # Copy the context so stage timings still reach this request
+                call = functools.partial(contextvars.copy_context().run, fn, coefficients, *args)
+                return await loop.run_in_executor(self._get_pool(), call)
+
+            pool = self._get_pool()
+            try:
+                return await loop.run_in_executor(
+                    pool, _run_in_worker, fn, coefficients.version, None, args
+                )
+            except _SnapshotMissing:
+                return await loop.run_in_executor(
+                    pool, _run_in_worker, fn, coefficients.version, coefficients, args
+                )
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _get_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.strategy == "thread":
+                    workers = self.workers or min(4, os.cpu_count() or 1)
+                    self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bhxh-calc")
+                else:
+                    workers = self.workers or os.cpu_count() or 1
+                    self._pool = ProcessPoolExecutor(max_workers=workers)
+                logger.info(f"Calculation executor: {self.strategy} pool with {workers} workers")
+            return self._pool
+
+    def shutdown(self):
+        """Stop the pool (it is recreated on next use)"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+calculation_executor = CalculationExecutor()
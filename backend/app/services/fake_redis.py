@@ -0,0 +1,120 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class FakeRedis:
+    """
+    Minimal in-memory stand-in for redis.asyncio.Redis.
+
+    Implements only the commands the backend uses, with the same
+    signatures, so caches can be exercised in tests without a Redis server.
+    One instance plays the server: pubsub() objects created from it receive
+    what is published on it.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._subscribers: Dict[str, List["FakePubSub"]] = {}
+
+    def _alive(self, name: str) -> Optional[bytes]:
+        entry = self._data.get(name)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[name]
+            return None
+        return value
+
+    async def get(self, name: str) -> Optional[bytes]:
+        return self._alive(name)
+
+    async def set(
+        self,
+        name: str,
+        value,
+        ex: Optional[float] = None,
+        px: Optional[int] = None,
+        nx: bool = False
+    ) -> Optional[bool]:
+        if nx and self._alive(name) is not None:
+            return None
+
+        if isinstance(value, str):
+            value = value.encode()
+
+        expires_at = None
+        if ex is not None:
+            expires_at = time.monotonic() + ex
+        elif px is not None:
+            expires_at = time.monotonic() + px / 1000
+
+        self._data[name] = (value, expires_at)
+        return True
+
+    async def delete(self, *names: str) -> int:
+        deleted = 0
+        for name in names:
+            if self._alive(name) is not None:
+                deleted += 1
+            self._data.pop(name, None)
+        return deleted
+
+    async def publish(self, channel: str, message) -> int:
+        if isinstance(message, str):
+            message = message.encode()
+        subscribers = self._subscribers.get(channel, [])
+        for pubsub in subscribers:
+            pubsub._deliver("message", channel, message)
+        return len(subscribers)
+
+    def pubsub(self) -> "FakePubSub":
+        return FakePubSub(self)
+
+    async def flushdb(self):
+        self._data.clear()
+
+    async def close(self):
+        pass
+
+
+class FakePubSub:
+    """In-memory stand-in for redis.asyncio.client.PubSub (channels only, no patterns)"""
+
+    def __init__(self, redis: FakeRedis):
+        self._redis = redis
+        self._messages: asyncio.Queue = asyncio.Queue()
+        self.channels: Set[str] = set()
+
+    def _deliver(self, kind: str, channel: str, data):
+        self._messages.put_nowait({"type": kind, "pattern": None, "channel": channel.encode(), "data": data})
+
+    async def subscribe(self, *channels: str):
+        for channel in channels:
+            if channel not in self.channels:
+                self.channels.add(channel)
+                self._redis._subscribers.setdefault(channel, []).append(self)
+            self._deliver("subscribe", channel, len(self.channels))
+
+    async def unsubscribe(self, *channels: str):
+        for channel in channels or tuple(self.channels):
+            if channel in self.channels:
+                self.channels.discard(channel)
+                self._redis._subscribers[channel].remove(self)
+            self._deliver("unsubscribe", channel, len(self.channels))
+
+    async def get_message(self, ignore_subscribe_messages: bool = False, timeout: Optional[float] = 0.0):
+        try:
+            if timeout is not None and timeout <= 0:
+                message = self._messages.get_nowait()
+            else:
+                message = await asyncio.wait_for(self._messages.get(), timeout)
+        except (asyncio.QueueEmpty, asyncio.TimeoutError):
+            return None
+        if ignore_subscribe_messages and message["type"] in ("subscribe", "unsubscribe"):
+            return None
+        return message
+
+    async def aclose(self):
+        await self.unsubscribe()
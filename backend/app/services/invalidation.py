@@ -0,0 +1,210 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+import redis.asyncio as aioredis
+from sqlalchemy.engine import make_url
+
+from app import metrics
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidationListener:
+    """
+    Cross-worker coefficient invalidation over Redis pub/sub.
+
+    Every worker subscribes to COEFFICIENT_INVALIDATION_CHANNEL and calls
+    `on_invalidate` (normally refresh_snapshot, which re-checks the version
+    token and reloads only if it changed) for each published message. It
+    also checks once after every (re)subscribe, to catch changes published
+    while it was not listening. While the channel is unreachable it polls
+    instead, between reconnect attempts: first every `retry_interval`
+    seconds, then backing off (doubling) to `max_retry_interval`, so a
+    missing broker does not cost every worker a token query per second.
+    """
+
+    def __init__(
+        self,
+        redis,
+        on_invalidate: Callable[[], Awaitable[object]],
+        channel: Optional[str] = None,
+        retry_interval: Optional[float] = None,
+        max_retry_interval: Optional[float] = None
+    ):
+        self.redis = redis
+        self.on_invalidate = on_invalidate
+        self.channel = channel or settings.COEFFICIENT_INVALIDATION_CHANNEL
+        if retry_interval is None:
+            retry_interval = settings.COEFFICIENT_INVALIDATION_RETRY
+        if max_retry_interval is None:
+            max_retry_interval = settings.COEFFICIENT_INVALIDATION_MAX_RETRY
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max(max_retry_interval, retry_interval)
+        self.delay = retry_interval
+        self.connected = False
+        self._failing = False
+
+    async def run(self):
+        """Listen until cancelled, falling back to polling while the channel is down"""
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not self._failing:
+                    logger.warning(
+                        f"Coefficient invalidation channel {self.channel!r} unavailable, polling "
+                        f"(every {self.retry_interval:g}s, backing off to {self.max_retry_interval:g}s): {str(e)}"
+                    )
+                self._failing = True
+
+            await asyncio.sleep(self.delay)
+            self.delay = min(self.delay * 2, self.max_retry_interval)
+            await self._invalidate("poll")
+
+    async def _listen(self):
+        pubsub = self.redis.pubsub()
+        try:
+            await pubsub.subscribe(self.channel)
+            await self._subscribed()
+
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=self.retry_interval)
+                if message is not None:
+                    await self._invalidate("message")
+        finally:
+            self.connected = False
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    async def _subscribed(self):
+        self.connected = True
+        self.delay = self.retry_interval
+        if self._failing:
+            logger.info(f"Coefficient invalidation channel {self.channel!r} reconnected")
+            self._failing = False
+        await self._invalidate("poll")
+
+    async def _invalidate(self, source: str):
+        metrics.count_invalidation(source)
+        try:
+            await self.on_invalidate()
+        except Exception as e:
+            logger.warning(f"Coefficient snapshot refresh failed: {str(e)}")
+
+
+class PostgresInvalidationListener(InvalidationListener):
+    """
+    InvalidationListener fed by PostgreSQL LISTEN/NOTIFY.
+
+    init.sql's notify_coefficient_change triggers NOTIFY
+    COEFFICIENT_NOTIFY_CHANNEL after every statement that changes the
+    coefficient tables, including direct edits by an admin, and PostgreSQL
+    delivers it to every listening worker on commit (once per transaction).
+    Uses its own asyncpg connection, outside the SQLAlchemy pool.
+    """
+
+    PING_INTERVAL = 30.0  # seconds between liveness checks of an idle connection
+
+    def __init__(
+        self,
+        dsn: str,
+        on_invalidate: Callable[[], Awaitable[object]],
+        channel: Optional[str] = None,
+        retry_interval: Optional[float] = None,
+        max_retry_interval: Optional[float] = None
+    ):
+        super().__init__(
+            None, on_invalidate, channel or settings.COEFFICIENT_NOTIFY_CHANNEL, retry_interval, max_retry_interval
+        )
+        self.dsn = dsn
+
+    async def _listen(self):
+        import asyncpg
+
+        notified = asyncio.Event()
+        connection = await asyncpg.connect(self.dsn, timeout=settings.DB_POOL_TIMEOUT)
+        try:
+            await connection.add_listener(self.channel, lambda *args: notified.set())
+            await self._subscribed()
+
+            while True:
+                try:
+                    await asyncio.wait_for(notified.wait(), self.PING_INTERVAL)
+                except asyncio.TimeoutError:
+                    # Raises if the server or network went away while idle
+                    await connection.fetchval("SELECT 1")
+                    continue
+                notified.clear()
+                await self._invalidate("message")
+        finally:
+            self.connected = False
+            try:
+                await connection.close(timeout=1)
+            except Exception:
+                pass
+
+
+def asyncpg_dsn(url: str) -> Optional[str]:
+    """asyncpg DSN for a SQLAlchemy PostgreSQL URL (None for other databases)"""
+    url = make_url(url)
+    if url.get_backend_name() != "postgresql":
+        return None
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def publish_invalidation(redis, message: str = "") -> bool:
+    """Tell every worker to re-check its coefficient snapshot; False if the channel is down"""
+    try:
+        await redis.publish(settings.COEFFICIENT_INVALIDATION_CHANNEL, message)
+        return True
+    except Exception as e:
+        logger.warning(f"Could not publish coefficient invalidation: {str(e)}")
+        return False
+
+
+_invalidation_redis = None
+
+
+def get_invalidation_redis():
+    """Process-wide Redis client for the invalidation channel, or None if disabled"""
+    global _invalidation_redis
+    if not settings.COEFFICIENT_INVALIDATION_ENABLED:
+        return None
+
+    if _invalidation_redis is None:
+        # No socket_timeout: the subscriber blocks on reads by design
+        _invalidation_redis = aioredis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT
+        )
+
+    return _invalidation_redis
+
+
+def publish_invalidation_sync(message: str = "") -> bool:
+    """publish_invalidation() for scripts running outside the event loop (e.g. the CLI)"""
+    import redis
+
+    if not settings.COEFFICIENT_INVALIDATION_ENABLED:
+        return False
+
+    try:
+        client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT
+        )
+        try:
+            client.publish(settings.COEFFICIENT_INVALIDATION_CHANNEL, message)
+        finally:
+            client.close()
+        return True
+    except Exception as e:
+        logger.warning(f"Could not publish coefficient invalidation: {str(e)}")
+        return False
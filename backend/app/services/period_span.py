@@ -0,0 +1,94 @@
+from typing import Optional
+
+from app.schemas.period import PeriodSchema
+from app.utils.month_index import format_month_start, format_month_end, months_between
+
+
+class PeriodSpan:
+    """
+    Engine-internal contribution period in month indexes.
+
+    Built once per validated PeriodSchema at the API boundary. Splitting
+    creates more PeriodSpans with slice(), which is plain attribute copying:
+    no Pydantic validation and no date parsing per fragment.
+    first_index/last_index are the input rows the span covers, so merged
+    and split spans can still be traced back to the request.
+    """
+
+    __slots__ = (
+        'start_month', 'end_month', 'monthly_salary', 'start_date', 'end_date',
+        'first_index', 'last_index'
+    )
+
+    def __init__(
+        self,
+        start_month: int,
+        end_month: int,
+        monthly_salary: float,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        first_index: Optional[int] = None,
+        last_index: Optional[int] = None
+    ):
+        self.start_month = start_month
+        self.end_month = end_month
+        self.monthly_salary = monthly_salary
+        # Original 'YYYY-MM-DD' strings, kept only on edges shared with the
+        # input period (None on edges created by a split)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.first_index = first_index
+        self.last_index = last_index if last_index is not None else first_index
+
+    @classmethod
+    def from_schema(cls, period: PeriodSchema, index: Optional[int] = None) -> "PeriodSpan":
+        return cls(
+            period.start_month, period.end_month, period.monthly_salary,
+            period.start_date, period.end_date, index
+        )
+
+    @property
+    def months(self) -> int:
+        return months_between(self.start_month, self.end_month)
+
+    def slice(self, start_month: int, end_month: int) -> "PeriodSpan":
+        """Fragment of this span (start_month..end_month must lie inside it)"""
+        return PeriodSpan(
+            start_month,
+            end_month,
+            self.monthly_salary,
+            self.start_date if start_month == self.start_month else None,
+            self.end_date if end_month == self.end_month else None,
+            self.first_index,
+            self.last_index
+        )
+
+    def continues(self, previous: "PeriodSpan") -> bool:
+        """True if this span starts the month after previous ends, at the same salary"""
+        return self.start_month == previous.end_month + 1 and self.monthly_salary == previous.monthly_salary
+
+    def merge(self, following: "PeriodSpan") -> "PeriodSpan":
+        """One span covering this span and the one that continues it"""
+        return PeriodSpan(
+            self.start_month,
+            following.end_month,
+            self.monthly_salary,
+            self.start_date,
+            following.end_date,
+            self.first_index,
+            following.last_index
+        )
+
+    def display_start_date(self) -> str:
+        """'YYYY-MM-DD' start: the input string, or the 1st of the month inside a split"""
+        return self.start_date or format_month_start(self.start_month)
+
+    def display_end_date(self) -> str:
+        """'YYYY-MM-DD' end: the input string, or the last day of the month inside a split"""
+        return self.end_date or format_month_end(self.end_month)
+
+    def __repr__(self):
+        return (
+            f"PeriodSpan({self.display_start_date()}..{self.display_end_date()}, "
+            f"salary={self.monthly_salary})"
+        )
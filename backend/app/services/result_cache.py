@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+
+import redis.asyncio as aioredis
+
+from app.config import settings
+from app.schemas.calculation_response import CalculationResponse
+from app.schemas.period import PeriodSchema
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "bhxh:calc:"
+LOCK_SUFFIX = ":lock"
+
+
+def calculation_cache_key(
+    periods: List[PeriodSchema],
+    coefficient_version: str,
+    verbosity: str = "full",
+    exact: bool = False
+) -> str:
+    """
+    Canonical cache key for a calculation.
+
+    Uses the normalized periods (YYYY-MM-DD dates produced by PeriodSchema,
+    salaries as floats) in request order, plus the coefficient snapshot
+    version, so a coefficient change never serves a stale result, and the
+    verbosity and exact mode, since they change the response.
+    """
+    canonical = json.dumps(
+        [[p.start_date, p.end_date, float(p.monthly_salary)] for p in periods],
+        separators=(',', ':')
+    )
+    mode = f"{verbosity}|exact" if exact else verbosity
+    digest = hashlib.sha256(f"{coefficient_version}|{mode}|{canonical}".encode()).hexdigest()
+    return f"{KEY_PREFIX}{digest}"
+
+
+class ResultCache:
+    """
+    Redis-backed cache of calculation results with stampede protection.
+
+    On a miss only the worker holding the per-key lock computes the result;
+    the others wait for it to appear, and retry the lock if the holder gives
+    up without storing one. Redis errors never fail a calculation:
+    the result is computed directly and the cache is bypassed for a while.
+    An entry that cannot be decoded is deleted and treated as a miss. Hits
+    are re-stamped with the current calculated_at, like fresh results.
+    """
+
+    POLL_INTERVAL = 0.02
+    BACKOFF_SECONDS = 30.0
+
+    def __init__(self, redis, ttl: int = None, lock_timeout: float = None):
+        self.redis = redis
+        self.ttl = ttl if ttl is not None else settings.RESULT_CACHE_TTL
+        self.lock_timeout = lock_timeout if lock_timeout is not None else settings.RESULT_CACHE_LOCK_TIMEOUT
+        self._disabled_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[CalculationResponse]]
+    ) -> CalculationResponse:
+        """Return the cached result for key, computing it at most once across workers"""
+        if not self.available:
+            return await compute()
+
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            try:
+                cached = await self.redis.get(key)
+                if cached is not None:
+                    result = await self._decode(key, cached)
+                    if result is not None:
+                        return result
+
+                lock_key = key + LOCK_SUFFIX
+                token = uuid.uuid4().hex
+                acquired = await self.redis.set(lock_key, token, px=int(self.lock_timeout * 1000), nx=True)
+            except Exception as e:
+                self._backoff(e)
+                return await compute()
+
+            if acquired:
+                try:
+                    result = await compute()
+                    await self._store(key, result)
+                    return result
+                finally:
+                    await self._release(lock_key, token)
+
+            # Another worker is computing this key - wait for its result. If
+            # it gives up (its lock goes away with nothing stored, e.g. it
+            # raised), go back and try to take the lock ourselves.
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.POLL_INTERVAL)
+                try:
+                    cached = await self.redis.get(key)
+                    if cached is None and await self.redis.get(lock_key) is None:
+                        break
+                except Exception as e:
+                    self._backoff(e)
+                    return await compute()
+                if cached is not None:
+                    result = await self._decode(key, cached)
+                    if result is not None:
+                        return result
+            else:
+                logger.warning("Timed out waiting for cached calculation result, computing locally")
+                return await compute()
+
+    async def _decode(self, key: str, cached: bytes) -> Optional[CalculationResponse]:
+        """Parse a cached entry; a corrupt one is deleted and reported as a miss (None)"""
+        try:
+            result = CalculationResponse.model_validate_json(cached)
+        except ValueError as e:
+            logger.warning(f"Discarding unreadable cached calculation result: {str(e)}")
+            try:
+                await self.redis.delete(key)
+            except Exception as delete_error:
+                self._backoff(delete_error)
+            return None
+        result.calculated_at = datetime.now().isoformat()
+        return result
+
+    async def _store(self, key: str, result: CalculationResponse):
+        try:
+            await self.redis.set(key, result.model_dump_json(), ex=self.ttl)
+        except Exception as e:
+            self._backoff(e)
+
+    async def _release(self, lock_key: str, token: str):
+        try:
+            current = await self.redis.get(lock_key)
+            if current is not None and current.decode() == token:
+                await self.redis.delete(lock_key)
+        except Exception as e:
+            self._backoff(e)
+
+    def _backoff(self, error: Exception):
+        logger.warning(f"Result cache unavailable, bypassing for {self.BACKOFF_SECONDS:.0f}s: {str(error)}")
+        self._disabled_until = time.monotonic() + self.BACKOFF_SECONDS
+
+
+_result_cache: Optional[ResultCache] = None
+
+
+async def get_result_cache() -> Optional[ResultCache]:
+    """Dependency returning the process-wide result cache, or None if disabled"""
+    global _result_cache
+    if not settings.RESULT_CACHE_ENABLED:
+        return None
+
+    if _result_cache is None:
+        client = aioredis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT
+        )
+        _result_cache = ResultCache(client)
+
+    return _result_cache
@@ -0,0 +1,52 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+from app import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls within one process.
+
+    The first caller for a key (the leader) starts the computation as a
+    task; callers arriving while it runs (followers) await the same task
+    instead of computing again. The key is dropped as soon as the task
+    finishes, so results are never reused afterwards - that is the result
+    cache's job. A caller that is cancelled (e.g. the client disconnected)
+    does not cancel the computation for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, compute: Callable[[], Awaitable[T]]) -> T:
+        """Return compute()'s result, sharing one in-flight computation per key"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.leaders += 1
+            metrics.count_coalescing(follower=False)
+        else:
+            self.followers += 1
+            metrics.count_coalescing(follower=True)
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Future):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the outcome as retrieved even if every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,215 @@
+"""
+Coefficient snapshot files.
+
+Lets workers, offline tools (the CLI) and tests calculate from a file
+instead of the database. Files carry the rows and the snapshot version
+(the content hash used in cache keys); loading verifies them so a stale
+or edited file is rejected instead of silently producing other results.
+
+Two formats:
+- binary (default): fixed header, packed rows and the precomputed int64
+  prefix sums. Loaded with mmap, so the prefix is used in place and all
+  processes on a host share one physical copy through the page cache.
+- JSON: human-readable, for review and diffs.
+
+Binary layout (little endian):
+    header  magic "BHXHCOEF", format version (u16), reserved (u16),
+            row count (u32), first month index (i32), prefix length (u32),
+            snapshot version (16 ASCII bytes), sha256 of the body (32 bytes)
+    body    rows: id (i64), calculation year, year, month (i32), padding (4),
+                  coefficient (f64),
+                  effective_from, effective_to (i64 microseconds since 0001-01-01)
+            prefix: prefix length x i64 (for the latest calculation year)
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.services.coefficient_snapshot import CoefficientSnapshot, CoefficientRow
+
+FORMAT = "bhxh-coefficients"
+FORMAT_VERSION = 2
+
+MAGIC = b"BHXHCOEF"
+BINARY_VERSION = 2
+HEADER = struct.Struct("<8sHHIiI16s32s")
+ROW = struct.Struct("<qiii4xdqq")
+PREFIX_ITEM = struct.Struct("<q")
+
+# Stands in for NULL ids and dates in the packed rows
+_NULL = -(1 << 63)
+_EPOCH = datetime(1, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+def write_snapshot_json(snapshot: CoefficientSnapshot, path: str):
+    """Write snapshot rows and version as JSON"""
+    data = {
+        "format": FORMAT,
+        "format_version": FORMAT_VERSION,
+        "version": snapshot.version,
+        "rows": [
+            {
+                "id": row.id,
+                "calculation_year": row.calculation_year,
+                "year": row.year,
+                "month": row.month,
+                "coefficient": row.coefficient,
+                "effective_from": row.effective_from.isoformat() if row.effective_from is not None else None,
+                "effective_to": row.effective_to.isoformat() if row.effective_to is not None else None,
+            }
+            for row in snapshot.rows
+        ]
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+
+
+def read_snapshot_json(path: str) -> CoefficientSnapshot:
+    """Load a snapshot written by write_snapshot_json"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    if data.get("format") != FORMAT:
+        raise ValueError(f"{path} is not a coefficient snapshot file")
+    if data.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported snapshot format version {data.get('format_version')}, export it again")
+
+    snapshot = CoefficientSnapshot(tuple(
+        CoefficientRow(
+            id=row["id"],
+            year=row["year"],
+            month=row["month"],
+            coefficient=float(row["coefficient"]),
+            effective_from=_datetime(row["effective_from"]),
+            effective_to=_datetime(row["effective_to"]),
+            is_active=True,
+            calculation_year=row["calculation_year"]
+        )
+        for row in data["rows"]
+    ))
+
+    if snapshot.version != data["version"]:
+        raise ValueError(f"{path}: content does not match version {data['version']}")
+
+    return snapshot
+
+
+def _pack_datetime(value: Optional[datetime]) -> int:
+    return _NULL if value is None else (value - _EPOCH) // _MICROSECOND
+
+
+def _unpack_datetime(value: int) -> Optional[datetime]:
+    return None if value == _NULL else _EPOCH + value * _MICROSECOND
+
+
+def write_snapshot_binary(snapshot: CoefficientSnapshot, path: str):
+    """
+    Write the binary snapshot format.
+
+    The file is written next to path and renamed into place, so processes
+    that already mapped the old file keep a consistent copy.
+    """
+    rows = b"".join(
+        ROW.pack(
+            _NULL if row.id is None else row.id,
+            row.calculation_year,
+            row.year,
+            row.month,
+            row.coefficient,
+            _pack_datetime(row.effective_from),
+            _pack_datetime(row.effective_to)
+        )
+        for row in snapshot.rows
+    )
+    body = rows + struct.pack(f"<{len(snapshot.prefix)}q", *snapshot.prefix)
+    header = HEADER.pack(
+        MAGIC,
+        BINARY_VERSION,
+        0,
+        len(snapshot.rows),
+        snapshot.first_month,
+        len(snapshot.prefix),
+        snapshot.version.encode("ascii"),
+        hashlib.sha256(body).digest()
+    )
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(header)
+        f.write(body)
+    os.replace(temp_path, path)
+
+
+def read_snapshot_binary(path: str) -> CoefficientSnapshot:
+    """Memory-map a snapshot written by write_snapshot_binary"""
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(buffer) < HEADER.size:
+        raise ValueError(f"{path} is not a coefficient snapshot file")
+
+    magic, format_version, _, row_count, first_month, prefix_length, version, digest = (
+        HEADER.unpack_from(buffer, 0)
+    )
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a coefficient snapshot file")
+    if format_version != BINARY_VERSION:
+        raise ValueError(f"{path}: unsupported snapshot format version {format_version}, export it again")
+
+    prefix_offset = HEADER.size + row_count * ROW.size
+    if len(buffer) != prefix_offset + prefix_length * PREFIX_ITEM.size:
+        raise ValueError(f"{path}: truncated snapshot file")
+
+    view = memoryview(buffer)
+    if hashlib.sha256(view[HEADER.size:]).digest() != digest:
+        raise ValueError(f"{path}: snapshot content is corrupted")
+
+    rows = tuple(
+        CoefficientRow(
+            id=None if row_id == _NULL else row_id,
+            year=year,
+            month=month,
+            coefficient=coefficient,
+            effective_from=_unpack_datetime(effective_from),
+            effective_to=_unpack_datetime(effective_to),
+            is_active=True,
+            calculation_year=calculation_year
+        )
+        for row_id, calculation_year, year, month, coefficient, effective_from, effective_to
+        in ROW.iter_unpack(view[HEADER.size:prefix_offset])
+    )
+
+    version = version.decode("ascii")
+    if CoefficientSnapshot.content_hash(rows) != version:
+        raise ValueError(f"{path}: content does not match version {version}")
+
+    # The prefix stays in the mapping; the view keeps it alive
+    prefix = view[prefix_offset:].cast("q")
+    return CoefficientSnapshot.from_parts(rows, version, first_month, prefix)
+
+
+def write_snapshot_file(snapshot: CoefficientSnapshot, path: str):
+    """Write a snapshot file: JSON for *.json paths, otherwise binary"""
+    if path.lower().endswith(".json"):
+        write_snapshot_json(snapshot, path)
+    else:
+        write_snapshot_binary(snapshot, path)
+
+
+def read_snapshot_file(path: str) -> CoefficientSnapshot:
+    """Load a binary or JSON coefficient snapshot file"""
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+    if magic == MAGIC:
+        return read_snapshot_binary(path)
+    return read_snapshot_json(path)
@@ -0,0 +1,195 @@
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+from app.schemas.period import PeriodSchema
+from app.services.calculation_engine import CalculationEngine, Coefficients
+from app.services.coefficient_snapshot import CoefficientSnapshot, COEFFICIENT_SCALE
+
+
+class BulkCalculationResult(NamedTuple):
+    """Per-person results of a vectorized calculation, as aligned arrays"""
+    person_id: np.ndarray
+    total_months: np.ndarray
+    months_pre_2014: np.ndarray
+    months_from_2014: np.ndarray
+    years_pre_2014: np.ndarray
+    years_from_2014: np.ndarray
+    average_salary: np.ndarray
+    total_amount: np.ndarray
+
+
+class VectorizedCalculationEngine:
+    """
+    Columnar BHXH calculation for whole workforce histories.
+
+    Takes one row per contribution period as parallel arrays
+    (person_id, start_month, end_month, salary) - months are month indexes
+    from app.utils.month_index - and evaluates every person at once with
+    array operations and group-by-person reductions. Follows the same
+    formula and rounding as CalculationEngine.calculate.
+    """
+
+    def __init__(self, coefficients: Coefficients):
+        if not isinstance(coefficients, CoefficientSnapshot):
+            coefficients = CoefficientSnapshot.from_models(coefficients)
+
+        self.coefficients = coefficients
+        self._first_month = coefficients.first_month
+        self._last_month = coefficients.first_month + len(coefficients.prefix) - 2
+        self._prefix = np.asarray(coefficients.prefix, dtype=np.int64)
+
+    def calculate(
+        self,
+        person_id: np.ndarray,
+        start_month: np.ndarray,
+        end_month: np.ndarray,
+        salary: np.ndarray
+    ) -> BulkCalculationResult:
+        """Calculate one-time BHXH amounts for every person in the columns"""
+        start_month = np.asarray(start_month, dtype=np.int64)
+        end_month = np.asarray(end_month, dtype=np.int64)
+        salary = np.asarray(salary, dtype=np.float64)
+
+        if np.any(end_month < start_month):
+            raise ValueError("End month must not be before start month")
+
+        persons, group = np.unique(np.asarray(person_id), return_inverse=True)
+        group = group.ravel()
+        n_persons = len(persons)
+
+        # Months per era (periods crossing 01/2014 count on both sides)
+        cutoff = CalculationEngine.CUTOFF_MONTH
+        months_pre = np.clip(np.minimum(end_month, cutoff - 1) - start_month + 1, 0, None)
+        months_from = np.clip(end_month - np.maximum(start_month, cutoff) + 1, 0, None)
+
+        # Σ salary × Σ(coefficient) in COEFFICIENT_SCALE units, per era like the scalar engine
+        units = (
+            self._coefficient_units(start_month, np.minimum(end_month, cutoff - 1)),
+            self._coefficient_units(np.maximum(start_month, cutoff), end_month)
+        )
+        total_adjusted = self._sum_adjusted_units(group, n_persons, salary, units) / COEFFICIENT_SCALE
+
+        total_months_pre = np.bincount(group, weights=months_pre, minlength=n_persons).astype(np.int64)
+        total_months_from = np.bincount(group, weights=months_from, minlength=n_persons).astype(np.int64)
+        total_months = total_months_pre + total_months_from
+
+        mbqtl = total_adjusted / total_months
+
+        years_pre = self._round_fractional_years(total_months_pre)
+        years_from = self._round_fractional_years(total_months_from)
+
+        normal_amount = (
+            np.where(years_pre > 0, CalculationEngine.MULTIPLIER_PRE_2014 * mbqtl * years_pre, 0.0)
+            + np.where(years_from > 0, CalculationEngine.MULTIPLIER_FROM_2014 * mbqtl * years_from, 0.0)
+        )
+        # Less than 1 year: min(22% × Σ adjusted salary, 2 × Mbqtl)
+        short_amount = np.minimum(0.22 * total_adjusted, 2 * mbqtl)
+        total_amount = np.where(total_months < 12, short_amount, normal_amount)
+
+        return BulkCalculationResult(
+            person_id=persons,
+            total_months=total_months,
+            months_pre_2014=total_months_pre,
+            months_from_2014=total_months_from,
+            years_pre_2014=years_pre,
+            years_from_2014=years_from,
+            average_salary=self._round_money(mbqtl),
+            total_amount=self._round_money(total_amount)
+        )
+
+    def _coefficient_units(self, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        """Vectorized CoefficientSnapshot.coefficient_units (0 for empty ranges)"""
+        first, last = self._first_month, self._last_month
+
+        below = np.clip(np.minimum(end, first - 1) - start + 1, 0, None) * COEFFICIENT_SCALE
+        above = np.clip(end - np.maximum(start, last + 1) + 1, 0, None) * COEFFICIENT_SCALE
+
+        inner_start = np.clip(start, first, last + 1)
+        inner_end = np.clip(end, first - 1, last)
+        inner = np.where(
+            inner_start <= inner_end,
+            self._prefix[inner_end - first + 1] - self._prefix[inner_start - first],
+            0
+        )
+
+        return below + above + inner
+
+    @staticmethod
+    def _sum_adjusted_units(
+        group: np.ndarray,
+        n_persons: int,
+        salary: np.ndarray,
+        units: Tuple[np.ndarray, np.ndarray]
+    ) -> np.ndarray:
+        """
+        Per-person Σ salary × units, like the scalar engine: whole-đồng
+        salaries accumulate as exact integers (int64, or Python ints if the
+        totals could overflow), fractional ones as floats.
+        """
+        whole = salary % 1 == 0
+        row_units = units[0] + units[1]
+
+        fractional = np.where(whole, 0.0, salary * units[0] + salary * units[1])
+        total = np.bincount(group, weights=fractional, minlength=n_persons)
+        if not whole.any():
+            return total
+
+        whole_salary = np.where(whole, salary, 0.0)
+        bound = float(whole_salary.max()) * float(row_units.max()) * len(salary)
+        dtype = np.int64 if bound < 2 ** 62 else object
+        exact_units = whole_salary.astype(np.int64).astype(dtype) * row_units.astype(dtype)
+
+        exact_total = np.zeros(n_persons, dtype=dtype)
+        np.add.at(exact_total, group, exact_units)
+        return exact_total.astype(np.float64) + total
+
+    @staticmethod
+    def _round_money(values: np.ndarray) -> np.ndarray:
+        """
+        Round to 2 decimals exactly like the scalar engine's round() (half
+        to even on the exact binary value), with integer arithmetic: each
+        float is m × 2**e with an integer 53-bit m, so value × 100 is the
+        exact integer m × 100 (< 2**60) shifted right by -e bits. np.round
+        multiplies by 100 in floating point first and can land on the other
+        side of a tie.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        mantissa, exponent = np.frexp(values)
+        scaled = (mantissa * 2.0 ** 53).astype(np.int64) * 100
+        shift = np.clip(53 - exponent, 1, 62).astype(np.int64)
+
+        cents = scaled >> shift
+        remainder = scaled - (cents << shift)
+        half = np.left_shift(np.int64(1), shift - 1)
+        cents += (remainder > half) | ((remainder == half) & (cents % 2 == 1))
+
+        # Values of 2**52 and up are already whole
+        return np.where(exponent >= 53, values, cents / 100)
+
+    @staticmethod
+    def _round_fractional_years(months: np.ndarray) -> np.ndarray:
+        """Vectorized CalculationEngine._round_fractional_years"""
+        remaining = months % 12
+        extra = np.where(remaining == 0, 0.0, np.where(remaining <= 6, 0.5, 1.0))
+        return (months // 12) + extra
+
+
+def periods_to_columns(
+    people: Dict[object, List[PeriodSchema]]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Convert {person_id: [PeriodSchema, ...]} into the engine's column arrays"""
+    person_id, start_month, end_month, salary = [], [], [], []
+    for pid, periods in people.items():
+        for period in periods:
+            person_id.append(pid)
+            start_month.append(period.start_month)
+            end_month.append(period.end_month)
+            salary.append(period.monthly_salary)
+
+    return (
+        np.asarray(person_id),
+        np.asarray(start_month, dtype=np.int64),
+        np.asarray(end_month, dtype=np.int64),
+        np.asarray(salary, dtype=np.float64)
+    )
@@ -0,0 +1,84 @@
+"""
+Integer month indexes for period arithmetic.
+
+A month index is year * 12 + (month - 1), so consecutive calendar months
+are consecutive integers: year = index // 12, month = index % 12 + 1.
+Dates are parsed into month indexes once at the boundary; splitting,
+month counting and era classification are then plain integer arithmetic.
+"""
+
+from calendar import monthrange
+from functools import lru_cache
+
+
+def month_index(year: int, month: int) -> int:
+    """Month index for a calendar year and month (1-12)"""
+    return year * 12 + month - 1
+
+
+def _digits(text: str, min_len: int, max_len: int) -> int:
+    if not (min_len <= len(text) <= max_len and text.isascii() and text.isdigit()):
+        raise ValueError(text)
+    return int(text)
+
+
+@lru_cache(maxsize=4096)
+def normalize_input_date(value: str) -> str:
+    """
+    Validate a user-supplied date and return it as 'YYYY-MM-DD'.
+
+    Accepts MM/YYYY (day 1 of the month) or YYYY-MM-DD, with the same
+    leniency as strptime('%m/%Y') / strptime('%Y-%m-%d') (1-2 digit month
+    and day, 4 digit year). Parsed by hand and cached: month-per-row
+    requests repeat the same few hundred dates.
+    """
+    try:
+        if '/' in value:
+            month_text, _, year_text = value.partition('/')
+            year, month, day = _digits(year_text, 4, 4), _digits(month_text, 1, 2), 1
+        else:
+            year_text, month_text, day_text = value.split('-')
+            year, month, day = _digits(year_text, 4, 4), _digits(month_text, 1, 2), _digits(day_text, 1, 2)
+
+        if year < 1 or not 1 <= month <= 12 or not 1 <= day <= monthrange(year, month)[1]:
+            raise ValueError(value)
+    except ValueError:
+        raise ValueError('Date must be in MM/YYYY format (e.g., 01/2021) or YYYY-MM-DD format') from None
+
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+def parse_month_index(date_str: str) -> int:
+    """Month index of a normalized 'YYYY-MM-DD' date string"""
+    return int(date_str[0:4]) * 12 + int(date_str[5:7]) - 1
+
+
+def index_year(index: int) -> int:
+    """Calendar year of a month index"""
+    return index // 12
+
+
+def months_between(start: int, end: int) -> int:
+    """Number of months from start to end, both inclusive"""
+    return end - start + 1
+
+
+@lru_cache(maxsize=4096)
+def format_month_start(index: int) -> str:
+    """'YYYY-MM-01' for a month index"""
+    year, month = divmod(index, 12)
+    return f"{year:04d}-{month + 1:02d}-01"
+
+
+@lru_cache(maxsize=4096)
+def format_month_end(index: int) -> str:
+    """'YYYY-MM-DD' of the last day of the month for a month index"""
+    year, month = divmod(index, 12)
+    return f"{year:04d}-{month + 1:02d}-{monthrange(year, month + 1)[1]:02d}"
+
+
+@lru_cache(maxsize=4096)
+def format_month_display(index: int) -> str:
+    """'MM/YYYY' for a month index, as shown to users"""
+    year, month = divmod(index, 12)
+    return f"{month + 1:02d}/{year}"
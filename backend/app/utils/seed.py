@@ -0,0 +1,22 @@
+"""
+The official coefficient table seeded by backend/init.sql, for tests and
+benchmarks that run without PostgreSQL.
+"""
+
+import os
+import re
+from typing import List, Tuple
+
+INIT_SQL = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'init.sql')
+
+_SEED_ROW = re.compile(r"\((\d{4}), (\d+), ([\d.]+), '[\d-]+', '[\d-]+', TRUE\)")
+
+
+def load_seed_coefficients(path: str = INIT_SQL) -> List[Tuple[int, int, float]]:
+    """Read the (year, month, coefficient) seed rows from init.sql"""
+    with open(path, encoding='utf-8') as f:
+        sql = f.read()
+    return [
+        (int(year), int(month), float(coefficient))
+        for year, month, coefficient in _SEED_ROW.findall(sql)
+    ]
@@ -0,0 +1,10 @@
+from pydantic import ValidationError
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """Flatten a Pydantic validation error into a single readable message"""
+    messages = []
+    for err in error.errors():
+        location = ".".join(str(part) for part in err.get("loc", ()))
+        messages.append(f"{location}: {err['msg']}" if location else err["msg"])
+    return "; ".join(messages)
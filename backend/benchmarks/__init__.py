@@ -0,0 +1 @@
+# Benchmarks for the calculation engine and API
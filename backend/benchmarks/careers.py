@@ -0,0 +1,95 @@
+"""
+Synthetic career generator for benchmarks.
+
+Careers are returned as request payload periods (MM/YYYY dates), the same
+shape the frontend and OCR flow send to POST /api/v1/calculate.
+"""
+
+import random
+from datetime import datetime
+from typing import Dict, List
+
+from app.models.coefficient import Coefficient
+from app.utils.seed import load_seed_coefficients
+
+
+def _month(index: int) -> str:
+    """MM/YYYY for a month index (year * 12 + month - 1)"""
+    return f"{index % 12 + 1:02d}/{index // 12}"
+
+
+def _career(start: int, lengths: List[int], salaries: List[float]) -> List[Dict]:
+    periods = []
+    month = start
+    for length, salary in zip(lengths, salaries):
+        periods.append({
+            "start_date": _month(month),
+            "end_date": _month(month + length - 1),
+            "monthly_salary": salary
+        })
+        month += length
+    return periods
+
+
+def short_career(rnd: random.Random) -> List[Dict]:
+    """Less than 12 months (22% special case)"""
+    return _career(2024 * 12, [rnd.randint(3, 11)], [rnd.randrange(5_000_000, 30_000_000, 1000)])
+
+
+def crossing_2014_career(rnd: random.Random) -> List[Dict]:
+    """A few periods, one of them crossing the 01/2014 cutoff"""
+    lengths = [rnd.randint(12, 36), rnd.randint(24, 60), rnd.randint(12, 48)]
+    start = 2014 * 12 - lengths[0] - rnd.randint(1, lengths[1] - 1)
+    return _career(start, lengths, [rnd.randrange(3_000_000, 20_000_000, 1000) for _ in lengths])
+
+
+def forty_year_career(rnd: random.Random) -> List[Dict]:
+    """40 years from 1985 with a salary change roughly every 2 years"""
+    lengths = []
+    remaining = 40 * 12
+    while remaining > 0:
+        length = min(remaining, rnd.randint(12, 36))
+        lengths.append(length)
+        remaining -= length
+    salaries = [1_000_000 + i * 750_000 for i in range(len(lengths))]
+    return _career(1985 * 12, lengths, salaries)
+
+
+def monthly_rows_career(rnd: random.Random, rows: int = 500) -> List[Dict]:
+    """One period per month, as produced by OCR of VssID screenshots"""
+    salary = 4_000_000
+    salaries = []
+    for _ in range(rows):
+        if rnd.random() < 0.05:
+            salary += 500_000
+        salaries.append(salary)
+    return _career(2025 * 12 + 11 - rows + 1, [1] * rows, salaries)
+
+
+CAREERS = {
+    "short": short_career,
+    "crossing_2014": crossing_2014_career,
+    "forty_years": forty_year_career,
+    "monthly_500": monthly_rows_career,
+}
+
+
+def generate(kind: str, seed: int = 0) -> List[Dict]:
+    """Generate one career of the given kind, deterministic for a seed"""
+    return CAREERS[kind](random.Random(seed))
+
+
+def seed_coefficients() -> List[Coefficient]:
+    """The official coefficient table seeded by backend/init.sql"""
+    return [
+        Coefficient(
+            id=i + 1,
+            year=year,
+            month=month,
+            coefficient=coefficient,
+            effective_from=datetime(year, 1, 1),
+            effective_to=datetime(year, 12, 31, 23, 59, 59),
+            is_active=True
+        )
+        for i, (year, month, coefficient) in enumerate(load_seed_coefficients())
+    ]
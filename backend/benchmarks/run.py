@@ -0,0 +1,233 @@
+"""
+Benchmark suite for the calculation engine and API.
+
+Runs the real app.services.calculation_engine, the request schemas and the
+full POST /api/v1/calculate path (in-process ASGI client) against synthetic
+careers, and prints machine-readable JSON.
+
+Usage (from backend/):
+    python -m benchmarks.run                       # all benchmarks, JSON to stdout
+    python -m benchmarks.run --output bench.json   # also write to a file
+    python -m benchmarks.run --filter engine       # only names containing "engine"
+    python -m benchmarks.run --compare bench.json  # report change vs a previous run
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+# The API benchmark must not need PostgreSQL or Redis, and the result cache
+# would hide the engine cost - configure before importing the app.
+os.environ.setdefault(
+    "DATABASE_URL",
+    "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bhxh_bench_"), "bench.db")
+)
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("RESULT_CACHE_ENABLED", "false")
+os.environ.setdefault("COEFFICIENT_REFRESH_INTERVAL", "0")
+
+from app.schemas.calculation_request import CalculationRequest  # noqa: E402
+from app.schemas.period import PeriodSchema  # noqa: E402
+from app.services.calculation_engine import CalculationEngine  # noqa: E402
+from app.services.coefficient_snapshot import CoefficientSnapshot  # noqa: E402
+from benchmarks.careers import CAREERS, generate, seed_coefficients  # noqa: E402
+
+
+def measure(fn: Callable[[], object], min_time: float, samples: int) -> Dict:
+    """
+    Time fn: calibrate a loop count so one sample takes at least
+    min_time / samples, then report per-call statistics in microseconds.
+    """
+    fn()  # warm up
+
+    number = 1
+    target = min_time / samples
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= target or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(target / elapsed) + 1))
+
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) / number * 1e6)
+
+    timings.sort()
+    return {
+        "loops": number,
+        "samples": samples,
+        "mean_us": round(statistics.fmean(timings), 3),
+        "median_us": round(statistics.median(timings), 3),
+        "min_us": round(timings[0], 3),
+        "p95_us": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "stdev_us": round(statistics.stdev(timings), 3) if len(timings) > 1 else 0.0,
+        "ops_per_sec": round(1e6 / statistics.median(timings), 1),
+    }
+
+
+def engine_benchmarks(snapshot: CoefficientSnapshot) -> Dict[str, Callable[[], object]]:
+    benchmarks = {}
+    engine = CalculationEngine()
+    engine.load_coefficients(snapshot)
+
+    for kind in CAREERS:
+        payload = generate(kind)
+        periods = [PeriodSchema(**p) for p in payload]
+        for verbosity in ("summary", "full"):
+            benchmarks[f"engine.calculate[{kind},{verbosity}]"] = (
+                lambda periods=periods, verbosity=verbosity: engine.calculate(periods, verbosity=verbosity)
+            )
+        benchmarks[f"engine.calculate[{kind},summary,exact]"] = (
+            lambda periods=periods: engine.calculate(periods, verbosity="summary", exact=True)
+        )
+    return benchmarks
+
+
+def validation_benchmarks() -> Dict[str, Callable[[], object]]:
+    benchmarks = {}
+    single = generate("crossing_2014")[0]
+    benchmarks["schema.PeriodSchema"] = lambda: PeriodSchema(**single)
+
+    for kind in CAREERS:
+        payload = {"periods": generate(kind)}
+        benchmarks[f"schema.CalculationRequest[{kind}]"] = (
+            lambda payload=payload: CalculationRequest.model_validate(payload)
+        )
+    return benchmarks
+
+
+def api_benchmarks(
+    snapshot: CoefficientSnapshot,
+    loop: asyncio.AbstractEventLoop
+) -> Tuple[Dict[str, Callable[[], object]], Callable[[], None]]:
+    """API benchmarks plus a cleanup callable that closes the client and removes the override"""
+    import httpx
+    from app.main import app
+    from app.services.coefficient_snapshot import get_coefficient_snapshot
+
+    async def snapshot_dependency():
+        return snapshot
+
+    app.dependency_overrides[get_coefficient_snapshot] = snapshot_dependency
+    # Per-request INFO logs would flood the report output
+    logging.getLogger().setLevel(logging.WARNING)
+    client = httpx.AsyncClient(app=app, base_url="http://bench")
+
+    benchmarks = {}
+    for kind in CAREERS:
+        payload = {"periods": generate(kind)}
+
+        def call(payload=payload):
+            response = loop.run_until_complete(client.post("/api/v1/calculate", json=payload))
+            if response.status_code != 200:
+                raise RuntimeError(f"/api/v1/calculate returned {response.status_code}: {response.text}")
+            return response
+
+        benchmarks[f"api.calculate[{kind}]"] = call
+
+    def cleanup():
+        loop.run_until_complete(client.aclose())
+        app.dependency_overrides.pop(get_coefficient_snapshot, None)
+
+    return benchmarks, cleanup
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results: List[Dict], previous_path: str) -> List[Dict]:
+    """Median change per benchmark vs a previous run (positive = slower)"""
+    with open(previous_path, encoding='utf-8') as f:
+        previous = {r["name"]: r for r in json.load(f)["results"]}
+
+    changes = []
+    for result in results:
+        before = previous.get(result["name"])
+        if before is None:
+            continue
+        change = (result["median_us"] - before["median_us"]) / before["median_us"] * 100
+        changes.append({"name": result["name"], "change_pct": round(change, 1)})
+    return changes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="BHXH calculation benchmarks")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds spent per benchmark")
+    parser.add_argument("--samples", type=int, default=15, help="timing samples per benchmark")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--compare", help="previous JSON report to compare medians against")
+    parser.add_argument("--fail-over", type=float, help="exit 1 if any median is slower by more than this percent")
+    args = parser.parse_args(argv)
+
+    snapshot = CoefficientSnapshot.from_models(seed_coefficients())
+    loop = asyncio.new_event_loop()
+
+    benchmarks = {}
+    benchmarks.update(engine_benchmarks(snapshot))
+    benchmarks.update(validation_benchmarks())
+    api, cleanup = api_benchmarks(snapshot, loop)
+    benchmarks.update(api)
+
+    results = []
+    try:
+        for name, fn in benchmarks.items():
+            if args.filter and args.filter not in name:
+                continue
+            result = {"name": name}
+            result.update(measure(fn, args.min_time, args.samples))
+            results.append(result)
+            print(f"{name}: {result['median_us']:.1f} us", file=sys.stderr)
+    finally:
+        cleanup()
+        loop.close()
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "coefficient_version": snapshot.version,
+        "results": results,
+    }
+
+    exit_code = 0
+    if args.compare:
+        report["comparison"] = compare(results, args.compare)
+        if args.fail_over is not None and any(c["change_pct"] > args.fail_over for c in report["comparison"]):
+            exit_code = 1
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
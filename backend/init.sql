@@ -3,6 +3,8 @@
 -- Create coefficient table
 CREATE TABLE IF NOT EXISTS coefficient (
     id SERIAL PRIMARY KEY,
+    -- Year of the circular (coefficient table) the row belongs to
+    calculation_year INTEGER NOT NULL DEFAULT 2025,
     year INTEGER NOT NULL,
     month INTEGER NOT NULL DEFAULT 1,
     coefficient DECIMAL(10, 4) NOT NULL,
@@ -11,15 +13,42 @@ CREATE TABLE IF NOT EXISTS coefficient (
     is_active BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(year, month)
+    UNIQUE(calculation_year, year, month)
 );
 
+-- Upgrade tables created before calculation_year existed (CREATE TABLE IF NOT
+-- EXISTS leaves them untouched): existing rows belong to the 2025 table, and
+-- the old UNIQUE(year, month) becomes UNIQUE(calculation_year, year, month).
+-- Safe to re-run: psql -f init.sql upgrades an existing database.
+ALTER TABLE coefficient ADD COLUMN IF NOT EXISTS calculation_year INTEGER NOT NULL DEFAULT 2025;
+ALTER TABLE coefficient DROP CONSTRAINT IF EXISTS coefficient_year_month_key;
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'coefficient'::regclass AND conname = 'coefficient_calculation_year_year_month_key'
+    ) THEN
+        ALTER TABLE coefficient
+            ADD CONSTRAINT coefficient_calculation_year_year_month_key UNIQUE (calculation_year, year, month);
+    END IF;
+END $$;
+
 -- Create indexes
 CREATE INDEX IF NOT EXISTS idx_coefficient_year_month ON coefficient(year, month);
 CREATE INDEX IF NOT EXISTS idx_coefficient_active ON coefficient(is_active) WHERE is_active = TRUE;
+CREATE INDEX IF NOT EXISTS idx_coefficient_calculation_year ON coefficient(calculation_year);
+
+-- Bumped by every coefficient import (CoefficientService.import_circular)
+CREATE TABLE IF NOT EXISTS coefficient_version (
+    id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+INSERT INTO coefficient_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
 
 -- Insert coefficient data (based on Thông tư 20/2023/TT-BLĐTBXH)
 -- Official inflation adjustment coefficients for salary calculation
+-- (calculation_year 2025 table)
 INSERT INTO coefficient (year, month, coefficient, effective_from, effective_to, is_active) VALUES
 (2025, 1, 1.00, '2025-01-01', '2025-12-31', TRUE),
 (2024, 1, 1.00, '2024-01-01', '2024-12-31', TRUE),
@@ -53,7 +82,7 @@ INSERT INTO coefficient (year, month, coefficient, effective_from, effective_to,
 (1996, 1, 4.36, '1996-01-01', '1996-12-31', TRUE),
 (1995, 1, 4.61, '1995-01-01', '1995-12-31', TRUE),
 (1994, 1, 5.43, '1994-01-01', '1994-12-31', TRUE)
-ON CONFLICT (year, month) DO NOTHING;
+ON CONFLICT (calculation_year, year, month) DO NOTHING;
 
 -- Create function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -65,7 +94,32 @@ END;
 $$ language 'plpgsql';
 
 -- Create trigger for updated_at
+DROP TRIGGER IF EXISTS update_coefficient_updated_at ON coefficient;
 CREATE TRIGGER update_coefficient_updated_at
 BEFORE UPDATE ON coefficient
 FOR EACH ROW
 EXECUTE FUNCTION update_updated_at_column();
+
+-- Tell API workers (LISTEN coefficient_changed, see
+-- app.services.invalidation.PostgresInvalidationListener) to reload their
+-- coefficient snapshot after any change, including direct edits. Statement
+-- level, and PostgreSQL delivers one notification per transaction on commit.
+CREATE OR REPLACE FUNCTION notify_coefficient_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('coefficient_changed', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS notify_coefficient_change ON coefficient;
+CREATE TRIGGER notify_coefficient_change
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON coefficient
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_coefficient_change();
+
+DROP TRIGGER IF EXISTS notify_coefficient_version_change ON coefficient_version;
+CREATE TRIGGER notify_coefficient_version_change
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON coefficient_version
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_coefficient_change();
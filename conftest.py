@@ -0,0 +1,106 @@
+"""
+Shared pytest setup for the root-level test scripts.
+
+Makes the backend package importable and points the app at a throwaway
+SQLite database seeded with the coefficients from backend/init.sql, so the
+API can be exercised without PostgreSQL.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bhxh_test_"), "bhxh_test.db")
+)
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("RESULT_CACHE_ENABLED", "false")
+os.environ.setdefault("COEFFICIENT_INVALIDATION_ENABLED", "false")
+
+from app.models.coefficient import Coefficient  # noqa: E402
+from app.schemas.period import PeriodSchema  # noqa: E402
+from app.utils.seed import load_seed_coefficients  # noqa: E402
+
+
+# Calculation scenarios shared by the engine tests
+# (from test_simple.py and test_official_example.py)
+SCENARIOS = {
+    "mai": (
+        [
+            PeriodSchema(start_date="2021-01-01", end_date="2021-12-31", monthly_salary=5000000),
+            PeriodSchema(start_date="2022-01-01", end_date="2022-12-31", monthly_salary=6000000),
+            PeriodSchema(start_date="2023-01-01", end_date="2023-04-30", monthly_salary=6000000),
+            PeriodSchema(start_date="2023-05-01", end_date="2023-12-31", monthly_salary=7000000),
+            PeriodSchema(start_date="2024-01-01", end_date="2024-04-30", monthly_salary=7000000),
+        ],
+        [(2021, 1.07), (2022, 1.03), (2023, 1.0), (2024, 1.0)],
+    ),
+    "one_year": (
+        [PeriodSchema(start_date="2025-01-01", end_date="2025-12-31", monthly_salary=50000000)],
+        [(2025, 1.0)],
+    ),
+    "less_than_1_year": (
+        [PeriodSchema(start_date="2024-01-01", end_date="2024-06-30", monthly_salary=10000000)],
+        [(2024, 1.0)],
+    ),
+    "official_worker_a": (
+        [
+            PeriodSchema(start_date="2013-01-01", end_date="2013-12-31", monthly_salary=1200000),
+            PeriodSchema(start_date="2014-01-01", end_date="2014-09-30", monthly_salary=1445000),
+            PeriodSchema(start_date="2014-10-01", end_date="2014-12-31", monthly_salary=2140000),
+            PeriodSchema(start_date="2015-07-01", end_date="2015-12-31", monthly_salary=2140000),
+            PeriodSchema(start_date="2016-01-01", end_date="2016-02-29", monthly_salary=2140000),
+            PeriodSchema(start_date="2016-03-01", end_date="2016-07-31", monthly_salary=2515000),
+        ],
+        [(2013, 1.08), (2014, 1.03), (2015, 1.03), (2016, 1.00)],
+    ),
+}
+
+
+def scenario_coefficients(pairs):
+    """Yearly Coefficient models from (year, coefficient) pairs"""
+    return [Coefficient(year=year, coefficient=value, is_active=True) for year, value in pairs]
+
+
+@pytest.fixture(scope="session")
+def seeded_db():
+    """Create the schema and seed the official coefficients once per session"""
+    from app.database import Base, SessionLocal, engine
+    from app.models.coefficient import Coefficient
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if db.query(Coefficient).count() == 0:
+            db.add_all([
+                Coefficient(
+                    year=year,
+                    month=month,
+                    coefficient=coefficient,
+                    effective_from=datetime(year, 1, 1),
+                    effective_to=datetime(year, 12, 31, 23, 59, 59),
+                    is_active=True
+                )
+                for year, month, coefficient in load_seed_coefficients()
+            ])
+            db.commit()
+    finally:
+        db.close()
+    return engine
+
+
+@pytest.fixture(scope="session")
+def client(seeded_db):
+    """In-process API client backed by the seeded SQLite database"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,70 @@
+"""
+Test batch calculation endpoint: POST /api/v1/calculate/batch
+"""
+
+
+def test_batch_matches_single_calculation(client):
+    """Each batch item must give the same result as the single endpoint"""
+    items = [
+        {"periods": [{"start_date": "01/2021", "end_date": "12/2023", "monthly_salary": 6000000}]},
+        {"periods": [
+            {"start_date": "01/2010", "end_date": "12/2013", "monthly_salary": 5000000},
+            {"start_date": "01/2014", "end_date": "12/2023", "monthly_salary": 10000000},
+        ]},
+        {"periods": [{"start_date": "01/2024", "end_date": "06/2024", "monthly_salary": 10000000}]},
+    ]
+
+    response = client.post("/api/v1/calculate/batch", json={"items": items})
+    assert response.status_code == 200
+    body = response.json()
+
+    assert body["succeeded"] == 3
+    assert body["failed"] == 0
+
+    for index, item in enumerate(items):
+        single = client.post("/api/v1/calculate", json=item).json()
+        batch_result = body["results"][index]
+        assert batch_result["index"] == index
+        assert batch_result["error"] is None
+        assert batch_result["result"]["total_amount"] == single["total_amount"]
+        assert batch_result["result"]["average_salary"] == single["average_salary"]
+        assert batch_result["result"]["total_months"] == single["total_months"]
+
+
+def test_batch_reports_errors_per_item(client):
+    """An invalid item yields an error entry without failing the other items"""
+    items = [
+        {"periods": [{"start_date": "01/2021", "end_date": "12/2021", "monthly_salary": 5000000}]},
+        {"periods": [{"start_date": "13/2021", "end_date": "12/2021", "monthly_salary": 5000000}]},
+        {"periods": [
+            {"start_date": "01/2021", "end_date": "12/2021", "monthly_salary": 5000000},
+            {"start_date": "06/2021", "end_date": "12/2022", "monthly_salary": 5000000},
+        ]},
+        {"periods": []},
+    ]
+
+    response = client.post("/api/v1/calculate/batch", json={"items": items})
+    assert response.status_code == 200
+    body = response.json()
+
+    assert body["succeeded"] == 1
+    assert body["failed"] == 3
+    assert body["results"][0]["result"]["total_months"] == 12
+    for failed in body["results"][1:]:
+        assert failed["result"] is None
+        assert failed["error"]
+    assert "overlap" in body["results"][2]["error"]
+
+
+def test_batch_reports_non_object_items(client):
+    """Items that are not objects are item errors, not a 422 for the whole batch"""
+    item = {"periods": [{"start_date": "01/2021", "end_date": "12/2021", "monthly_salary": 5000000}]}
+
+    response = client.post("/api/v1/calculate/batch", json={"items": [item, None, 42, "x"]})
+    assert response.status_code == 200
+    body = response.json()
+
+    assert (body["succeeded"], body["failed"]) == (1, 3)
+    assert body["results"][0]["result"]["total_months"] == 12
+    assert body["results"][1]["error"] == "Item must be an object, got NoneType"
+    assert [r["index"] for r in body["results"]] == [0, 1, 2, 3]
@@ -0,0 +1,32 @@
+"""
+Smoke test for the benchmark suite (backend/benchmarks)
+"""
+
+import json
+
+from app.schemas.calculation_request import CalculationRequest
+from benchmarks import run
+from benchmarks.careers import CAREERS, generate
+
+
+def test_synthetic_careers_are_valid_requests():
+    for kind in CAREERS:
+        request = CalculationRequest.model_validate({"periods": generate(kind)})
+        assert request.periods
+
+    assert len(generate("monthly_500")) == 500
+    assert generate("forty_years") == generate("forty_years")
+
+
+def test_runner_writes_machine_readable_report(tmp_path):
+    output = tmp_path / "bench.json"
+    args = ["--filter", "short", "--min-time", "0.01", "--samples", "2", "--output", str(output)]
+
+    assert run.main(args) == 0
+    report = json.loads(output.read_text(encoding="utf-8"))
+    names = {r["name"] for r in report["results"]}
+    assert {"engine.calculate[short,full]", "schema.CalculationRequest[short]", "api.calculate[short]"} <= names
+    assert all(r["median_us"] > 0 for r in report["results"])
+
+    assert run.main(args + ["--compare", str(output)]) == 0
+    assert json.loads(output.read_text(encoding="utf-8"))["comparison"]
@@ -0,0 +1,52 @@
+"""
+Test verbosity levels: summary / breakdown / full
+"""
+
+from app.models.coefficient import Coefficient
+from app.schemas.calculation_request import CalculationRequest
+from app.schemas.period import PeriodSchema
+from app.services.calculation_engine import CalculationEngine
+
+
+PERIODS = [
+    PeriodSchema(start_date="01/2012", end_date="06/2015", monthly_salary=5000000),
+    PeriodSchema(start_date="07/2015", end_date="12/2020", monthly_salary=8000000),
+]
+COEFFICIENTS = [Coefficient(year=year, coefficient=1.1, is_active=True) for year in range(2012, 2021)]
+
+
+def test_verbosity_levels_build_only_requested_detail():
+    engine = CalculationEngine()
+    engine.load_coefficients(COEFFICIENTS)
+
+    summary = engine.calculate(PERIODS, verbosity="summary")
+    breakdown = engine.calculate(PERIODS, verbosity="breakdown")
+    full = engine.calculate(PERIODS, verbosity="full")
+
+    for result in (summary, breakdown):
+        assert result.total_amount == full.total_amount
+        assert result.average_salary == full.average_salary
+        assert result.total_months == full.total_months
+
+    assert summary.period_breakdowns is None and summary.explanation is None
+    assert breakdown.period_breakdowns == full.period_breakdowns and breakdown.explanation is None
+    assert full.explanation.steps[-1].description == "Tổng số tiền BHXH một lần được nhận"
+
+
+def test_default_request_verbosity_is_full():
+    request = CalculationRequest(periods=[{"start_date": "01/2020", "end_date": "12/2020", "monthly_salary": 5000000}])
+    assert request.verbosity == "full"
+
+
+def test_summary_request_through_api(client):
+    payload = {
+        "periods": [{"start_date": "01/2015", "end_date": "12/2019", "monthly_salary": 9000000}],
+        "verbosity": "summary"
+    }
+    body = client.post("/api/v1/calculate", json=payload).json()
+    full = client.post("/api/v1/calculate", json={**payload, "verbosity": "full"}).json()
+
+    assert body["total_amount"] == full["total_amount"]
+    assert body["period_breakdowns"] is None
+    assert body["explanation"] is None
+    assert client.post("/api/v1/calculate", json={**payload, "verbosity": "verbose"}).status_code == 422
@@ -0,0 +1,129 @@
+"""
+Test calculation_year selection of versioned coefficient tables
+"""
+
+import pytest
+
+from app.main import app
+from app.models.coefficient import Coefficient
+from app.schemas.period import PeriodSchema
+from app.services.calculation_engine import CalculationEngine
+from app.services.coefficient_snapshot import (
+    CoefficientSnapshot, CompiledTableCache, get_coefficient_snapshot
+)
+from app.services.snapshot_file import read_snapshot_file, write_snapshot_file
+
+
+def _table(calculation_year, coefficients):
+    return [
+        Coefficient(calculation_year=calculation_year, year=year, month=1, coefficient=value, is_active=True)
+        for year, value in coefficients.items()
+    ]
+
+
+# Two circulars: the 2024 table has different coefficients for 2020-2021
+TABLES = (
+    _table(2024, {2020: 1.10, 2021: 1.05, 2022: 1.02, 2023: 1.00, 2024: 1.00})
+    + _table(2025, {2020: 1.08, 2021: 1.07, 2022: 1.03, 2023: 1.00, 2024: 1.00, 2025: 1.00})
+)
+
+PERIODS = [{"start_date": "01/2020", "end_date": "12/2021", "monthly_salary": 10000000}]
+
+
+@pytest.fixture
+def snapshot():
+    return CoefficientSnapshot.from_models(TABLES)
+
+
+def test_latest_table_is_the_default(snapshot):
+    assert snapshot.calculation_years == (2024, 2025)
+    assert snapshot.calculation_year == 2025
+    assert snapshot.by_year[2020] == 1.08
+    assert snapshot.for_calculation_year(2025) is snapshot
+    assert snapshot.for_calculation_year(2030) is snapshot
+
+
+def test_older_table_is_compiled_once(snapshot):
+    table_2024 = snapshot.for_calculation_year(2024)
+    assert table_2024.calculation_year == 2024
+    assert table_2024.by_year[2020] == 1.10
+    assert 2025 not in table_2024.by_year
+    assert table_2024.version != snapshot.version
+
+    assert snapshot.for_calculation_year(2024) is table_2024
+    # A year between tables uses the latest table issued before it
+    assert CoefficientSnapshot.from_models(TABLES).for_calculation_year(2024) is table_2024
+
+
+def test_year_before_first_table_is_rejected(snapshot):
+    with pytest.raises(ValueError, match="No coefficient table for calculation year 2019"):
+        snapshot.for_calculation_year(2019)
+
+
+def test_compiled_table_cache_is_bounded(snapshot):
+    cache = CompiledTableCache(maxsize=2)
+    snapshots = [
+        CoefficientSnapshot.from_models(TABLES + _table(2026, {2026: 1.0 + i / 100}))
+        for i in range(3)
+    ]
+    for s in snapshots:
+        cache.get(s, 2024)
+    assert len(cache) == 2
+
+
+def test_engine_uses_selected_table(snapshot):
+    periods = [PeriodSchema(**p) for p in PERIODS]
+    engine = CalculationEngine()
+
+    latest = engine.calculate(periods, snapshot.for_calculation_year(2025), verbosity="summary")
+    older = engine.calculate(periods, snapshot.for_calculation_year(2024), verbosity="summary")
+
+    # 12 × 1.08 + 12 × 1.07 vs 12 × 1.10 + 12 × 1.05: same sum, different split
+    assert latest.average_salary == older.average_salary == 10750000.0
+
+    periods = [PeriodSchema(start_date="01/2020", end_date="12/2020", monthly_salary=10000000)]
+    assert engine.calculate(periods, snapshot.for_calculation_year(2024)).average_salary == 11000000.0
+    assert engine.calculate(periods, snapshot.for_calculation_year(2025)).average_salary == 10800000.0
+
+
+def test_snapshot_file_keeps_tables(tmp_path, snapshot):
+    path = str(tmp_path / "coefficients.bin")
+    write_snapshot_file(snapshot, path)
+
+    loaded = read_snapshot_file(path)
+    assert loaded.version == snapshot.version
+    assert loaded.calculation_years == (2024, 2025)
+    assert loaded.for_calculation_year(2024).by_year[2020] == 1.10
+
+
+def test_api_honors_calculation_year(client, snapshot):
+    async def snapshot_dependency():
+        return snapshot
+
+    app.dependency_overrides[get_coefficient_snapshot] = snapshot_dependency
+    try:
+        periods = [{"start_date": "01/2020", "end_date": "12/2020", "monthly_salary": 10000000}]
+
+        for year, expected in (("2024", 11000000.0), ("2025", 10800000.0), ("2026", 10800000.0)):
+            response = client.post("/api/v1/calculate", json={"periods": periods, "calculation_year": year})
+            assert response.status_code == 200
+            assert response.json()["average_salary"] == expected
+
+        response = client.post("/api/v1/calculate", json={"periods": periods, "calculation_year": "2019"})
+        assert response.status_code == 400
+        assert "No coefficient table" in response.json()["detail"]
+
+        response = client.post("/api/v1/calculate", json={"periods": periods, "calculation_year": "20x5"})
+        assert response.status_code == 422
+
+        response = client.post("/api/v1/calculate/batch", json={"items": [
+            {"periods": periods, "calculation_year": "2024", "verbosity": "summary"},
+            {"periods": periods, "calculation_year": "2025", "verbosity": "summary"},
+            {"periods": periods, "calculation_year": "2019"},
+        ]})
+        results = response.json()["results"]
+        assert results[0]["result"]["average_salary"] == 11000000.0
+        assert results[1]["result"]["average_salary"] == 10800000.0
+        assert "No coefficient table" in results[2]["error"]
+    finally:
+        app.dependency_overrides.pop(get_coefficient_snapshot, None)
@@ -0,0 +1,166 @@
+"""
+Test the offline roster CLI and coefficient snapshot files
+"""
+
+import csv
+from datetime import datetime
+
+import pytest
+
+from app.cli import calculate_roster, main
+from app.models.coefficient import Coefficient
+from app.schemas.period import PeriodSchema
+from app.services.calculation_engine import CalculationEngine
+from app.services.coefficient_snapshot import CoefficientSnapshot
+from app.services.snapshot_file import read_snapshot_file, write_snapshot_json
+from conftest import load_seed_coefficients
+
+ROSTER = [
+    ("E001", "01/2010", "12/2013", "5000000"),
+    ("E001", "01/2014", "06/2020", "8000000"),
+    ("E002", "03/2024", "10/2024", "12000000"),
+    ("E003", "01/2020", "12/2020", "5000000"),
+    ("E003", "06/2020", "12/2021", "5000000"),  # overlaps the previous row
+    ("E004", "13/2020", "12/2021", "5000000"),  # invalid month
+    ("E005", "01/1995", "12/2024", "7500000"),
+]
+
+
+@pytest.fixture
+def snapshot():
+    return CoefficientSnapshot.from_models([
+        Coefficient(year=year, month=month, coefficient=coefficient, is_active=True)
+        for year, month, coefficient in load_seed_coefficients()
+    ])
+
+
+@pytest.fixture
+def files(tmp_path, snapshot):
+    roster = tmp_path / "roster.csv"
+    with open(roster, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["employee_id", "start_date", "end_date", "monthly_salary"])
+        writer.writerows(ROSTER)
+
+    coefficients = tmp_path / "coefficients.json"
+    write_snapshot_json(snapshot, str(coefficients))
+    return roster, coefficients, tmp_path / "results.csv"
+
+
+def _expected(snapshot, employee_id):
+    periods = [
+        PeriodSchema(start_date=start, end_date=end, monthly_salary=float(salary))
+        for eid, start, end, salary in ROSTER if eid == employee_id
+    ]
+    engine = CalculationEngine()
+    return engine.calculate(periods, snapshot, verbosity="summary")
+
+
+def _read_results(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_snapshot_file_round_trip(tmp_path, snapshot):
+    path = tmp_path / "coefficients.json"
+    write_snapshot_json(snapshot, str(path))
+
+    loaded = read_snapshot_file(str(path))
+    assert loaded.version == snapshot.version
+    assert loaded.prefix == snapshot.prefix
+
+
+def test_snapshot_file_rejects_edited_content(tmp_path, snapshot):
+    path = tmp_path / "coefficients.json"
+    write_snapshot_json(snapshot, str(path))
+    path.write_text(path.read_text().replace('"coefficient": 1.0', '"coefficient": 1.5', 1))
+
+    with pytest.raises(ValueError):
+        read_snapshot_file(str(path))
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_calculate_roster(files, snapshot, workers):
+    roster, coefficients, output = files
+    report = calculate_roster(
+        str(roster), str(coefficients), str(output), workers=workers, chunk_size=2, progress_interval=0
+    )
+
+    assert report["employees"] == 5
+    assert report["periods"] == len(ROSTER)
+    assert report["errors"] == 2
+
+    results = {row["employee_id"]: row for row in _read_results(output)}
+    assert list(results) == ["E001", "E002", "E003", "E004", "E005"]
+
+    for employee_id in ("E001", "E002", "E005"):
+        expected = _expected(snapshot, employee_id)
+        assert float(results[employee_id]["total_amount"]) == expected.total_amount
+        assert float(results[employee_id]["average_salary"]) == expected.average_salary
+        assert int(results[employee_id]["total_months"]) == expected.total_months
+        assert results[employee_id]["error"] == ""
+
+    assert "overlap" in results["E003"]["error"]
+    assert results["E004"]["error"].startswith("periods.0.start_date")
+
+
+def test_xlsx_roster_to_parquet(tmp_path, files, snapshot):
+    openpyxl = pytest.importorskip("openpyxl")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    _, coefficients, _ = files
+    roster = tmp_path / "roster.xlsx"
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["employee_id", "start_date", "end_date", "monthly_salary"])
+    for employee_id, start, end, salary in ROSTER:
+        if employee_id in ("E001", "E005"):
+            # Typed cells, as spreadsheets usually hold them
+            month, year = map(int, start.split("/"))
+            sheet.append([employee_id, datetime(year, month, 1), end, float(salary)])
+        else:
+            sheet.append([employee_id, start, end, salary])
+    workbook.save(roster)
+
+    output = tmp_path / "results.parquet"
+    assert main(["calculate", str(roster), "--coefficients", str(coefficients),
+                 "--output", str(output), "--workers", "0", "--progress", "0"]) == 0
+
+    results = {row["employee_id"]: row for row in pq.read_table(output).to_pylist()}
+    assert list(results) == ["E001", "E002", "E003", "E004", "E005"]
+    for employee_id in ("E001", "E002", "E005"):
+        expected = _expected(snapshot, employee_id)
+        assert results[employee_id]["total_amount"] == expected.total_amount
+        assert results[employee_id]["total_months"] == expected.total_months
+        assert results[employee_id]["error"] is None
+    assert "overlap" in results["E003"]["error"]
+
+
+def test_roster_rows_must_be_grouped(tmp_path, files):
+    roster, coefficients, output = files
+    with open(roster, "a", newline="") as f:
+        csv.writer(f).writerow(["E001", "01/2021", "12/2021", "5000000"])
+
+    with pytest.raises(SystemExit, match="not consecutive"):
+        main(["calculate", str(roster), "--coefficients", str(coefficients),
+              "--output", str(output), "--workers", "0", "--progress", "0", "--check-grouping"])
+
+
+def test_unexpected_error_is_reported_per_employee(files, monkeypatch):
+    from app import cli
+
+    roster, coefficients, output = files
+    cli._init_worker(str(coefficients))
+    calculate = cli._engine.calculate
+
+    def flaky(periods, *args, **kwargs):
+        if periods[0].monthly_salary == 12000000:
+            raise RuntimeError("boom")
+        return calculate(periods, *args, **kwargs)
+
+    monkeypatch.setattr(cli._engine, "calculate", flaky)
+    results = {row[0]: row for row in cli._calculate_chunk(list(cli.read_roster(str(roster))))}
+
+    assert "boom" in results["E002"][5]
+    assert results["E001"][5] is None
+    assert results["E005"][4] > 0
@@ -0,0 +1,123 @@
+"""
+Test conditional GET and prepared bodies of the coefficient endpoints
+"""
+
+import pytest
+
+from app import responses
+from app.main import app
+from app.models.coefficient import Coefficient
+from app.services.coefficient_service import AsyncCoefficientService
+from app.services.coefficient_snapshot import CoefficientSnapshot, get_coefficient_snapshot
+
+
+def _snapshot(value):
+    return CoefficientSnapshot.from_models([
+        Coefficient(id=1, year=2023, month=1, coefficient=value, is_active=True),
+        Coefficient(id=2, year=2024, month=1, coefficient=1.0, is_active=True),
+        Coefficient(id=3, year=2024, month=7, coefficient=0.98, is_active=True),
+    ])
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    """Serve a given snapshot and fail on any database access"""
+    current = {}
+
+    async def snapshot_dependency():
+        return current["snapshot"]
+
+    async def no_database(*args, **kwargs):
+        raise AssertionError("coefficient routes must not query the database")
+
+    monkeypatch.setattr(AsyncCoefficientService, "get_all_active", no_database)
+    monkeypatch.setattr(AsyncCoefficientService, "get_by_year", no_database)
+    app.dependency_overrides[get_coefficient_snapshot] = snapshot_dependency
+
+    def use(snapshot):
+        current["snapshot"] = snapshot
+        return snapshot
+
+    yield use
+    app.dependency_overrides.pop(get_coefficient_snapshot, None)
+
+
+def test_etag_and_not_modified(client, serve):
+    snapshot = serve(_snapshot(1.05))
+
+    response = client.get("/api/v1/coefficients")
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'W/"{snapshot.version}"'
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert [row["id"] for row in response.json()] == [3, 2, 1]
+
+    response = client.get("/api/v1/coefficients", headers={"If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == f'W/"{snapshot.version}"'
+
+
+def test_new_snapshot_version_changes_etag(client, serve):
+    old = serve(_snapshot(1.05))
+    etag = client.get("/api/v1/coefficients").headers["etag"]
+
+    new = serve(_snapshot(1.06))
+    assert new.version != old.version
+    response = client.get("/api/v1/coefficients", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[-1]["coefficient"] == 1.06
+
+
+def test_body_is_serialized_once_per_version(client, serve, monkeypatch):
+    serve(_snapshot(1.05))
+    calls = []
+    encode_json = responses.encode_json
+    monkeypatch.setattr(responses, "encode_json", lambda content: calls.append(1) or encode_json(content))
+
+    first = client.get("/api/v1/coefficients", headers={"Accept-Encoding": "identity"})
+    second = client.get("/api/v1/coefficients", headers={"Accept-Encoding": "identity"})
+    assert first.content == second.content
+    assert len(calls) == 1
+
+
+def test_year_route(client, serve):
+    snapshot = serve(_snapshot(1.05))
+
+    response = client.get("/api/v1/coefficients/2024", params={"month": 8})
+    assert response.status_code == 200
+    assert response.json()["coefficient"] == 0.98
+    etag = response.headers["etag"]
+    assert etag == f'W/"{snapshot.version}-2024-8"'
+
+    assert client.get("/api/v1/coefficients/2024", params={"month": 8}, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/v1/coefficients/2024", headers={"If-None-Match": etag}).status_code == 200
+    assert client.get("/api/v1/coefficients/2024").json()["coefficient"] == 1.0
+
+    assert client.get("/api/v1/coefficients/1999").status_code == 404
+    assert client.get("/api/v1/coefficients/1999").status_code == 404
+
+
+def test_etag_matching():
+    class Request:
+        def __init__(self, value):
+            self.headers = {"if-none-match": value}
+
+    assert responses.etag_matches(Request('W/"abc"'), 'W/"abc"')
+    assert responses.etag_matches(Request('"abc"'), 'W/"abc"')
+    assert responses.etag_matches(Request('"x", W/"abc"'), 'W/"abc"')
+    assert responses.etag_matches(Request("*"), 'W/"abc"')
+    assert not responses.etag_matches(Request('W/"abd"'), 'W/"abc"')
+
+
+def test_prepared_body_cache_is_per_version():
+    cache = responses.PreparedBodyCache(maxsize=2)
+    first = cache.get("v1", "all", 'W/"v1"', lambda: [1])
+    assert cache.get("v1", "all", 'W/"v1"', lambda: [2]) is first
+    assert first.encoded("gzip") is first.encoded("gzip")
+
+    cache.get("v1", "a", "", lambda: 1)
+    cache.get("v1", "b", "", lambda: 2)
+    assert len(cache) == 2
+
+    assert cache.get("v2", "all", 'W/"v2"', lambda: [2]).body == b"[2]"
+    assert len(cache) == 1
@@ -0,0 +1,136 @@
+"""
+Test CoefficientService.import_circular (staged upsert + version bump)
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.coefficient import Coefficient
+from app.services.coefficient_service import CoefficientService
+from app.services.coefficient_snapshot import CoefficientSnapshot
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _circular(coefficients):
+    return [{"year": year, "coefficient": value} for year, value in coefficients.items()]
+
+
+def _active(db, calculation_year):
+    rows = db.query(Coefficient).filter(
+        Coefficient.calculation_year == calculation_year, Coefficient.is_active == True
+    ).order_by(Coefficient.year, Coefficient.month).all()
+    return {(row.year, row.month): row.coefficient for row in rows}
+
+
+def test_import_inserts_then_upserts(db):
+    service = CoefficientService(db)
+
+    first = service.import_circular(_circular({2020: 1.10, 2021: 1.05, 2022: 1.00}), 2022)
+    assert (first.inserted, first.updated, first.deactivated, first.version) == (3, 0, 0, 1)
+
+    # Re-importing the same calculation year updates in place instead of hitting UNIQUE
+    other = service.import_circular(_circular({2021: 1.07, 2022: 1.02, 2023: 1.00}), 2023)
+    assert (other.calculation_year, other.inserted) == (2023, 3)
+    second = service.import_circular(_circular({2021: 1.06, 2022: 1.01}), 2022)
+    assert (second.inserted, second.updated, second.deactivated, second.version) == (0, 2, 1, 3)
+
+    assert _active(db, 2022) == {(2021, 1): 1.06, (2022, 1): 1.01}
+    # Other circulars are untouched
+    assert _active(db, 2023) == {(2021, 1): 1.07, (2022, 1): 1.02, (2023, 1): 1.0}
+
+
+def test_import_reactivates_and_keeps_missing(db):
+    service = CoefficientService(db)
+    service.import_circular(_circular({2020: 1.10, 2021: 1.05}), 2021)
+    service.import_circular(_circular({2021: 1.05}), 2021)
+    assert _active(db, 2021) == {(2021, 1): 1.05}
+
+    result = service.import_circular(_circular({2020: 1.12}), 2021, deactivate_missing=False)
+    assert (result.inserted, result.updated, result.deactivated) == (0, 1, 0)
+    assert _active(db, 2021) == {(2020, 1): 1.12, (2021, 1): 1.05}
+
+
+def test_import_monthly_rows_feed_snapshot(db):
+    service = CoefficientService(db)
+    service.import_circular([
+        {"year": 2024, "month": 1, "coefficient": 1.02},
+        {"year": 2024, "month": 7, "coefficient": 1.00},
+    ], 2024)
+
+    snapshot = CoefficientSnapshot.from_models(service.get_all_active())
+    assert snapshot.coefficient_at(2024 * 12 + 5) == 1.02
+    assert snapshot.coefficient_at(2024 * 12 + 6) == 1.00
+
+
+def test_invalid_circular_changes_nothing(db):
+    service = CoefficientService(db)
+    service.import_circular(_circular({2020: 1.10}), 2021)
+    token = service.get_version_token()
+
+    for rows in (
+        [],
+        [{"year": 2020, "month": 13, "coefficient": 1.0}],
+        [{"year": 2020, "month": 0, "coefficient": 1.0}],
+        [{"year": 2020, "month": "", "coefficient": 1.0}],
+        [{"year": 2020, "month": None, "coefficient": 1.0}],
+        [{"year": 2020, "month": 1, "coefficient": 0}],
+        [{"year": 2030, "month": 1, "coefficient": 1.0}],
+        [{"year": "x", "coefficient": 1.0}],
+        _circular({2020: 1.0}) + _circular({2020: 1.1}),
+    ):
+        with pytest.raises(ValueError):
+            service.import_circular(rows, 2021)
+
+    assert _active(db, 2021) == {(2020, 1): 1.10}
+    assert service.get_version_token() == token
+
+
+def test_import_leaves_regular_staging_name_alone(db):
+    db.execute(text("CREATE TABLE coefficient_import (note TEXT)"))
+    db.execute(text("INSERT INTO coefficient_import VALUES ('keep me')"))
+    db.commit()
+
+    service = CoefficientService(db)
+    service.import_circular(_circular({2020: 1.10}), 2021)
+    service.import_circular(_circular({2020: 1.12}), 2021)
+
+    assert db.execute(text("SELECT note FROM coefficient_import")).scalars().all() == ["keep me"]
+    assert _active(db, 2021) == {(2020, 1): 1.12}
+
+
+def test_failed_merge_rolls_back(db, monkeypatch):
+    service = CoefficientService(db)
+    service.import_circular(_circular({2020: 1.10, 2021: 1.05}), 2021)
+
+    def fail():
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(service, "_bump_version", fail)
+    with pytest.raises(RuntimeError):
+        service.import_circular(_circular({2021: 2.0}), 2021)
+
+    assert _active(db, 2021) == {(2020, 1): 1.10, (2021, 1): 1.05}
+
+
+def test_version_token_changes_once_per_import(db):
+    service = CoefficientService(db)
+    service.import_circular(_circular({2020: 1.10}), 2021)
+    token = service.get_version_token()
+
+    # Same values re-imported: only the import version tells readers to reload
+    service.import_circular(_circular({2020: 1.10}), 2021)
+    new_token = service.get_version_token()
+    assert new_token != token
+    assert new_token[-1] == token[-1] + 1
@@ -0,0 +1,87 @@
+"""
+Test GET /api/v1/coefficients/range (snapshot slices and database fallback)
+"""
+
+import random
+
+from app.main import app
+from app.models.coefficient import Coefficient
+from app.services.coefficient_snapshot import CoefficientSnapshot, get_loaded_snapshot
+
+
+def _multi_table_snapshot():
+    rows = []
+    for calculation_year, years in ((2023, range(1994, 2024)), (2025, range(1995, 2026))):
+        for year in years:
+            rows.append(Coefficient(
+                id=len(rows) + 1, calculation_year=calculation_year, year=year, month=1,
+                coefficient=1.0 + (2025 - year) / 100, is_active=True
+            ))
+            if year % 5 == 0:
+                rows.append(Coefficient(
+                    id=len(rows) + 1, calculation_year=calculation_year, year=year, month=7,
+                    coefficient=1.0, is_active=True
+                ))
+    return CoefficientSnapshot.from_models(rows)
+
+
+def test_rows_in_year_range_matches_filter():
+    snapshot = _multi_table_snapshot()
+    rnd = random.Random(3)
+    for _ in range(200):
+        start = rnd.randint(1990, 2030)
+        end = rnd.randint(start, 2031)
+        expected = tuple(row for row in snapshot.rows if start <= row.year <= end)
+        assert snapshot.rows_in_year_range(start, end) == expected
+
+
+def test_range_route_is_not_shadowed(client):
+    response = client.get("/api/v1/coefficients/range", params={"start_year": 2020, "end_year": 2022})
+    assert response.status_code == 200
+    years = [row["year"] for row in response.json()]
+    assert years and all(2020 <= year <= 2022 for year in years)
+    assert years == sorted(years, reverse=True)
+
+    etag = response.headers["etag"]
+    response = client.get(
+        "/api/v1/coefficients/range", params={"start_year": 2020, "end_year": 2022}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    response = client.get("/api/v1/coefficients/range", params={"start_year": 2022, "end_year": 2020})
+    assert response.status_code == 400
+
+
+def test_snapshot_path_opens_no_session(client, monkeypatch):
+    from app.routers import coefficient as coefficient_router
+
+    def no_session():
+        raise AssertionError("database session opened")
+
+    monkeypatch.setattr(coefficient_router, "AsyncSessionLocal", no_session)
+    response = client.get("/api/v1/coefficients/range", params={"start_year": 2010, "end_year": 2015})
+    assert response.status_code == 200
+    assert response.json()
+
+
+def test_database_fallback_matches_snapshot(client):
+    params = {"start_year": 2010, "end_year": 2015}
+    from_snapshot = client.get("/api/v1/coefficients/range", params=params)
+
+    async def not_loaded():
+        return None
+
+    app.dependency_overrides[get_loaded_snapshot] = not_loaded
+    try:
+        from_database = client.get("/api/v1/coefficients/range", params=params)
+    finally:
+        app.dependency_overrides.pop(get_loaded_snapshot, None)
+
+    assert from_database.status_code == 200
+    assert "etag" not in from_database.headers
+    assert from_database.json() == from_snapshot.json()
+
+
+def test_year_month_index_is_declared():
+    indexes = {index.name: [column.name for column in index.columns] for index in Coefficient.__table__.indexes}
+    assert indexes["idx_coefficient_year_month"] == ["year", "month"]
@@ -0,0 +1,159 @@
+"""
+Test the in-process coefficient snapshot and its version-aware refresh
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.database import SessionLocal, AsyncSessionLocal, async_engine
+from app.models.coefficient import Coefficient
+from app.services.calculation_engine import CalculationEngine
+from app.services.coefficient_service import CoefficientService, AsyncCoefficientService
+from app.services.coefficient_snapshot import (
+    CoefficientSnapshot, CoefficientSnapshotStore, snapshot_store
+)
+from app.schemas.period import PeriodSchema
+
+
+def _coefficients():
+    return [
+        Coefficient(year=2021, month=1, coefficient=1.07, is_active=True,
+                    effective_from=datetime(2021, 1, 1), effective_to=datetime(2021, 12, 31)),
+        Coefficient(year=2022, month=1, coefficient=1.03, is_active=True,
+                    effective_from=datetime(2022, 1, 1), effective_to=datetime(2022, 12, 31)),
+        Coefficient(year=2020, month=1, coefficient=9.99, is_active=False,
+                    effective_from=datetime(2020, 1, 1), effective_to=datetime(2020, 12, 31)),
+    ]
+
+
+def test_snapshot_is_immutable_and_skips_inactive():
+    snapshot = CoefficientSnapshot.from_models(_coefficients())
+
+    assert len(snapshot) == 2
+    assert dict(snapshot.by_year) == {2021: 1.07, 2022: 1.03}
+    with pytest.raises(AttributeError):
+        snapshot.version = "other"
+    with pytest.raises(TypeError):
+        snapshot.by_year[2023] = 1.0
+
+
+def test_snapshot_version_is_content_hash():
+    first = CoefficientSnapshot.from_models(_coefficients())
+    second = CoefficientSnapshot.from_models(list(reversed(_coefficients())))
+    assert first.version == second.version
+
+    changed = _coefficients()
+    changed[0].coefficient = 1.08
+    assert CoefficientSnapshot.from_models(changed).version != first.version
+
+
+def test_engine_gives_same_result_with_snapshot_or_list():
+    periods = [PeriodSchema(start_date="01/2021", end_date="06/2022", monthly_salary=5000000)]
+    from_list = CalculationEngine().calculate(periods, _coefficients())
+    from_snapshot = CalculationEngine().calculate(periods, CoefficientSnapshot.from_models(_coefficients()))
+    assert from_list.total_amount == from_snapshot.total_amount
+    assert from_list.average_salary == from_snapshot.average_salary
+
+
+def test_store_reloads_only_when_table_changes(seeded_db):
+    store = CoefficientSnapshotStore()
+    db = SessionLocal()
+    try:
+        snapshot = store.load(db)
+        assert store.refresh_if_changed(db) is False
+        assert store.current() is snapshot
+
+        row = db.query(Coefficient).filter(Coefficient.year == 2025).one()
+        original = row.coefficient
+        row.coefficient = 1.01
+        db.commit()
+        try:
+            assert store.refresh_if_changed(db) is True
+            assert store.current().by_year[2025] == 1.01
+            assert store.current().version != snapshot.version
+        finally:
+            row.coefficient = original
+            db.commit()
+    finally:
+        db.close()
+
+
+def test_calculate_path_makes_no_db_queries(client, seeded_db):
+    """Once the snapshot is loaded, /calculate must not query the database"""
+    snapshot_store.invalidate()
+    payload = {"periods": [{"start_date": "01/2015", "end_date": "12/2020", "monthly_salary": 8000000}]}
+    assert client.post("/api/v1/calculate", json=payload).status_code == 200
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = (seeded_db, async_engine.sync_engine)
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        for _ in range(5):
+            assert client.post("/api/v1/calculate", json=payload).status_code == 200
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", count_statement)
+
+    assert statements == []
+
+
+def test_coefficient_units_matches_naive_sum():
+    """Prefix-sum index gives Σ coefficient over any month range, 1.0 outside the table"""
+    snapshot = CoefficientSnapshot.from_models(_coefficients())
+    by_year = dict(snapshot.by_year)
+
+    for start in range(2019 * 12, 2024 * 12):
+        for end in range(start, 2024 * 12, 7):
+            naive = sum(round(by_year.get(month // 12, 1.0) * 10000) for month in range(start, end + 1))
+            assert snapshot.coefficient_units(start, end) == naive
+
+
+def test_year_breakdown_is_only_a_detail_view():
+    """Totals do not depend on whether the breakdown is split per calendar year"""
+    periods = [
+        PeriodSchema(start_date="03/2011", end_date="08/2016", monthly_salary=6500000),
+        PeriodSchema(start_date="09/2016", end_date="12/2022", monthly_salary=9000000),
+    ]
+    engine = CalculationEngine()
+    engine.load_coefficients(_coefficients())
+
+    by_year = engine.calculate(periods, breakdown_by_year=True)
+    by_era = engine.calculate(periods, breakdown_by_year=False)
+
+    assert by_year.total_amount == by_era.total_amount
+    assert by_year.average_salary == by_era.average_salary
+    assert len(by_year.period_breakdowns) == 13
+    assert len(by_era.period_breakdowns) == 3
+    assert sum(b.months for b in by_era.period_breakdowns) == by_era.total_months
+
+
+def test_async_service_matches_sync_service(seeded_db):
+    async def load():
+        async with AsyncSessionLocal() as db:
+            service = AsyncCoefficientService(db)
+            return (
+                [(c.year, c.coefficient) for c in await service.get_all_active()],
+                await service.get_version_token(),
+                (await service.get_by_year(2010)).coefficient,
+                [c.year for c in await service.get_by_year_range(2010, 2012)],
+            )
+
+    async_rows, async_token, async_2010, async_range = asyncio.run(load())
+
+    db = SessionLocal()
+    try:
+        service = CoefficientService(db)
+        assert async_rows == [(c.year, c.coefficient) for c in service.get_all_active()]
+        assert async_token == service.get_version_token()
+        assert async_2010 == service.get_by_year(2010).coefficient
+        assert async_range == [c.year for c in service.get_by_year_range(2010, 2012)] == [2012, 2011, 2010]
+    finally:
+        db.close()
@@ -0,0 +1,114 @@
+"""
+Test the exact (integer đồng) calculation mode against the official
+worksheet and a Decimal reference
+"""
+
+import random
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
+
+from app.schemas.period import PeriodSchema
+from app.services.calculation_engine import CalculationEngine
+from app.services.coefficient_snapshot import CoefficientSnapshot
+from app.services.result_cache import calculation_cache_key
+from conftest import SCENARIOS, load_seed_coefficients, scenario_coefficients
+
+
+def _decimal_reference(periods, by_year):
+    """The official worksheet in Decimal: exact sums, Mbqtl truncated, era amounts rounded half up"""
+    total = Decimal(0)
+    months_pre = months_from = 0
+    for period in periods:
+        salary = Decimal(period.monthly_salary).quantize(Decimal(1), ROUND_HALF_UP)
+        for month in range(period.start_month, period.end_month + 1):
+            total += salary * Decimal(str(by_year.get(month // 12, 1.0)))
+            if month < CalculationEngine.CUTOFF_MONTH:
+                months_pre += 1
+            else:
+                months_from += 1
+
+    months = months_pre + months_from
+    mbqtl = (total / months).quantize(Decimal(1), ROUND_DOWN)
+
+    if months < 12:
+        amount = min((Decimal("0.22") * total).quantize(Decimal(1), ROUND_HALF_UP), 2 * mbqtl)
+        return mbqtl, amount
+
+    engine = CalculationEngine()
+    amount = Decimal(0)
+    for era_months, multiplier in ((months_pre, Decimal("1.5")), (months_from, Decimal("2.0"))):
+        years = Decimal(str(engine._round_fractional_years(era_months)))
+        amount += (multiplier * mbqtl * years).quantize(Decimal(1), ROUND_HALF_UP)
+    return mbqtl, amount
+
+
+def test_official_example_matches_worksheet():
+    periods, pairs = SCENARIOS["official_worker_a"]
+    result = CalculationEngine().calculate(periods, scenario_coefficients(pairs), exact=True)
+
+    assert result.average_salary == 1774052
+    assert result.total_amount == 11531338
+    assert [b.amount for b in result.period_breakdowns][:1] == [2661078]
+
+
+def test_float_mode_is_unchanged():
+    periods, pairs = SCENARIOS["official_worker_a"]
+    result = CalculationEngine().calculate(periods, scenario_coefficients(pairs))
+
+    assert result.average_salary == 1774052.7
+
+
+def test_matches_decimal_reference_on_random_careers():
+    snapshot = CoefficientSnapshot.from_models(scenario_coefficients(
+        [(year, coefficient) for year, _, coefficient in load_seed_coefficients()]
+    ))
+    engine = CalculationEngine()
+    engine.load_coefficients(snapshot)
+
+    rnd = random.Random(7)
+    for _ in range(300):
+        month = rnd.randint(1990 * 12, 2024 * 12)
+        periods = []
+        for _ in range(rnd.randint(1, 6)):
+            end = min(month + rnd.choice([0, 4, 11, 30, 90]), 2025 * 12 + 11)
+            periods.append(PeriodSchema(
+                start_date=f"{month % 12 + 1:02d}/{month // 12}",
+                end_date=f"{end % 12 + 1:02d}/{end // 12}",
+                monthly_salary=rnd.choice([1500000, 4680000, 12345678, 2340000.5, 9999999.49])
+            ))
+            month = end + 1 + rnd.choice([0, 0, 5])
+            if month > 2025 * 12:
+                break
+
+        result = engine.calculate(periods, verbosity="summary", exact=True)
+        mbqtl, amount = _decimal_reference(periods, snapshot.by_year)
+        assert result.average_salary == mbqtl, periods
+        assert result.total_amount == amount, periods
+
+
+def test_exact_results_are_whole_dong():
+    periods = [PeriodSchema(start_date="01/2010", end_date="05/2015", monthly_salary=7777777.77)]
+    result = CalculationEngine().calculate(periods, scenario_coefficients([(2010, 1.83), (2014, 1.21)]), exact=True)
+
+    assert result.average_salary % 1 == 0
+    assert result.total_amount % 1 == 0
+    assert all(b.amount % 1 == 0 for b in result.period_breakdowns)
+
+
+def test_cache_key_depends_on_mode():
+    periods = [PeriodSchema(start_date="01/2021", end_date="12/2022", monthly_salary=5000000)]
+    assert calculation_cache_key(periods, "v1") == calculation_cache_key(periods, "v1", exact=False)
+    assert calculation_cache_key(periods, "v1") != calculation_cache_key(periods, "v1", exact=True)
+
+
+def test_api_exact_flag(client):
+    periods = [{"start_date": "01/2013", "end_date": "07/2016", "monthly_salary": 1234567.8}]
+
+    response = client.post("/api/v1/calculate", json={"periods": periods, "exact": True})
+    assert response.status_code == 200
+    assert response.json()["average_salary"] % 1 == 0
+    assert response.json()["total_amount"] % 1 == 0
+
+    response = client.post("/api/v1/calculate/batch", json={"items": [
+        {"periods": periods, "exact": True, "verbosity": "summary"}
+    ]})
+    assert response.json()["results"][0]["result"]["total_amount"] % 1 == 0
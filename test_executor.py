@@ -0,0 +1,139 @@
+"""
+Test the calculation executor (inline / thread / process strategies and backpressure)
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from app.routers import calculation as calculation_router
+from app.services.calculation_engine import CalculationEngine
+from app.services.coefficient_snapshot import CoefficientSnapshot
+from app.services.executor import CalculationExecutor, ExecutorBusy
+from conftest import SCENARIOS, scenario_coefficients
+
+PERIODS, PAIRS = SCENARIOS["official_worker_a"]
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    return CoefficientSnapshot.from_models(scenario_coefficients(PAIRS))
+
+
+def _where(coefficients, value):
+    return value, threading.get_ident(), os.getpid()
+
+
+def _sleep(coefficients, seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def test_small_calculations_run_inline(snapshot):
+    executor = CalculationExecutor("thread", inline_max_periods=10)
+    value, thread, pid = asyncio.run(executor.run(len(PERIODS), _where, snapshot, "x"))
+
+    assert (value, thread, pid) == ("x", threading.get_ident(), os.getpid())
+    assert executor._pool is None
+
+
+def test_thread_strategy_keeps_event_loop_free(snapshot):
+    executor = CalculationExecutor("thread", inline_max_periods=0, workers=1)
+    ticks = []
+
+    async def heartbeat():
+        while len(ticks) < 5:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def run():
+        return await asyncio.gather(executor.run(1, _sleep, snapshot, 0.2), heartbeat())
+
+    try:
+        start = time.perf_counter()
+        asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    # The loop kept ticking while the blocking calculation ran in the pool
+    assert ticks[-1] - start < 0.2
+
+
+def test_process_strategy_matches_inline(snapshot):
+    expected = CalculationEngine().calculate(PERIODS, snapshot, verbosity="summary")
+    executor = CalculationExecutor("process", inline_max_periods=0, workers=1)
+
+    async def run():
+        first = await executor.run(len(PERIODS), calculation_router._calculate, snapshot, PERIODS, "summary", False)
+        # The worker has the snapshot now and only receives its version
+        second = await executor.run(len(PERIODS), calculation_router._calculate, snapshot, PERIODS, "summary", False)
+        return first, second, await executor.run(1, _where, snapshot, None)
+
+    try:
+        first, second, (_, _, pid) = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    for result in (first, second):
+        assert (result.total_amount, result.average_salary) == (expected.total_amount, expected.average_salary)
+    assert pid != os.getpid()
+
+
+def test_full_queue_rejects(snapshot):
+    executor = CalculationExecutor("thread", inline_max_periods=0, workers=1, queue_size=1, retry_after=3)
+
+    async def run():
+        running = asyncio.ensure_future(executor.run(1, _sleep, snapshot, 0.1))
+        await asyncio.sleep(0.01)
+        assert executor.pending == 1
+        with pytest.raises(ExecutorBusy) as busy:
+            await executor.run(1, _sleep, snapshot, 0)
+        await running
+        return busy.value
+
+    try:
+        error = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert error.retry_after == 3
+    assert executor.pending == 0
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError, match="Unknown calculation executor"):
+        CalculationExecutor("fibers")
+
+
+def test_api_returns_503_with_retry_after(client, monkeypatch):
+    busy = CalculationExecutor("thread", inline_max_periods=0, queue_size=0, retry_after=7)
+    monkeypatch.setattr(calculation_router, "calculation_executor", busy)
+    periods = [{"start_date": "01/2020", "end_date": "12/2020", "monthly_salary": 8000000}]
+
+    response = client.post("/api/v1/calculate", json={"periods": periods})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+
+    response = client.post("/api/v1/calculate/batch", json={"items": [{"periods": periods}]})
+    assert response.status_code == 503
+
+
+def test_api_offloads_large_requests(client, monkeypatch):
+    executor = CalculationExecutor("thread", inline_max_periods=0, workers=1)
+    monkeypatch.setattr(calculation_router, "calculation_executor", executor)
+    periods = [
+        {"start_date": f"{month:02d}/2020", "end_date": f"{month:02d}/2020", "monthly_salary": 8000000}
+        for month in range(1, 13)
+    ]
+    try:
+        response = client.post("/api/v1/calculate", json={"periods": periods, "verbosity": "summary"})
+        batch = client.post("/api/v1/calculate/batch", json={"items": [{"periods": periods}] * 3})
+    finally:
+        executor.shutdown()
+
+    assert response.status_code == 200
+    assert response.json()["total_months"] == 12
+    assert batch.json()["succeeded"] == 3
@@ -0,0 +1,257 @@
+"""
+Test cross-worker coefficient invalidation (run against the in-memory FakeRedis broker)
+"""
+
+import asyncio
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import metrics
+from app.database import Base
+from app.services.coefficient_service import CoefficientService
+from app.services.coefficient_snapshot import CoefficientSnapshotStore
+from app.services.fake_redis import FakeRedis
+from app.services.invalidation import (
+    InvalidationListener, PostgresInvalidationListener, asyncpg_dsn, publish_invalidation
+)
+
+
+def _counter(source):
+    return metrics.registry.get_sample_value("bhxh_coefficient_invalidations_total", {"source": source}) or 0.0
+
+
+async def _until(condition, timeout=1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+
+async def _stop(*tasks):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def test_fake_redis_pubsub():
+    async def run():
+        fake = FakeRedis()
+        pubsub = fake.pubsub()
+        await pubsub.subscribe("channel")
+
+        assert (await pubsub.get_message())["type"] == "subscribe"
+        assert await fake.publish("channel", "hello") == 1
+        assert await fake.publish("other", "ignored") == 0
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.1)
+        assert (message["channel"], message["data"]) == (b"channel", b"hello")
+        assert await pubsub.get_message(timeout=0.01) is None
+
+        await pubsub.aclose()
+        assert await fake.publish("channel", "gone") == 0
+
+    asyncio.run(run())
+
+
+def test_every_worker_refreshes_on_message(monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", True)
+    messages_before = _counter("message")
+
+    async def run():
+        fake = FakeRedis()
+        refreshed = [0, 0, 0]
+
+        def worker(index):
+            async def refresh():
+                refreshed[index] += 1
+            return InvalidationListener(fake, refresh, channel="test", retry_interval=5)
+
+        listeners = [worker(index) for index in range(3)]
+        tasks = [asyncio.create_task(listener.run()) for listener in listeners]
+        await _until(lambda: all(listener.connected for listener in listeners))
+        # One check right after subscribing
+        assert refreshed == [1, 1, 1]
+
+        await fake.publish("test", "v2")
+        await _until(lambda: refreshed == [2, 2, 2], timeout=0.5)
+
+        await _stop(*tasks)
+        assert not any(listener.connected for listener in listeners)
+
+    asyncio.run(run())
+    assert _counter("message") - messages_before == 3
+
+
+def test_polls_while_channel_is_down_and_recovers():
+    class FlakyRedis(FakeRedis):
+        down = True
+
+        def pubsub(self):
+            if self.down:
+                raise ConnectionError("redis down")
+            return super().pubsub()
+
+    async def run():
+        fake = FlakyRedis()
+        checks = []
+
+        async def refresh():
+            checks.append(fake.down)
+
+        listener = InvalidationListener(fake, refresh, channel="test", retry_interval=0.01, max_retry_interval=0.04)
+        task = asyncio.create_task(listener.run())
+
+        # Polling fallback: the token is checked every retry_interval, backing off
+        await _until(lambda: len(checks) >= 4)
+        assert not listener.connected
+        assert listener.delay == 0.04
+
+        fake.down = False
+        await _until(lambda: listener.connected)
+        assert listener.delay == 0.01
+        polls = len(checks)
+        await fake.publish("test", "")
+        await _until(lambda: len(checks) == polls + 1)
+
+        await _stop(task)
+
+    asyncio.run(run())
+
+
+def test_refresh_errors_do_not_stop_the_listener():
+    async def run():
+        fake = FakeRedis()
+        calls = []
+
+        async def refresh():
+            calls.append(1)
+            raise RuntimeError("database down")
+
+        listener = InvalidationListener(fake, refresh, channel="test", retry_interval=5)
+        task = asyncio.create_task(listener.run())
+        await _until(lambda: listener.connected and calls)
+
+        await fake.publish("test", "")
+        await _until(lambda: len(calls) == 2)
+        assert listener.connected
+
+        await _stop(task)
+
+    asyncio.run(run())
+
+
+def test_import_reaches_all_workers():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    def circular(coefficient):
+        return [{"year": 2024, "month": 1, "coefficient": coefficient}, {"year": 2025, "month": 1, "coefficient": 1.0}]
+
+    db = Session()
+    CoefficientService(db).import_circular(circular(1.02), 2025)
+
+    # Two workers, each with its own snapshot
+    stores = [CoefficientSnapshotStore(), CoefficientSnapshotStore()]
+    for store in stores:
+        store.load(db)
+    old_version = stores[0].current().version
+
+    async def run():
+        fake = FakeRedis()
+
+        def worker(store):
+            async def refresh():
+                session = Session()
+                try:
+                    return store.refresh_if_changed(session)
+                finally:
+                    session.close()
+            return InvalidationListener(fake, refresh, retry_interval=5)
+
+        listeners = [worker(store) for store in stores]
+        tasks = [asyncio.create_task(listener.run()) for listener in listeners]
+        await _until(lambda: all(listener.connected for listener in listeners))
+
+        CoefficientService(db).import_circular(circular(1.03), 2025)
+        assert await publish_invalidation(fake, "new table")
+        await _until(lambda: all(store.current().version != old_version for store in stores))
+
+        await _stop(*tasks)
+
+    asyncio.run(run())
+    assert stores[0].current().coefficient_at(2024 * 12) == 1.03
+    assert stores[0].current().version == stores[1].current().version
+    db.close()
+    engine.dispose()
+
+
+def test_publish_reports_unreachable_channel():
+    class BrokenRedis(FakeRedis):
+        async def publish(self, channel, message):
+            raise ConnectionError("redis down")
+
+    assert asyncio.run(publish_invalidation(BrokenRedis())) is False
+
+
+class FakeAsyncpgConnection:
+    def __init__(self):
+        self.listeners = {}
+        self.closed = False
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    async def fetchval(self, query):
+        if self.closed:
+            raise ConnectionError("connection lost")
+        return 1
+
+    async def close(self, timeout=None):
+        self.closed = True
+
+    def notify(self, channel, payload=""):
+        self.listeners[channel](self, 1234, channel, payload)
+
+
+def test_postgres_notify_refreshes(monkeypatch):
+    import asyncpg
+
+    connections = []
+
+    async def connect(dsn, timeout=None):
+        assert dsn == "postgresql://user:secret@db:5432/bhxh"
+        connections.append(FakeAsyncpgConnection())
+        return connections[-1]
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    monkeypatch.setattr(PostgresInvalidationListener, "PING_INTERVAL", 0.01)
+
+    async def run():
+        refreshed = []
+
+        async def refresh():
+            refreshed.append(1)
+
+        dsn = asyncpg_dsn("postgresql+asyncpg://user:secret@db:5432/bhxh")
+        listener = PostgresInvalidationListener(dsn, refresh, retry_interval=0.01)
+        task = asyncio.create_task(listener.run())
+        await _until(lambda: listener.connected)
+        assert refreshed == [1]
+
+        # Several statements of one transaction arrive as notifications in a burst
+        connections[0].notify("coefficient_changed", "coefficient")
+        connections[0].notify("coefficient_changed", "coefficient_version")
+        await _until(lambda: len(refreshed) >= 2)
+
+        # A dead connection is noticed by the idle ping and replaced
+        connections[0].closed = True
+        await _until(lambda: len(connections) == 2 and listener.connected)
+        connections[1].notify("coefficient_changed")
+        await _until(lambda: len(refreshed) >= 5)
+
+        await _stop(task)
+
+    asyncio.run(run())
+    assert asyncpg_dsn("sqlite+aiosqlite:///bhxh.db") is None
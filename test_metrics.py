@@ -0,0 +1,77 @@
+"""
+Test the per-stage timing instrumentation and the /metrics endpoint
+"""
+
+import pytest
+
+from app import metrics
+
+
+PAYLOAD = {
+    "periods": [
+        {"start_date": "01/2010", "end_date": "12/2015", "monthly_salary": 5000000},
+        {"start_date": "01/2016", "end_date": "06/2020", "monthly_salary": 8000000}
+    ]
+}
+
+
+@pytest.fixture
+def metrics_enabled(monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", True)
+
+
+def _sample(name, **labels):
+    return metrics.registry.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_disabled_by_default(client):
+    """Instrumentation is off unless METRICS_ENABLED is set"""
+    assert metrics.enabled is False
+    assert metrics.stage("split") is metrics.stage("accumulate")
+
+    before = _sample("bhxh_periods_processed_total")
+    assert client.post("/api/v1/calculate", json=PAYLOAD).status_code == 200
+    assert _sample("bhxh_periods_processed_total") == before
+
+    assert client.get("/metrics").status_code == 404
+
+
+def test_calculate_records_stages_and_counters(client, metrics_enabled):
+    """A calculate request observes every pipeline stage and counts periods and fragments"""
+    stages = ["validation", "split", "accumulate", "breakdown", "explanation",
+              "response_model", "handler", "serialization", "request"]
+    before = {stage: _sample("bhxh_calculation_stage_seconds_count", stage=stage) for stage in stages}
+    periods_before = _sample("bhxh_periods_processed_total")
+    era_before = _sample("bhxh_split_fragments_total", split="era")
+    year_before = _sample("bhxh_split_fragments_total", split="year")
+    hits_before = _sample("bhxh_coefficient_cache_total", result="hit")
+
+    response = client.post("/api/v1/calculate", json=PAYLOAD)
+    assert response.status_code == 200
+
+    for stage in stages:
+        assert _sample("bhxh_calculation_stage_seconds_count", stage=stage) == before[stage] + 1, stage
+
+    # 01/2010-12/2015 crosses 2014: 3 era fragments, 6 + 5 calendar-year rows
+    assert _sample("bhxh_periods_processed_total") == periods_before + 2
+    assert _sample("bhxh_split_fragments_total", split="era") == era_before + 3
+    assert _sample("bhxh_split_fragments_total", split="year") == year_before + 11
+    assert _sample("bhxh_coefficient_cache_total", result="hit") == hits_before + 1
+
+
+def test_metrics_endpoint_exposition(client, metrics_enabled):
+    """/metrics serves the Prometheus text format including DB pool gauges"""
+    client.post("/api/v1/calculate", json=PAYLOAD)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    body = response.text
+    assert 'bhxh_calculation_stage_seconds_bucket{le="0.001",stage="split"}' in body
+    assert "bhxh_periods_processed_total" in body
+    assert 'bhxh_db_pool_checked_out{engine="sync"}' in body
+
+
+def test_metrics_endpoint_not_in_openapi(client):
+    assert "/metrics" not in client.get("/openapi.json").json()["paths"]
@@ -0,0 +1,79 @@
+"""
+Test integer month-index helpers and the engine's integer period splitting
+"""
+
+from app.schemas.period import PeriodSchema
+from app.services.calculation_engine import CalculationEngine
+from app.services.period_span import PeriodSpan
+from app.utils.month_index import (
+    month_index, parse_month_index, format_month_start, format_month_end, format_month_display
+)
+
+
+def test_month_index_round_trip():
+    index = parse_month_index("2024-02-01")
+    assert index == month_index(2024, 2)
+    assert format_month_start(index) == "2024-02-01"
+    assert format_month_end(index) == "2024-02-29"
+    assert format_month_end(month_index(2023, 2)) == "2023-02-28"
+    assert format_month_display(index) == "02/2024"
+    assert month_index(2014, 1) - month_index(2013, 12) == 1
+
+
+def test_split_by_year_and_cutoff_keeps_boundaries():
+    """A 2012-2015 period splits into yearly fragments with original dates at the edges"""
+    period = PeriodSchema(start_date="2012-03-15", end_date="05/2015", monthly_salary=5000000)
+    engine = CalculationEngine()
+    engine.load_coefficients([])
+    result = engine.calculate([period])
+
+    dates = [(b.start_date, b.end_date, b.months, b.is_pre_2014) for b in result.period_breakdowns]
+    assert dates == [
+        ("2012-03-15", "2012-12-31", 10, True),
+        ("2013-01-01", "2013-12-31", 12, True),
+        ("2014-01-01", "2014-12-31", 12, False),
+        ("2015-01-01", "2015-05-31", 5, False),
+    ]
+    assert result.total_months == 39
+    assert result.explanation.steps[0].calculation.startswith("Giai đoạn từ 03/2012 đến 12/2012")
+
+
+def test_engine_accepts_period_spans():
+    """Internal PeriodSpans calculate exactly like the validated PeriodSchemas they come from"""
+    periods = [
+        PeriodSchema(start_date="2012-03-15", end_date="05/2015", monthly_salary=5000000),
+        PeriodSchema(start_date="06/2015", end_date="12/2020", monthly_salary=8000000),
+    ]
+    spans = [PeriodSpan.from_schema(p, i) for i, p in enumerate(periods)]
+
+    engine = CalculationEngine()
+    engine.load_coefficients([])
+    from_schemas = engine.calculate(periods).model_dump(exclude={"calculated_at"})
+    from_spans = engine.calculate(spans).model_dump(exclude={"calculated_at"})
+    assert from_spans == from_schemas
+
+
+def test_split_produces_spans_not_schemas():
+    span = PeriodSpan(month_index(2012, 3), month_index(2015, 5), 5000000, "2012-03-15", "2015-05-31")
+    engine = CalculationEngine()
+    fragments = engine._split_periods_by_year(engine._split_periods_by_cutoff([span]))
+
+    assert all(type(f) is PeriodSpan for f in fragments)
+    assert [(f.start_date, f.end_date) for f in fragments] == [
+        ("2012-03-15", None), (None, None), (None, None), (None, "2015-05-31")
+    ]
+    assert sum(f.months for f in fragments) == span.months == 39
+
+
+def test_period_month_indexes_follow_copies_and_construct():
+    period = PeriodSchema(start_date="01/2021", end_date="02/2024", monthly_salary=5000000)
+    assert period.end_date == "2024-02-29"
+    assert (period.start_month, period.end_month) == (month_index(2021, 1), month_index(2024, 2))
+
+    moved = period.model_copy(update={"end_date": "2025-06-30"})
+    assert moved.end_month == month_index(2025, 6)
+    assert period.end_month == month_index(2024, 2)
+
+    constructed = PeriodSchema.model_construct(start_date="2020-01-01", end_date="2020-03-31", monthly_salary=1)
+    assert (constructed.start_month, constructed.end_month) == (month_index(2020, 1), month_index(2020, 3))
+    assert constructed.date_keys[0] < constructed.date_keys[1]
@@ -0,0 +1,107 @@
+"""
+Test month-resolution coefficients (several rows per year)
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.coefficient import Coefficient
+from app.schemas.period import PeriodSchema
+from app.services.calculation_engine import CalculationEngine
+from app.services.coefficient_service import CoefficientService
+from app.services.coefficient_snapshot import CoefficientSnapshot
+from app.services.snapshot_file import read_snapshot_file, write_snapshot_file
+from app.services.vectorized_engine import VectorizedCalculationEngine, periods_to_columns
+from app.utils.month_index import month_index
+
+
+def _row(year, month, coefficient):
+    return Coefficient(year=year, month=month, coefficient=coefficient, is_active=True)
+
+
+# 2020 changes coefficient in July; 2021 has a single row that starts in April
+ROWS = [_row(2019, 1, 1.30), _row(2020, 1, 1.10), _row(2020, 7, 1.20), _row(2021, 4, 1.05)]
+
+
+@pytest.fixture
+def snapshot():
+    return CoefficientSnapshot.from_models(ROWS)
+
+
+def test_rows_apply_until_next_row_of_the_year(snapshot):
+    assert snapshot.coefficient_at(month_index(2020, 1)) == 1.10
+    assert snapshot.coefficient_at(month_index(2020, 6)) == 1.10
+    assert snapshot.coefficient_at(month_index(2020, 7)) == 1.20
+    assert snapshot.coefficient_at(month_index(2020, 12)) == 1.20
+    # The first row of a year also covers the months before it
+    assert snapshot.coefficient_at(month_index(2021, 1)) == 1.05
+    # Outside the table
+    assert snapshot.coefficient_at(month_index(2030, 1)) == 1.0
+
+    assert dict(snapshot.by_year) == {2019: 1.30, 2020: 1.10, 2021: 1.05}
+    assert snapshot.change_months == (month_index(2020, 7),)
+
+
+def test_range_sums_use_month_rows(snapshot):
+    units = snapshot.coefficient_units(month_index(2020, 1), month_index(2020, 12))
+    assert units == 6 * 11000 + 6 * 12000
+
+    units = snapshot.coefficient_units(month_index(2019, 12), month_index(2020, 8))
+    assert units == 13000 + 6 * 11000 + 2 * 12000
+
+
+def test_engine_breakdown_splits_at_coefficient_change(snapshot):
+    periods = [PeriodSchema(start_date="03/2019", end_date="12/2020", monthly_salary=10000000)]
+    result = CalculationEngine().calculate(periods, snapshot)
+
+    rows = [(b.start_date, b.end_date, b.months, b.coefficient) for b in result.period_breakdowns]
+    assert rows == [
+        ("2019-03-01", "2019-12-31", 10, 1.30),
+        ("2020-01-01", "2020-06-30", 6, 1.10),
+        ("2020-07-01", "2020-12-31", 6, 1.20),
+    ]
+    assert result.average_salary == round(10000000 * (10 * 1.30 + 6 * 1.10 + 6 * 1.20) / 22, 2)
+    assert "1.20 × 6 tháng" in result.explanation.steps[2].calculation
+
+
+def test_vectorized_engine_agrees(snapshot):
+    periods = [
+        PeriodSchema(start_date="05/2020", end_date="09/2020", monthly_salary=8000000),
+        PeriodSchema(start_date="10/2020", end_date="06/2021", monthly_salary=9000000),
+    ]
+    expected = CalculationEngine().calculate(periods, snapshot, verbosity="summary")
+    bulk = VectorizedCalculationEngine(snapshot).calculate(*periods_to_columns({1: periods}))
+
+    assert bulk.average_salary[0] == expected.average_salary
+    assert bulk.total_amount[0] == expected.total_amount
+
+
+def test_snapshot_file_keeps_month_rows(tmp_path, snapshot):
+    path = str(tmp_path / "coefficients.bin")
+    write_snapshot_file(snapshot, path)
+
+    loaded = read_snapshot_file(path)
+    assert loaded.change_months == snapshot.change_months
+    assert loaded.coefficient_at(month_index(2020, 9)) == 1.20
+
+
+def test_service_returns_row_in_force_for_month():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        service = CoefficientService(db)
+        service.bulk_create([
+            {"year": 2020, "month": 1, "coefficient": 1.10},
+            {"year": 2020, "month": 7, "coefficient": 1.20},
+        ])
+
+        assert float(service.get_by_year(2020).coefficient) == 1.10
+        assert float(service.get_by_year(2020, 6).coefficient) == 1.10
+        assert float(service.get_by_year(2020, 7).coefficient) == 1.20
+        assert service.get_by_year(2020, 7).effective_from.month == 7
+        assert service.get_by_year(2021) is None
+    finally:
+        db.close()
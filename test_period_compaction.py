@@ -0,0 +1,88 @@
+"""
+Test run-length compaction of adjacent same-salary periods
+"""
+
+from app.models.coefficient import Coefficient
+from app.schemas.period import PeriodSchema
+from app.services.calculation_engine import CalculationEngine
+from app.services.coefficient_snapshot import CoefficientSnapshot
+from app.utils.month_index import month_index
+from conftest import load_seed_coefficients
+
+
+def _snapshot():
+    return CoefficientSnapshot.from_models([
+        Coefficient(year=year, month=month, coefficient=coefficient, is_active=True)
+        for year, month, coefficient in load_seed_coefficients()
+    ])
+
+
+def _monthly(start_year, start_month, salaries):
+    """One period per month starting at the given month"""
+    periods = []
+    index = month_index(start_year, start_month)
+    for salary in salaries:
+        year, month = divmod(index, 12)
+        date = f"{month + 1:02d}/{year}"
+        periods.append(PeriodSchema(start_date=date, end_date=date, monthly_salary=salary))
+        index += 1
+    return periods
+
+
+def _totals(result):
+    return result.total_amount, result.average_salary, result.total_months
+
+
+def test_monthly_rows_merge_into_salary_runs():
+    """24 monthly rows with one raise become one row per run and year"""
+    periods = _monthly(2020, 1, [5000000] * 18 + [6000000] * 6)
+    engine = CalculationEngine()
+    engine.load_coefficients(_snapshot())
+
+    compacted = engine.calculate(periods)
+    uncompacted = engine.calculate(periods, compact=False)
+
+    assert _totals(compacted) == _totals(uncompacted)
+    assert len(uncompacted.period_breakdowns) == 24
+
+    rows = [(b.start_date, b.end_date, b.months, b.first_period_index, b.last_period_index)
+            for b in compacted.period_breakdowns]
+    assert rows == [
+        ("2020-01-01", "2020-12-31", 12, 0, 17),
+        ("2021-01-01", "2021-06-30", 6, 0, 17),
+        ("2021-07-01", "2021-12-31", 6, 18, 23),
+    ]
+
+
+def test_only_contiguous_whole_salary_rows_merge():
+    """Gaps, salary changes and fractional salaries keep rows apart"""
+    periods = [
+        PeriodSchema(start_date="01/2019", end_date="03/2019", monthly_salary=5000000),
+        PeriodSchema(start_date="04/2019", end_date="06/2019", monthly_salary=5000000),
+        # gap of one month
+        PeriodSchema(start_date="08/2019", end_date="09/2019", monthly_salary=5000000),
+        PeriodSchema(start_date="10/2019", end_date="10/2019", monthly_salary=5000000.5),
+        PeriodSchema(start_date="11/2019", end_date="11/2019", monthly_salary=5000000.5),
+    ]
+    engine = CalculationEngine()
+    engine.load_coefficients(_snapshot())
+    result = engine.calculate(periods, verbosity="breakdown")
+
+    indexes = [(b.first_period_index, b.last_period_index) for b in result.period_breakdowns]
+    assert indexes == [(0, 1), (2, 2), (3, 3), (4, 4)]
+    assert _totals(result) == _totals(engine.calculate(periods, compact=False))
+
+
+def test_compaction_crossing_cutoff_matches_uncompacted():
+    """A 2012-2016 monthly career crossing 01/2014 keeps identical totals and era months"""
+    salaries = [4000000 + 250000 * (i // 7) for i in range(60)]
+    periods = _monthly(2012, 1, salaries)
+    engine = CalculationEngine()
+    engine.load_coefficients(_snapshot())
+
+    compacted = engine.calculate(periods)
+    uncompacted = engine.calculate(periods, compact=False)
+
+    assert _totals(compacted) == _totals(uncompacted)
+    assert sum(b.months for b in compacted.period_breakdowns if b.is_pre_2014) == 24
+    assert len(compacted.period_breakdowns) < len(uncompacted.period_breakdowns)
@@ -0,0 +1,103 @@
+"""
+Test the period validation fast path against the original strptime rules
+"""
+
+from calendar import monthrange
+from datetime import datetime
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.calculation_request import CalculationRequest
+from app.schemas.period import PeriodSchema
+from app.utils.month_index import month_index, normalize_input_date
+
+
+def reference_normalize(value):
+    """The strptime rules PeriodSchema used before the fast path (zero-padded output)"""
+    try:
+        date_obj = datetime.strptime(value, '%m/%Y')
+    except ValueError:
+        date_obj = datetime.strptime(value, '%Y-%m-%d')
+    return f"{date_obj.year:04d}-{date_obj.month:02d}-{date_obj.day:02d}"
+
+
+INPUTS = [
+    "01/2021", "1/2021", "12/2013", "13/2021", "00/2021", "01/21", "01/02021", "01-2021",
+    "2021-01-15", "2021-1-5", "2024-02-29", "2023-02-29", "2021-04-31", "2021-13-01",
+    "2021-00-10", "0000-01-01", "0001-01-01", "9999-12-31", "2021/01", "", "abc",
+    " 01/2021", "01/2021 ", "2021-01-015", "+1/2021", "2021-01", "2021-01-01-01",
+]
+
+
+@pytest.mark.parametrize("value", INPUTS)
+def test_normalize_matches_strptime(value):
+    try:
+        expected = reference_normalize(value)
+    except ValueError:
+        expected = None
+
+    if expected is None:
+        with pytest.raises(ValueError):
+            normalize_input_date(value)
+    else:
+        assert normalize_input_date(value) == expected
+
+
+def test_period_caches_month_indexes():
+    period = PeriodSchema(start_date="2012-03-15", end_date="02/2016", monthly_salary=5000000)
+
+    assert period.start_date == "2012-03-15"
+    assert period.end_date == "2016-02-29"
+    assert period.start_month == month_index(2012, 3)
+    assert period.end_month == month_index(2016, 2)
+
+    start_key, end_key = period.date_keys
+    assert start_key < end_key
+    # Keys order like the dates, down to the day
+    later = PeriodSchema(start_date="2012-03-16", end_date="03/2012", monthly_salary=1)
+    assert later.date_keys[0] > start_key
+    assert later.date_keys[1] == start_key + monthrange(2012, 3)[1] - 15
+
+
+def test_invalid_date_reports_field():
+    with pytest.raises(ValidationError) as excinfo:
+        PeriodSchema(start_date="13/2021", end_date="12/2021", monthly_salary=1)
+    assert excinfo.value.errors()[0]["loc"] == ("start_date",)
+
+
+def test_request_sweep_rules():
+    """End-before-start and overlap checks keep their semantics and messages"""
+    def request(*periods):
+        return CalculationRequest(periods=[
+            {"start_date": start, "end_date": end, "monthly_salary": 1} for start, end in periods
+        ])
+
+    # Same-month period is valid: end becomes the last day of the month
+    request(("05/2020", "05/2020"))
+
+    # Start on the last day of the end month is not
+    with pytest.raises(ValidationError, match="Period 1: End date must be after start date"):
+        request(("2020-05-31", "05/2020"))
+
+    with pytest.raises(ValidationError, match="Period 2: End date must be after start date"):
+        request(("01/2010", "12/2010"), ("12/2020", "06/2020"))
+
+    # Unsorted input is sorted before the sweep
+    with pytest.raises(ValidationError, match="Periods 1 and 2 overlap"):
+        request(("06/2015", "12/2016"), ("01/2010", "06/2015"))
+
+    request(("01/2016", "12/2016"), ("01/2010", "12/2015"), ("01/2017", "12/2017"))
+
+
+def test_month_per_row_request():
+    """A 600-row VssID-style request validates and keeps each row's month"""
+    periods = []
+    for i in range(600):
+        year, month = divmod(month_index(1990, 1) + i, 12)
+        date = f"{month + 1:02d}/{year}"
+        periods.append({"start_date": date, "end_date": date, "monthly_salary": 5000000 + i})
+
+    request = CalculationRequest(periods=periods)
+    assert [p.start_month for p in request.periods] == list(range(month_index(1990, 1), month_index(1990, 1) + 600))
+    assert all(p.start_month == p.end_month for p in request.periods)
@@ -0,0 +1,102 @@
+"""
+Test the fast JSON response path (no re-validation, orjson, gzip/brotli negotiation)
+"""
+
+import gzip
+
+from app import responses
+from app.main import app
+from app.schemas.calculation_response import CalculationResponse
+from app.schemas.coefficient import CoefficientSchema
+
+LONG_CAREER = {
+    "periods": [
+        {"start_date": f"01/{year}", "end_date": f"12/{year}", "monthly_salary": 5000000 + year * 1000}
+        for year in range(2000, 2020)
+    ]
+}
+SHORT_CAREER = {
+    "periods": [{"start_date": "01/2020", "end_date": "12/2020", "monthly_salary": 8000000}],
+    "verbosity": "summary"
+}
+
+
+class _Request:
+    def __init__(self, accept_encoding):
+        self.headers = {"accept-encoding": accept_encoding} if accept_encoding is not None else {}
+
+
+def test_body_matches_response_model(client):
+    response = client.post("/api/v1/calculate", json=LONG_CAREER)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+
+    body = response.json()
+    assert CalculationResponse.model_validate(body).model_dump(mode="json") == body
+    assert len(body["period_breakdowns"]) == 20
+
+
+def test_large_bodies_are_gzipped_when_accepted(client):
+    response = client.post("/api/v1/calculate", json=LONG_CAREER, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json()["total_months"] == 240
+
+    response = client.post("/api/v1/calculate", json=LONG_CAREER, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+    response = client.post("/api/v1/calculate", json=SHORT_CAREER, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_negotiation(monkeypatch):
+    monkeypatch.setattr(responses, "brotli", None)
+    assert responses.negotiate_encoding(_Request("gzip, deflate")) == "gzip"
+    assert responses.negotiate_encoding(_Request("br, gzip;q=0")) is None
+    assert responses.negotiate_encoding(_Request("*")) == "gzip"
+    assert responses.negotiate_encoding(_Request("*, gzip;q=0")) is None
+    assert responses.negotiate_encoding(_Request(None)) is None
+    assert responses.negotiate_encoding(None) is None
+
+    class FakeBrotli:
+        @staticmethod
+        def compress(body, quality):
+            return b"br:" + body
+
+    monkeypatch.setattr(responses, "brotli", FakeBrotli)
+    assert responses.negotiate_encoding(_Request("gzip, br")) == "br"
+    assert responses.negotiate_encoding(_Request("gzip, br;q=0")) == "gzip"
+    assert responses.negotiate_encoding(_Request("br;q=0.5, gzip;q=0.8")) == "gzip"
+    assert responses.negotiate_encoding(_Request("br;q=0.8, gzip;q=0.5")) == "br"
+    assert responses.negotiate_encoding(_Request("gzip;q=0.5, *;q=0.9")) == "br"
+
+    response = responses.json_response({"data": "x" * 2000}, _Request("br"))
+    assert response.headers["content-encoding"] == "br"
+    assert response.body.startswith(b"br:{")
+
+
+def test_gzip_body_is_deterministic():
+    first = responses.json_response({"data": "x" * 2000}, _Request("gzip")).body
+    second = responses.json_response({"data": "x" * 2000}, _Request("gzip")).body
+    assert first == second
+    assert gzip.decompress(first) == b'{"data":"' + b"x" * 2000 + b'"}'
+
+
+def test_coefficient_routes_match_schema(client):
+    response = client.get("/api/v1/coefficients")
+    assert response.status_code == 200
+    rows = response.json()
+    assert rows
+    for row in rows:
+        assert CoefficientSchema.model_validate(row).model_dump(mode="json") == row
+
+    year = rows[0]["year"]
+    response = client.get(f"/api/v1/coefficients/{year}")
+    assert response.json()["year"] == year
+
+
+def test_openapi_still_documents_response_models():
+    schema = app.openapi()
+    ok = schema["paths"]["/api/v1/calculate"]["post"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert ok == {"$ref": "#/components/schemas/CalculationResponse"}
+    assert "CoefficientSchema" in schema["components"]["schemas"]
@@ -0,0 +1,128 @@
+"""
+Test the calculation result cache (run against the in-memory FakeRedis)
+"""
+
+import asyncio
+import time
+
+from app.main import app
+from app.schemas.period import PeriodSchema
+from app.services.calculation_engine import CalculationEngine
+from app.services.coefficient_snapshot import snapshot_store
+from app.services.fake_redis import FakeRedis
+from app.services.result_cache import ResultCache, calculation_cache_key, get_result_cache
+
+
+def _periods(start="01/2021"):
+    return [PeriodSchema(start_date=start, end_date="12/2022", monthly_salary=5000000)]
+
+
+def test_cache_key_is_canonical():
+    """MM/YYYY and YYYY-MM-DD inputs of the same period share a key"""
+    mm_yyyy = [PeriodSchema(start_date="01/2021", end_date="12/2022", monthly_salary=5000000)]
+    iso = [PeriodSchema(start_date="2021-01-01", end_date="2022-12-31", monthly_salary=5000000.0)]
+
+    assert calculation_cache_key(mm_yyyy, "v1") == calculation_cache_key(iso, "v1")
+    assert calculation_cache_key(mm_yyyy, "v1") != calculation_cache_key(mm_yyyy, "v2")
+    assert calculation_cache_key(mm_yyyy, "v1") != calculation_cache_key(_periods("02/2021"), "v1")
+
+
+def test_concurrent_cold_key_is_computed_once():
+    """Stampede protection: concurrent misses on one key compute once"""
+    cache = ResultCache(FakeRedis(), ttl=60, lock_timeout=5)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return CalculationEngine().calculate(_periods(), [])
+
+    async def run():
+        key = calculation_cache_key(_periods(), "v1")
+        return await asyncio.gather(*[cache.get_or_compute(key, compute) for _ in range(10)])
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert len({r.total_amount for r in results}) == 1
+
+
+def test_failed_leader_does_not_stall_waiters():
+    """Waiters take over as soon as a failing leader releases the lock"""
+    cache = ResultCache(FakeRedis(), ttl=60, lock_timeout=10)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        if len(calls) == 1:
+            raise RuntimeError("executor busy")
+        return CalculationEngine().calculate(_periods(), [])
+
+    async def run():
+        key = calculation_cache_key(_periods(), "v1")
+        return await asyncio.gather(
+            *[cache.get_or_compute(key, compute) for _ in range(10)], return_exceptions=True
+        )
+
+    started = time.monotonic()
+    results = asyncio.run(run())
+
+    assert time.monotonic() - started < 1.0
+    assert sum(isinstance(r, RuntimeError) for r in results) == 1
+    # One waiter took the lock over and computed for the rest
+    assert len(calls) == 2
+    assert len({r.total_amount for r in results if not isinstance(r, Exception)}) == 1
+
+
+def test_unreachable_redis_falls_back_to_compute():
+    class BrokenRedis(FakeRedis):
+        async def get(self, name):
+            raise ConnectionError("redis down")
+
+    cache = ResultCache(BrokenRedis())
+
+    async def compute():
+        return CalculationEngine().calculate(_periods(), [])
+
+    result = asyncio.run(cache.get_or_compute("key", compute))
+    assert result.total_months == 24
+    assert not cache.available
+
+
+def test_corrupt_entry_is_a_miss():
+    fake = FakeRedis()
+    cache = ResultCache(fake)
+    asyncio.run(fake.set("key", b"{not json"))
+
+    async def compute():
+        return CalculationEngine().calculate(_periods(), [])
+
+    result = asyncio.run(cache.get_or_compute("key", compute))
+    assert result.total_months == 24
+    assert cache.available
+    # The bad entry was replaced by the recomputed result
+    cached = asyncio.run(cache.get_or_compute("key", compute))
+    assert cached.total_amount == result.total_amount
+
+
+def test_calculate_endpoint_serves_identical_requests_from_cache(client):
+    fake = FakeRedis()
+    cache = ResultCache(fake)
+    app.dependency_overrides[get_result_cache] = lambda: cache
+    try:
+        payload = {"periods": [{"start_date": "01/2016", "end_date": "12/2019", "monthly_salary": 7000000}]}
+        first = client.post("/api/v1/calculate", json=payload).json()
+
+        key = calculation_cache_key(
+            [PeriodSchema(**p) for p in payload["periods"]],
+            snapshot_store.current().version
+        )
+        assert asyncio.run(fake.get(key)) is not None
+
+        second = client.post("/api/v1/calculate", json=payload).json()
+        # Hits carry the time they were served, not when they were first computed
+        assert second.pop("calculated_at") >= first.pop("calculated_at")
+        assert second == first
+    finally:
+        app.dependency_overrides.pop(get_result_cache, None)
@@ -0,0 +1,100 @@
+"""
+Test coalescing of identical in-flight calculations
+"""
+
+import asyncio
+
+import pytest
+
+from app import metrics
+from app.config import settings
+from app.services.single_flight import SingleFlight
+
+
+def _counter(role):
+    return metrics.registry.get_sample_value("bhxh_request_coalescing_total", {"role": role}) or 0.0
+
+
+def test_concurrent_identical_calls_share_one_computation(monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", True)
+    flight = SingleFlight()
+    calls = []
+    followers_before = _counter("follower")
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"total": 42}
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", compute) for _ in range(10)))
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert (flight.leaders, flight.followers) == (1, 9)
+    assert _counter("follower") - followers_before == 9
+    assert len(flight) == 0
+
+
+def test_different_keys_and_later_calls_compute_again():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return len(calls)
+
+    async def run():
+        await asyncio.gather(flight.do("a", compute), flight.do("b", compute))
+        await flight.do("a", compute)
+
+    asyncio.run(run())
+    assert len(calls) == 3
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise ValueError("bad periods")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", compute) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(flight) == 0
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "done"
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_calculate_with_and_without_coalescing(client, monkeypatch, enabled):
+    monkeypatch.setattr(settings, "REQUEST_COALESCING_ENABLED", enabled)
+    response = client.post("/api/v1/calculate", json={
+        "periods": [{"start_date": "01/2020", "end_date": "12/2022", "monthly_salary": 8000000}],
+        "verbosity": "summary"
+    })
+
+    assert response.status_code == 200
+    assert response.json()["total_months"] == 36
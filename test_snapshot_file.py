@@ -0,0 +1,119 @@
+"""
+Test binary coefficient snapshot files (export, mmap loading, integrity)
+"""
+
+import os
+import time
+
+import pytest
+
+from app.cli import main
+from app.models.coefficient import Coefficient
+from app.schemas.period import PeriodSchema
+from app.services.calculation_engine import CalculationEngine
+from app.services.coefficient_snapshot import CoefficientSnapshot, CoefficientSnapshotStore
+from app.services.snapshot_file import (
+    HEADER, read_snapshot_binary, read_snapshot_file, write_snapshot_binary, write_snapshot_file
+)
+from app.services.vectorized_engine import VectorizedCalculationEngine
+from app.utils.month_index import month_index
+from conftest import load_seed_coefficients
+from datetime import datetime
+
+
+@pytest.fixture
+def snapshot():
+    return CoefficientSnapshot.from_models([
+        Coefficient(
+            id=i + 1, year=year, month=month, coefficient=coefficient, is_active=True,
+            effective_from=datetime(year, 1, 1), effective_to=datetime(year, 12, 31, 23, 59, 59)
+        )
+        for i, (year, month, coefficient) in enumerate(load_seed_coefficients())
+    ])
+
+
+def test_binary_round_trip(tmp_path, snapshot):
+    path = str(tmp_path / "coefficients.bin")
+    write_snapshot_binary(snapshot, path)
+
+    loaded = read_snapshot_file(path)
+    assert loaded.version == snapshot.version
+    assert loaded.rows == snapshot.rows
+    assert dict(loaded.by_year) == dict(snapshot.by_year)
+    assert loaded.first_month == snapshot.first_month
+    assert list(loaded.prefix) == list(snapshot.prefix)
+
+    for start, end in [(month_index(1990, 1), month_index(2025, 12)), (month_index(2013, 5), month_index(2014, 2)),
+                       (month_index(1970, 1), month_index(2030, 12))]:
+        assert loaded.coefficient_units(start, end) == snapshot.coefficient_units(start, end)
+
+
+def test_engines_agree_on_loaded_snapshot(tmp_path, snapshot):
+    path = str(tmp_path / "coefficients.bin")
+    write_snapshot_binary(snapshot, path)
+    loaded = read_snapshot_binary(path)
+
+    periods = [
+        PeriodSchema(start_date="01/2010", end_date="12/2013", monthly_salary=5000000),
+        PeriodSchema(start_date="01/2014", end_date="06/2020", monthly_salary=8000000),
+    ]
+    expected = CalculationEngine().calculate(periods, snapshot).model_dump(exclude={"calculated_at"})
+    assert CalculationEngine().calculate(periods, loaded).model_dump(exclude={"calculated_at"}) == expected
+
+    bulk = VectorizedCalculationEngine(loaded).calculate(
+        [1, 1], [p.start_month for p in periods], [p.end_month for p in periods], [5000000, 8000000]
+    )
+    assert bulk.total_amount[0] == expected["total_amount"]
+
+
+def test_binary_load_is_fast(tmp_path, snapshot):
+    path = str(tmp_path / "coefficients.bin")
+    write_snapshot_binary(snapshot, path)
+    read_snapshot_binary(path)
+
+    start = time.perf_counter()
+    for _ in range(20):
+        read_snapshot_binary(path)
+    assert (time.perf_counter() - start) / 20 < 0.005
+
+
+def test_corrupted_file_is_rejected(tmp_path, snapshot):
+    path = str(tmp_path / "coefficients.bin")
+    write_snapshot_binary(snapshot, path)
+
+    with open(path, "r+b") as f:
+        f.seek(HEADER.size + 20)
+        f.write(b"\xff")
+
+    with pytest.raises(ValueError, match="corrupted"):
+        read_snapshot_file(path)
+
+    with open(path, "r+b") as f:
+        f.truncate(HEADER.size + 10)
+    with pytest.raises(ValueError, match="truncated"):
+        read_snapshot_file(path)
+
+
+def test_store_reloads_replaced_file(tmp_path, snapshot):
+    path = str(tmp_path / "coefficients.bin")
+    write_snapshot_file(snapshot, path)
+
+    store = CoefficientSnapshotStore()
+    assert store.load_file(path).version == snapshot.version
+    assert store.refresh_file_if_changed(path) is False
+
+    changed = CoefficientSnapshot(snapshot.rows[1:])
+    write_snapshot_file(changed, path)
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+    assert store.refresh_file_if_changed(path) is True
+    assert store.current().version == changed.version
+
+
+def test_export_command(tmp_path, seeded_db, snapshot):
+    """export-coefficients writes the seeded table; JSON and binary carry the same version"""
+    binary, text = str(tmp_path / "coefficients.bin"), str(tmp_path / "coefficients.json")
+    assert main(["export-coefficients", binary]) == 0
+    assert main(["export-coefficients", text]) == 0
+
+    assert read_snapshot_file(binary).version == read_snapshot_file(text).version
+    assert len(read_snapshot_file(binary)) == len(snapshot)
@@ -0,0 +1,91 @@
+"""
+Test the NumPy vectorized engine against the scalar CalculationEngine
+"""
+
+import random
+
+import numpy as np
+
+from app.models.coefficient import Coefficient
+from app.schemas.period import PeriodSchema
+from app.services.calculation_engine import CalculationEngine
+from app.services.vectorized_engine import VectorizedCalculationEngine, periods_to_columns
+from conftest import SCENARIOS, load_seed_coefficients, scenario_coefficients
+
+
+def _assert_agrees(people, coefficients):
+    bulk = VectorizedCalculationEngine(coefficients).calculate(*periods_to_columns(people))
+    engine = CalculationEngine()
+    engine.load_coefficients(coefficients)
+
+    for i, pid in enumerate(bulk.person_id):
+        scalar = engine.calculate(people[pid])
+        assert bulk.total_months[i] == scalar.total_months, pid
+        assert bulk.average_salary[i] == scalar.average_salary, pid
+        assert bulk.total_amount[i] == scalar.total_amount, pid
+
+
+def test_agrees_with_scalar_engine_on_documented_scenarios():
+    for name, (periods, pairs) in SCENARIOS.items():
+        _assert_agrees({name: periods}, scenario_coefficients(pairs))
+
+
+def test_official_example_values():
+    periods, pairs = SCENARIOS["official_worker_a"]
+    bulk = VectorizedCalculationEngine(scenario_coefficients(pairs)).calculate(*periods_to_columns({"a": periods}))
+
+    assert bulk.months_pre_2014[0] == 12
+    assert bulk.months_from_2014[0] == 25
+    assert bulk.years_pre_2014[0] == 1.0
+    assert bulk.years_from_2014[0] == 2.5
+    assert abs(bulk.average_salary[0] - 1774052) < 10
+    assert abs(bulk.total_amount[0] - 11531338) < 100
+
+
+def test_agrees_with_scalar_engine_on_random_workforce():
+    rnd = random.Random(42)
+    people = {}
+    for pid in range(300):
+        month = rnd.randint(1990 * 12, 2024 * 12)
+        periods = []
+        for _ in range(rnd.randint(1, 8)):
+            end = min(month + rnd.choice([0, 2, 11, 30, 120]), 2026 * 12 + 11)
+            periods.append(PeriodSchema(
+                start_date=f"{month % 12 + 1:02d}/{month // 12}",
+                end_date=f"{end % 12 + 1:02d}/{end // 12}",
+                monthly_salary=rnd.choice([1500000, 4680000, 12345678, 36000000])
+            ))
+            month = end + 1 + rnd.choice([0, 0, 3])
+            if month > 2026 * 12:
+                break
+        people[pid] = periods
+
+    seed = [Coefficient(year=y, month=m, coefficient=c, is_active=True) for y, m, c in load_seed_coefficients()]
+    _assert_agrees(people, seed)
+
+
+def test_rows_for_one_person_may_be_in_any_order():
+    periods, pairs = SCENARIOS["mai"]
+    columns = periods_to_columns({"mai": periods, "other": SCENARIOS["one_year"][0]})
+    order = np.array([5, 2, 0, 4, 1, 3])
+    shuffled = tuple(column[order] for column in columns)
+
+    engine = VectorizedCalculationEngine(scenario_coefficients(pairs + [(2025, 1.0)]))
+    assert list(engine.calculate(*shuffled).total_amount) == list(engine.calculate(*columns).total_amount)
+
+
+def test_round_money_matches_python_round():
+    rnd = random.Random(7)
+    values = (
+        [rnd.uniform(0, 1e9) for _ in range(20000)]
+        + [rnd.randint(0, 10 ** 9) / 1000 for _ in range(20000)]
+        + [x + 0.005 for x in range(1000)]
+        + [0.0, 0.125, 1.005, 2.675, 12345678.125, 2.0 ** 52 + 1, 3.5e15]
+    )
+    rounded = VectorizedCalculationEngine._round_money(np.array(values))
+    assert rounded.tolist() == [round(value, 2) for value in values]
+
+
+def test_huge_whole_salaries_do_not_overflow():
+    periods = [PeriodSchema(start_date="01/2020", end_date="12/2020", monthly_salary=10 ** 14)]
+    _assert_agrees({"a": periods}, scenario_coefficients([(2020, 1.1)]))